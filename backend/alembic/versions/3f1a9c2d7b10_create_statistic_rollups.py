@@ -0,0 +1,61 @@
+"""create statistic_rollups
+
+Revision ID: 3f1a9c2d7b10
+Revises: 
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'statistic_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('level', sa.String(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=True),
+        sa.Column('player_id', sa.Integer(), nullable=True),
+        sa.Column('quarter', sa.Integer(), nullable=True),
+        sa.Column('stat_count', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=True),
+        sa.Column('rebounds', sa.Integer(), nullable=True),
+        sa.Column('assists', sa.Integer(), nullable=True),
+        sa.Column('steals', sa.Integer(), nullable=True),
+        sa.Column('blocks', sa.Integer(), nullable=True),
+        sa.Column('fouls', sa.Integer(), nullable=True),
+        sa.Column('minutes_played', sa.Float(), nullable=True),
+        sa.Column('two_attempts', sa.Integer(), nullable=True),
+        sa.Column('two_made', sa.Integer(), nullable=True),
+        sa.Column('three_attempts', sa.Integer(), nullable=True),
+        sa.Column('three_made', sa.Integer(), nullable=True),
+        sa.Column('free_throw_attempts', sa.Integer(), nullable=True),
+        sa.Column('free_throw_made', sa.Integer(), nullable=True),
+        sa.Column('interference', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id'], ),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_statistic_rollups_id'), 'statistic_rollups', ['id'], unique=False)
+    op.create_index('ix_statistic_rollups_level_game', 'statistic_rollups', ['level', 'game_id', 'quarter', 'player_id'], unique=False)
+    op.create_index('ix_statistic_rollups_level_season', 'statistic_rollups', ['level', 'season', 'player_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_statistic_rollups_level_season', table_name='statistic_rollups')
+    op.drop_index('ix_statistic_rollups_level_game', table_name='statistic_rollups')
+    op.drop_index(op.f('ix_statistic_rollups_id'), table_name='statistic_rollups')
+    op.drop_table('statistic_rollups')
@@ -0,0 +1,51 @@
+"""notification audience delivery
+
+Revision ID: 5d8f2a61c0b7
+Revises: e7a3b5c19d42
+Create Date: 2026-10-18 16:02:18.774530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8f2a61c0b7'
+down_revision: Union[str, None] = 'e7a3b5c19d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('delivery_mode', sa.String(length=16), server_default='fanout', nullable=False))
+    op.create_index('ix_notifications_delivery_target_created', 'notifications', ['delivery_mode', 'target', 'created_at'], unique=False)
+    op.create_index('ix_user_notifications_user_notification', 'user_notifications', ['user_id', 'notification_id'], unique=False)
+    op.create_table(
+        'notification_reads',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('notification_id', sa.Integer(), nullable=False),
+        sa.Column('read_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['notification_id'], ['notifications.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'notification_id')
+    )
+    op.create_table(
+        'notification_watermarks',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('last_read_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_watermarks')
+    op.drop_table('notification_reads')
+    op.drop_index('ix_user_notifications_user_notification', table_name='user_notifications')
+    op.drop_index('ix_notifications_delivery_target_created', table_name='notifications')
+    op.drop_column('notifications', 'delivery_mode')
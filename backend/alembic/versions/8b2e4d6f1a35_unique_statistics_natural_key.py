@@ -0,0 +1,38 @@
+"""unique statistics (game_id, player_id, quarter)
+
+Revision ID: 8b2e4d6f1a35
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-18 11:02:17.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a35'
+down_revision: Union[str, None] = '3f1a9c2d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Remove duplicatas antigas mantendo a linha mais recente de cada chave.
+    # Depois de rodar em produção, execute scripts/backfill_rollups.py.
+    op.execute(
+        "DELETE FROM statistics WHERE id NOT IN ("
+        "SELECT MAX(id) FROM statistics GROUP BY game_id, player_id, quarter)"
+    )
+    with op.batch_alter_table('statistics') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_statistics_game_player_quarter', ['game_id', 'player_id', 'quarter']
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('statistics') as batch_op:
+        batch_op.drop_constraint('uq_statistics_game_player_quarter', type_='unique')
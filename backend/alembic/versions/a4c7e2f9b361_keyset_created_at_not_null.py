@@ -0,0 +1,44 @@
+"""keyset created_at not null
+
+Revision ID: a4c7e2f9b361
+Revises: f3b8c1d5e297
+Create Date: 2026-10-19 11:02:37.915264
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2f9b361'
+down_revision: Union[str, None] = 'f3b8c1d5e297'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tabelas paginadas por (created_at, id): a chave do cursor não pode ser nula
+TABLES = ('users', 'leads', 'notifications', 'user_notifications')
+# Linhas sem data de criação vão para o fim da listagem (mais recentes primeiro)
+EPOCH = datetime(1970, 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name in TABLES:
+        table = sa.table(name, sa.column('created_at', sa.DateTime))
+        fallback = sa.literal(EPOCH, sa.DateTime)
+        if name == 'users':
+            # Usuários têm updated_at, a melhor aproximação disponível
+            fallback = sa.func.coalesce(sa.column('updated_at', sa.DateTime), fallback)
+        op.execute(table.update().where(table.c.created_at.is_(None)).values(created_at=fallback))
+        with op.batch_alter_table(name) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in reversed(TABLES):
+        with op.batch_alter_table(name) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
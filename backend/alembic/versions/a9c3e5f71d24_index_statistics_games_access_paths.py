@@ -0,0 +1,32 @@
+"""index statistics and games access paths
+
+Revision ID: a9c3e5f71d24
+Revises: 5d8f2a61c0b7
+Create Date: 2026-10-18 18:41:07.215903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c3e5f71d24'
+down_revision: Union[str, None] = '5d8f2a61c0b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_statistics_player_game', 'statistics', ['player_id', 'game_id'], unique=False)
+    op.create_index('ix_games_owner_date', 'games', ['owner_id', 'date'], unique=False)
+    op.create_index('ix_games_date', 'games', ['date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_games_date', table_name='games')
+    op.drop_index('ix_games_owner_date', table_name='games')
+    op.drop_index('ix_statistics_player_game', table_name='statistics')
@@ -0,0 +1,65 @@
+"""player search name
+
+Revision ID: b6e2d8a4f913
+Revises: a9c3e5f71d24
+Create Date: 2026-10-18 19:27:44.106352
+
+"""
+from typing import Sequence, Union
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d8a4f913'
+down_revision: Union[str, None] = 'a9c3e5f71d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def search_key(text: str) -> str:
+    # Cópia de app.models.player.search_key, para a migração não depender do código da aplicação
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+
+SEARCH_NAME_TYPE = sa.String().with_variant(sa.String(collation='C'), 'postgresql')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('players', sa.Column('search_name', SEARCH_NAME_TYPE, nullable=True))
+
+    players = sa.table('players', sa.column('id', sa.Integer), sa.column('name', sa.String),
+                       sa.column('search_name', sa.String))
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(players.c.id, players.c.name)
+            .where(players.c.id > last_id)
+            .order_by(players.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            players.update().where(players.c.id == sa.bindparam('player_id')),
+            [{'player_id': id, 'search_name': search_key(name)} for id, name in rows],
+        )
+        last_id = rows[-1].id
+
+    # Chave inicial do cursor do diretório: com todas as linhas preenchidas já pode ser NOT NULL
+    with op.batch_alter_table('players') as batch_op:
+        batch_op.alter_column('search_name', existing_type=SEARCH_NAME_TYPE, nullable=False)
+    op.create_index('ix_players_search_name', 'players', ['search_name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_players_search_name', table_name='players')
+    op.drop_column('players', 'search_name')
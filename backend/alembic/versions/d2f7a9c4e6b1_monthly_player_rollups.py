@@ -0,0 +1,67 @@
+"""monthly player rollups
+
+Revision ID: d2f7a9c4e6b1
+Revises: b6e2d8a4f913
+Create Date: 2026-10-18 20:05:31.448127
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a9c4e6b1'
+down_revision: Union[str, None] = 'b6e2d8a4f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_MONTH_PLAYER = 'month_player'
+ROLLUP_FIELDS = (
+    'points', 'rebounds', 'assists', 'steals', 'blocks', 'fouls', 'minutes_played',
+    'two_attempts', 'two_made', 'three_attempts', 'three_made',
+    'free_throw_attempts', 'free_throw_made', 'interference',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('statistic_rollups', sa.Column('month', sa.Integer(), nullable=True))
+    op.add_column('players', sa.Column('user_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_players_user_id'), 'players', ['user_id'], unique=True)
+    op.create_foreign_key('fk_players_user_id_users', 'players', 'users', ['user_id'], ['id'])
+
+    # Backfill do recorte mensal a partir de statistics
+    statistics = sa.table('statistics', sa.column('id'), sa.column('game_id'), sa.column('player_id'),
+                          *[sa.column(field) for field in ROLLUP_FIELDS])
+    games = sa.table('games', sa.column('id'), sa.column('date'))
+    rollups = sa.table('statistic_rollups', sa.column('level'), sa.column('season'), sa.column('player_id'),
+                       sa.column('month'), sa.column('stat_count'), sa.column('updated_at'),
+                       *[sa.column(field) for field in ROLLUP_FIELDS])
+    season = sa.extract('year', games.c.date)
+    month = sa.extract('month', games.c.date)
+    query = sa.select(
+        sa.literal(ROLLUP_MONTH_PLAYER),
+        season,
+        statistics.c.player_id,
+        month,
+        sa.func.count(statistics.c.id),
+        sa.literal(datetime.utcnow()),
+        *[sa.func.coalesce(sa.func.sum(statistics.c[field]), 0) for field in ROLLUP_FIELDS],
+    ).select_from(statistics.join(games, games.c.id == statistics.c.game_id)).group_by(
+        season, statistics.c.player_id, month
+    )
+    op.execute(rollups.insert().from_select(
+        ['level', 'season', 'player_id', 'month', 'stat_count', 'updated_at', *ROLLUP_FIELDS], query
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.text("DELETE FROM statistic_rollups WHERE level = 'month_player'"))
+    op.drop_constraint('fk_players_user_id_users', 'players', type_='foreignkey')
+    op.drop_index(op.f('ix_players_user_id'), table_name='players')
+    op.drop_column('players', 'user_id')
+    op.drop_column('statistic_rollups', 'month')
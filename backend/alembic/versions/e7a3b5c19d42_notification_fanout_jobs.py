@@ -0,0 +1,36 @@
+"""notification fan-out jobs
+
+Revision ID: e7a3b5c19d42
+Revises: c4d91e7a2b58
+Create Date: 2026-10-18 15:12:40.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3b5c19d42'
+down_revision: Union[str, None] = 'c4d91e7a2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('email_outbox', sa.Column('job_id', sa.String(length=32), nullable=True))
+    op.create_index(op.f('ix_email_outbox_job_id'), 'email_outbox', ['job_id'], unique=False)
+    op.add_column('notifications', sa.Column('recipient_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('notifications', sa.Column('email_job_id', sa.String(length=32), nullable=True))
+    op.create_index(op.f('ix_notifications_email_job_id'), 'notifications', ['email_job_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notifications_email_job_id'), table_name='notifications')
+    op.drop_column('notifications', 'email_job_id')
+    op.drop_column('notifications', 'recipient_count')
+    op.drop_index(op.f('ix_email_outbox_job_id'), table_name='email_outbox')
+    op.drop_column('email_outbox', 'job_id')
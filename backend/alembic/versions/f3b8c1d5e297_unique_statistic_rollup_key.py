@@ -0,0 +1,84 @@
+"""unique statistic rollup key
+
+Revision ID: f3b8c1d5e297
+Revises: d2f7a9c4e6b1
+Create Date: 2026-10-19 10:14:52.630418
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8c1d5e297'
+down_revision: Union[str, None] = 'd2f7a9c4e6b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_FIELDS = (
+    'points', 'rebounds', 'assists', 'steals', 'blocks', 'fouls', 'minutes_played',
+    'two_attempts', 'two_made', 'three_attempts', 'three_made',
+    'free_throw_attempts', 'free_throw_made', 'interference',
+)
+# (level, colunas do recorte) de app.crud.rollup.rebuild_rollups
+LEVELS = (
+    ('game', ('game_id',)),
+    ('game_quarter', ('game_id', 'quarter')),
+    ('game_player', ('game_id', 'player_id')),
+    ('season_player', ('player_id',)),
+    ('month_player', ('player_id', 'month')),
+    ('season', ()),
+)
+KEY_COLUMNS = ('game_id', 'player_id', 'quarter', 'month')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Escritas concorrentes podem ter duplicado chaves: recalcula tudo a
+    # partir de statistics antes de criar o índice único
+    statistics = sa.table('statistics', sa.column('id'), sa.column('game_id'), sa.column('player_id'),
+                          sa.column('quarter'), *[sa.column(field) for field in ROLLUP_FIELDS])
+    games = sa.table('games', sa.column('id'), sa.column('date'))
+    rollups = sa.table('statistic_rollups', sa.column('level'), sa.column('season'),
+                       *[sa.column(column) for column in KEY_COLUMNS],
+                       sa.column('stat_count'), sa.column('updated_at'),
+                       *[sa.column(field) for field in ROLLUP_FIELDS])
+    season = sa.extract('year', games.c.date)
+    sources = {
+        'game_id': statistics.c.game_id,
+        'player_id': statistics.c.player_id,
+        'quarter': statistics.c.quarter,
+        'month': sa.extract('month', games.c.date),
+    }
+    op.execute(rollups.delete())
+    now = datetime.utcnow()
+    for level, columns in LEVELS:
+        keys = [sources[column] if column in columns else sa.null() for column in KEY_COLUMNS]
+        query = sa.select(
+            sa.literal(level),
+            season,
+            *keys,
+            sa.func.count(statistics.c.id),
+            sa.literal(now),
+            *[sa.func.coalesce(sa.func.sum(statistics.c[field]), 0) for field in ROLLUP_FIELDS],
+        ).select_from(statistics.join(games, games.c.id == statistics.c.game_id)).group_by(
+            season, *[sources[column] for column in columns]
+        )
+        op.execute(rollups.insert().from_select(
+            ['level', 'season', *KEY_COLUMNS, 'stat_count', 'updated_at', *ROLLUP_FIELDS], query
+        ))
+
+    op.create_index(
+        'uq_statistic_rollups_key',
+        'statistic_rollups',
+        ['level', 'season', *[sa.text(f'coalesce({column}, -1)') for column in KEY_COLUMNS]],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_statistic_rollups_key', table_name='statistic_rollups')
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.api import deps
 from app.crud import user as crud
+from app.core import pagination
 from app.schemas.user import (
     UserCreate,
     UserUpdate,
@@ -19,22 +20,29 @@ router = APIRouter()
 
 @router.get("/", response_model=List[UserListResponse])
 def get_users(
+    response: Response,
     name: Optional[str] = None,
     email: Optional[str] = None,
     role: Optional[UserRole] = None,
     is_active: Optional[bool] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    total: str = Query(pagination.TOTAL_NONE, pattern=pagination.TOTAL_PATTERN),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_admin_user)
 ):
     """
-    Listar usuários (apenas admin).
+    Listar usuários (apenas admin). Próxima página pelo cabeçalho X-Next-Cursor.
     """
     filters = UserFilter(name=name, email=email, role=role, is_active=is_active)
-    pagination = UserPagination(skip=skip, limit=limit)
-    users, total = crud.get_users(db, filters, pagination)
-    return users
+    page_params = UserPagination(skip=skip, limit=limit, cursor=cursor, total=total)
+    try:
+        page = crud.get_users(db, filters, page_params)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    pagination.set_page_headers(response, page)
+    return page.items
 
 @router.post("/", response_model=UserResponse)
 def create_user(
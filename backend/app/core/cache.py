@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+
+class CacheBackend:
+    """Interface mínima de armazenamento usada por `ResponseCache`."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def keys(self) -> List[str]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Cache em processo com expiração por TTL e descarte LRU."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache em um servidor compatível com Redis (ou num stand-in como fakeredis).
+
+    O TTL fica a cargo do próprio Redis; o descarte LRU segue a política
+    `maxmemory-policy` configurada no servidor.
+    """
+
+    def __init__(self, client, prefix: str = "scoremvp:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def keys(self) -> List[str]:
+        keys = []
+        for raw in self.client.scan_iter(match=self.prefix + "*"):
+            if isinstance(raw, bytes):
+                raw = raw.decode()
+            keys.append(raw[len(self.prefix):])
+        return keys
+
+    def clear(self) -> None:
+        for key in self.keys():
+            self.delete(key)
+
+
+def create_backend(
+    namespace: str, name: Optional[str] = None, max_entries: int = 512
+) -> CacheBackend:
+    """Cria o backend configurado em `CACHE_BACKEND` (memory, redis ou fakeredis).
+
+    `namespace` separa as chaves de cada cache no Redis compartilhado, para
+    que `keys()`, `clear()` e `stats()` de um cache não vejam os outros.
+    """
+    name = name or settings.CACHE_BACKEND
+    prefix = f"scoremvp:cache:{namespace}:"
+    if name == "memory":
+        return MemoryCacheBackend(max_entries=max_entries)
+    if name == "redis":
+        import redis  # dependência opcional
+        return RedisCacheBackend(redis.Redis.from_url(settings.CACHE_REDIS_URL), prefix=prefix)
+    if name == "fakeredis":
+        import fakeredis  # stand-in local, sem servidor
+        return RedisCacheBackend(fakeredis.FakeRedis(), prefix=prefix)
+    raise ValueError(f"Backend de cache desconhecido: {name}")
+
+
+class ResponseCache:
+    """Cache de respostas com contadores de acertos e falhas.
+
+    As chaves são listas JSON (ex.: endpoint e filtros), o que permite
+    invalidar seletivamente com `invalidate(predicate)`.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return json.dumps(parts, default=str)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(key, value, self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def invalidate(self, predicate: Callable[[list], bool]) -> int:
+        """Remove as chaves cujas partes satisfazem `predicate`."""
+        removed = 0
+        for key in self.backend.keys():
+            if predicate(json.loads(key)):
+                self.backend.delete(key)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.backend),
+        }
+
+
+dashboard_cache = ResponseCache(
+    create_backend("dashboard", max_entries=settings.DASHBOARD_CACHE_MAX_ENTRIES),
+    ttl=settings.DASHBOARD_CACHE_TTL,
+)
@@ -9,6 +9,8 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    BCRYPT_ROUNDS: int = 12  # custo de novos hashes; os existentes continuam válidos
+    PASSWORD_HASH_WORKERS: int = 4  # threads dedicadas ao bcrypt por worker
     
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of origins
     # e.g: '["http://localhost", "http://localhost:4200", "http://localhost:3000"]'
@@ -69,6 +71,40 @@ class Settings(BaseSettings):
     MAILERSEND_SENDER_NAME: str = "ScoreMVP"
     
     FRONTEND_URL: str = "http://localhost:3000"
+
+    # Email outbox worker
+    EMAIL_WORKER_ENABLED: bool = True
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_POLL_INTERVAL: float = 5  # segundos entre varreduras da outbox
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BACKOFF_SECONDS: int = 30  # dobra a cada tentativa
+    EMAIL_CLAIM_TIMEOUT_SECONDS: int = 300  # mensagens "sending" além disso voltam para a fila
+    EMAIL_SMTP_STARTTLS: bool = True
+    EMAIL_SMTP_IDLE_TIMEOUT: int = 60
+
+    # Notificações: "fanout" grava uma linha por destinatária; "audience" grava
+    # só a notificação e o inbox é calculado a partir do público alvo
+    NOTIFICATION_DELIVERY_MODE: str = "fanout"
+    NOTIFICATION_UNREAD_CACHE_TTL: int = 300  # segundos; ao expirar a contagem é refeita no banco
+    NOTIFICATION_UNREAD_CACHE_MAX_ENTRIES: int = 8192
+
+    # Cache settings
+    CACHE_BACKEND: str = "memory"  # memory, redis ou fakeredis
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    DASHBOARD_CACHE_TTL: int = 60  # segundos
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 512
+    IDENTITY_CACHE_TTL: int = 30  # segundos
+    IDENTITY_CACHE_MAX_ENTRIES: int = 4096
+
+    # Database pool settings, por engine (síncrono e assíncrono) e por worker
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # segundos; -1 desativa
+    DB_POOL_TIMEOUT: int = 30  # segundos esperando uma conexão livre
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 desativa
+
+    # Live stream (SSE) settings
+    LIVE_STREAM_KEEPALIVE_SECONDS: int = 15
     
     DATABASE_URL: Optional[str] = None
     ALGORITHM: str = "HS256"
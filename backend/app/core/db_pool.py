@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.core.config import settings
+
+
+class PoolMetrics:
+    """Contadores de espera por conexão de um pool (checkouts, tempo e timeouts)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / attempts * 1000, 3) if attempts else 0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+def instrumented_pool_class(base: Type[Pool]) -> Type[Pool]:
+    """Subclasse de `base` que mede quanto cada checkout esperou por uma conexão.
+
+    Cada chamada cria uma classe com suas próprias métricas, que sobrevivem
+    ao `recreate()` feito pelo `engine.dispose()`.
+    """
+
+    class InstrumentedPool(base):
+        metrics = PoolMetrics()
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                self.metrics.record(time.perf_counter() - start, timed_out=True)
+                raise
+            self.metrics.record(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def engine_options(database_url: str, pool_class: Type[Pool] = QueuePool) -> Dict[str, Any]:
+    """Argumentos de `create_engine` com o pool e o statement_timeout configurados.
+
+    SQLite (testes) fica com o pool padrão do dialeto.
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {"pool_pre_ping": True}
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=instrumented_pool_class(pool_class),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Conexões em uso/ociosas do pool e, se instrumentado, os tempos de espera."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if isinstance(metrics, PoolMetrics):
+        status.update(metrics.snapshot())
+    return status
@@ -1,16 +1,130 @@
 from jinja2 import Environment, FileSystemLoader
 import os
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from sqlalchemy import func, insert, literal
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.email_outbox import EmailOutbox, EMAIL_PENDING, EMAIL_SENDING, EMAIL_SENT, EMAIL_FAILED
+
+# Acorda o worker de email quando uma mensagem entra na outbox
+outbox_signal = threading.Event()
+
+# Erros do destinatário/mensagem: a conexão continua válida para as próximas
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+class SMTPSession:
+    """Conexão SMTP persistente: STARTTLS e login uma vez, reaproveitada entre mensagens.
+
+    Reabre a conexão se o servidor a derrubou ou se ficou ociosa por mais de
+    `idle_timeout` segundos (servidores costumam fechar sessões paradas).
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = True, idle_timeout: float = 60, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        return server
+
+    def send(self, sender: str, to_email: str, message: str) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            try:
+                self._server.sendmail(sender, [to_email], message)
+            except smtplib.SMTPServerDisconnected:
+                # Sessão derrubada pelo servidor: uma nova tentativa com conexão nova
+                self.close()
+                self._server = self._connect()
+                self._server.sendmail(sender, [to_email], message)
+        except MESSAGE_ERRORS:
+            raise
+        except Exception:
+            self.close()
+            raise
+        finally:
+            self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            pass
+        self._server = None
+
+def enqueue_email(db: Session, to_email: str, subject: str, html_body: str) -> EmailOutbox:
+    """Grava a mensagem na outbox dentro da transação de `db` (sem commit)."""
+    message = EmailOutbox(to_email=to_email, subject=subject, html_body=html_body)
+    db.add(message)
+    return message
+
+def enqueue_bulk_email(db: Session, recipients: Select, subject: str, html_body: str, job_id: str) -> int:
+    """Enfileira a mesma mensagem para cada email de `recipients` com um único INSERT ... SELECT.
+
+    `recipients` é um select de uma coluna com os endereços. Não faz commit;
+    retorna quantas mensagens entraram na outbox.
+    """
+    now = datetime.utcnow()
+    rows = recipients.add_columns(
+        literal(subject),
+        literal(html_body),
+        literal(EMAIL_PENDING),
+        literal(0),
+        literal(now),
+        literal(now),
+        literal(job_id),
+    )
+    result = db.execute(insert(EmailOutbox).from_select(
+        ["to_email", "subject", "html_body", "status", "attempts", "next_attempt_at", "created_at", "job_id"],
+        rows,
+    ))
+    return result.rowcount
+
+def email_job_status(db: Session, job_id: str) -> Dict[str, int]:
+    """Contagem das mensagens de um job por status."""
+    counts = dict(
+        db.query(EmailOutbox.status, func.count(EmailOutbox.id))
+        .filter(EmailOutbox.job_id == job_id)
+        .group_by(EmailOutbox.status)
+        .all()
+    )
+    return {status: counts.get(status, 0) for status in (EMAIL_PENDING, EMAIL_SENDING, EMAIL_SENT, EMAIL_FAILED)}
+
+def notify_outbox() -> None:
+    outbox_signal.set()
 
 class EmailService:
     def __init__(self):
         self.template_dir = Path(__file__).parent.parent / "templates"
         self.env = Environment(loader=FileSystemLoader(str(self.template_dir)))
-        self.sender_email = os.getenv("MAILERSEND_SENDER_EMAIL")
+        self.sender_email = os.getenv("MAILERSEND_SENDER_EMAIL", settings.MAILERSEND_SENDER_EMAIL)
         self.sender_name = os.getenv("MAILERSEND_SENDER_NAME", "ScoreMVP")
         self.smtp_username = os.getenv("MAILERSEND_SMTP_USERNAME")
         self.smtp_password = os.getenv("MAILERSEND_SMTP_PASSWORD")
@@ -21,7 +135,7 @@ class EmailService:
         template = self.env.get_template(f"{template_name}.html")
         return template.render(**context)
 
-    def send_password_reset_email(self, email: str, reset_token: str) -> None:
+    def send_password_reset_email(self, email: str, reset_token: str, db: Optional[Session] = None) -> None:
         reset_url = f"{os.getenv('FRONTEND_URL')}/reset-password?token={reset_token}"
         context = {
             "reset_url": reset_url,
@@ -29,23 +143,45 @@ class EmailService:
         }
         html_content = self._render_template("password_reset", context)
         subject = "Recuperação de Senha - ScoreMVP"
-        self._send_email(email, subject, html_content)
+        self._send_email(email, subject, html_content, db)
 
-    def send_notification_email(self, to_email: str, subject: str, body: str):
-        self._send_email(to_email, subject, body)
+    def send_notification_email(self, to_email: str, subject: str, body: str, db: Optional[Session] = None):
+        self._send_email(to_email, subject, body, db)
 
-    def _send_email(self, to_email: str, subject: str, html_body: str):
+    def build_message(self, to_email: str, subject: str, html_body: str) -> str:
         msg = MIMEMultipart("alternative")
         msg["From"] = self.sender_email
         msg["To"] = to_email
         msg["Subject"] = subject
         msg.attach(MIMEText(html_body, "html"))
+        return msg.as_string()
+
+    def smtp_session(self) -> SMTPSession:
+        return SMTPSession(
+            self.smtp_server,
+            self.smtp_port,
+            self.smtp_username,
+            self.smtp_password,
+            starttls=settings.EMAIL_SMTP_STARTTLS,
+            idle_timeout=settings.EMAIL_SMTP_IDLE_TIMEOUT,
+        )
+
+    def _send_email(self, to_email: str, subject: str, html_body: str, db: Optional[Session] = None):
+        # O envio fica com o worker da outbox (app/services/email_worker.py).
+        # Com `db`, a mensagem entra na transação de quem chamou, que faz o commit.
+        if db is not None:
+            enqueue_email(db, to_email, subject, html_body)
+            notify_outbox()
+            return
+        db = SessionLocal()
         try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.sendmail(self.sender_email, to_email, msg.as_string())
+            enqueue_email(db, to_email, subject, html_body)
+            db.commit()
         except Exception as e:
-            print(f"Erro ao enviar e-mail: {e}")
+            db.rollback()
+            print(f"Erro ao enfileirar e-mail: {e}")
+        finally:
+            db.close()
+        notify_outbox()
 
 email_service = EmailService() 
\ No newline at end of file
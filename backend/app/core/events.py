@@ -0,0 +1,76 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Fila de eventos de um cliente conectado, presa ao event loop que a criou."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def push(self, event: Dict[str, Any]) -> None:
+        # Cliente lento: descarta o evento mais antigo em vez de bloquear quem publica
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class GameEventHub:
+    """Pub/sub em processo para eventos ao vivo de um jogo.
+
+    `publish` pode ser chamado de qualquer thread (as rotas síncronas rodam
+    no threadpool); a entrega em cada fila acontece no event loop do
+    assinante. Com vários workers, cada processo tem o seu próprio hub.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, game_id: int) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers[game_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, game_id: int, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(game_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[game_id]
+
+    def subscriber_count(self, game_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(game_id, ()))
+
+    def publish(self, game_id: int, event_type: str, data: Any) -> int:
+        """Entrega o evento a todos os assinantes do jogo; retorna quantos receberam."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(game_id, ()))
+        event = {"type": event_type, "data": data}
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+                delivered += 1
+            except RuntimeError:
+                # Event loop já encerrado; a assinatura sai no finally do stream
+                logger.debug(f"Assinante do jogo {game_id} sem event loop ativo")
+        return delivered
+
+
+def format_sse(event_type: str, data: Any) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+game_events = GameEventHub()
@@ -0,0 +1,59 @@
+from dataclasses import asdict, dataclass
+from typing import Optional, Union
+
+from app.core.cache import ResponseCache, create_backend
+from app.core.config import settings
+
+# Papéis (UserRole.value) com acesso às rotas administrativas
+ADMIN_ROLES = ("superadmin", "team_admin")
+
+
+@dataclass(frozen=True)
+class UserIdentity:
+    """Dados do usuário autenticado que a maioria das rotas usa (sem carregar o ORM)."""
+
+    id: int
+    email: str
+    name: str
+    role: str
+    plan: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "UserIdentity":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=getattr(user.role, "value", user.role),
+            plan=getattr(user.plan, "value", user.plan),
+            is_active=bool(user.is_active),
+        )
+
+
+# TTL curto: com o backend em memória cada worker tem o seu cache e a
+# invalidação só alcança o processo que fez a escrita
+identity_cache = ResponseCache(
+    create_backend("identity", max_entries=settings.IDENTITY_CACHE_MAX_ENTRIES),
+    ttl=settings.IDENTITY_CACHE_TTL,
+)
+
+
+def _key(subject: Union[str, int]) -> str:
+    return identity_cache.make_key("identity", str(subject))
+
+
+def get_cached_identity(subject: Union[str, int]) -> Optional[UserIdentity]:
+    data = identity_cache.get(_key(subject))
+    return UserIdentity(**data) if data is not None else None
+
+
+def cache_identity(subject: Union[str, int], identity: UserIdentity) -> None:
+    identity_cache.set(_key(subject), asdict(identity))
+
+
+def invalidate_user_identity(user_id: int, *emails: Optional[str]) -> None:
+    """Remove a identidade do usuário, seja o subject do token o id ou o email."""
+    for subject in (user_id, *emails):
+        if subject is not None:
+            identity_cache.delete(_key(subject))
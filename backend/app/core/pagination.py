@@ -0,0 +1,121 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar, Union
+
+from fastapi import Response
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+# Cabeçalhos da paginação; o corpo continua sendo só a lista de itens
+CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_HEADER = "X-Total-Count"
+ESTIMATE_HEADER = "X-Total-Estimate"
+
+TOTAL_NONE = "none"
+TOTAL_ESTIMATE = "estimate"
+TOTAL_EXACT = "exact"
+TOTAL_MODES = (TOTAL_NONE, TOTAL_ESTIMATE, TOTAL_EXACT)
+TOTAL_PATTERN = "^(" + "|".join(TOTAL_MODES) + ")$"
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """O cursor recebido não foi gerado por `encode_cursor` (ou foi alterado)."""
+
+
+SortValue = Union[datetime, str]
+
+
+def encode_cursor(sort_value: SortValue, id: int) -> str:
+    """Cursor opaco com a chave (data ou nome, id) do último item da página."""
+    value = {"dt": sort_value.isoformat()} if isinstance(sort_value, datetime) else sort_value
+    raw = json.dumps([value, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[SortValue, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, id = json.loads(raw)
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value["dt"])
+        elif not isinstance(sort_value, str):
+            raise TypeError(sort_value)
+        return sort_value, int(id)
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor("Cursor inválido") from e
+
+
+def keyset(query, sort_column, id_column, cursor: Optional[str] = None, descending: bool = True):
+    """Ordena por (sort_column, id_column) e continua depois do item do cursor.
+
+    Funciona com `Query` e `Select`. O id desempata datas iguais, então a
+    ordem é estável e nenhum item se repete ou some entre páginas, mesmo
+    com inserções no meio da navegação. As colunas da chave não podem ser
+    nulas.
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        key = tuple_(sort_column, id_column)
+        after = tuple_(literal(sort_value, sort_column.type), literal(last_id, id_column.type))
+        query = query.where(key < after if descending else key > after)
+    if descending:
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column, id_column)
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+
+def build_page(rows: List[T], limit: int, key: Callable[[T], Tuple[SortValue, int]]) -> Page[T]:
+    """Monta a página a partir de `limit + 1` linhas: a sobra indica que há próxima."""
+    if len(rows) <= limit:
+        return Page(items=list(rows))
+    items = list(rows[:limit])
+    return Page(items=items, next_cursor=encode_cursor(*key(items[-1])))
+
+
+def estimate_count(db: Session, query) -> int:
+    """Total aproximado pela estimativa do planejador, sem percorrer as linhas.
+
+    No Postgres lê o "Plan Rows" do EXPLAIN; nos outros bancos (SQLite dos
+    testes) faz a contagem exata.
+    """
+    statement = getattr(query, "statement", query)
+    connection = db.connection()
+    if connection.dialect.name != "postgresql":
+        return exact_count(db, statement)
+    compiled = statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def exact_count(db: Session, query) -> int:
+    statement = getattr(query, "statement", query)
+    return db.execute(select(func.count()).select_from(statement.order_by(None).subquery())).scalar_one()
+
+
+def count_total(db: Session, query, mode: str = TOTAL_NONE) -> Tuple[Optional[int], bool]:
+    """Total do conjunto filtrado conforme `mode`; retorna (total, estimado)."""
+    if mode == TOTAL_EXACT:
+        return exact_count(db, query), False
+    if mode == TOTAL_ESTIMATE:
+        return estimate_count(db, query), True
+    return None, False
+
+
+def set_page_headers(response: Response, page: Page[Any]) -> None:
+    if page.next_cursor:
+        response.headers[CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        response.headers[ESTIMATE_HEADER if page.total_estimated else TOTAL_HEADER] = str(page.total)
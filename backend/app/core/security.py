@@ -1,23 +1,38 @@
 # backend/app/core/security.py
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
 from typing import Any, Union
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.core.config import settings
+from app.core.identity import UserIdentity, get_cached_identity, cache_identity
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+# Pool dedicado ao bcrypt (que libera o GIL): logins não bloqueiam o event
+# loop nem disputam o threadpool das rotas síncronas
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 ALGORITHM = "HS256"
 
-__all__ = ["ALGORITHM", "create_access_token", "verify_password", "get_password_hash", "verify_access_token", "get_current_user"]
+__all__ = ["ALGORITHM", "create_access_token", "verify_password", "get_password_hash", "verify_password_async", "get_password_hash_async", "verify_access_token", "get_current_user", "get_current_user_async", "get_current_identity", "get_current_identity_async"]
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -38,6 +53,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
 def verify_access_token(token: str) -> str:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
@@ -48,24 +71,75 @@ def verify_access_token(token: str) -> str:
     except JWTError:
         return None
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Not authenticated",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _email_from_token(token: str) -> str:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return email
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> models.User:
+    email = _email_from_token(token)
     user = db.query(models.User).filter(models.User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    """Mesma verificação de `get_current_user`, para rotas `async def`."""
+    email = _email_from_token(token)
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    user = result.scalars().first()
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+def get_current_identity(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> UserIdentity:
+    """Identidade do usuário autenticado, servida do cache enquanto o TTL vale.
+
+    Para rotas que só precisam do id/papel do usuário; quem precisa do
+    objeto ORM continua usando `get_current_user`.
+    """
+    email = _email_from_token(token)
+    identity = get_cached_identity(email)
+    if identity is None:
+        user = db.query(models.User).filter(models.User.email == email).first()
+        if user is None:
+            raise _credentials_exception()
+        identity = UserIdentity.from_user(user)
+        cache_identity(email, identity)
+    return identity
+
+async def get_current_identity_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserIdentity:
+    email = _email_from_token(token)
+    identity = get_cached_identity(email)
+    if identity is None:
+        result = await db.execute(select(models.User).where(models.User.email == email))
+        user = result.scalars().first()
+        if user is None:
+            raise _credentials_exception()
+        identity = UserIdentity.from_user(user)
+        cache_identity(email, identity)
+    return identity
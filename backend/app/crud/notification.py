@@ -1,98 +1,360 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, literal, select, update, delete, exists, func, or_, union_all
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Optional
-from app.models.notification import Notification, UserNotification, NotificationTarget
-from app.models.user import User
+import uuid
+from app.models.notification import (
+    Notification,
+    UserNotification,
+    NotificationTarget,
+    NotificationRead,
+    NotificationWatermark,
+    DELIVERY_FANOUT,
+    DELIVERY_AUDIENCE,
+)
+from app.models.user import User, UserRole, UserPlan
 from app.schemas.notification import NotificationCreate
-from app.core.email import email_service
+from app.core.config import settings
+from app.core.cache import ResponseCache, create_backend
+from app.core import pagination
+from app.core.pagination import Page
+from app.core.email import enqueue_bulk_email, email_job_status, notify_outbox
+
+# Contador de não lidas por usuária: {"count": n, "through": id}, onde `through`
+# é a notificação mais recente já considerada. A mais recente de todas vem do
+# banco (max(id), busca no índice da chave primária), então notificações
+# criadas por qualquer worker entram na hora: cada contador alcança o restante
+# com uma contagem delta (id > through). Leituras feitas em outro worker só
+# decrementam o contador do cache daquele worker; com CACHE_BACKEND=memory a
+# contagem aqui pode ficar acima do real por até NOTIFICATION_UNREAD_CACHE_TTL.
+# Com redis o contador é compartilhado e não há essa defasagem.
+# Ids não seguem a ordem de commit: uma notificação pode ficar visível depois
+# de outra com id maior, e o delta (id > through) não a alcançaria. Por isso o
+# fan-out descarta os contadores que já passaram do id novo. Com o backend em
+# memória isso só vale para o worker que criou a notificação; nos demais a
+# contagem pode ficar abaixo do real por até NOTIFICATION_UNREAD_CACHE_TTL.
+unread_cache = ResponseCache(
+    create_backend("unread", max_entries=settings.NOTIFICATION_UNREAD_CACHE_MAX_ENTRIES),
+    ttl=settings.NOTIFICATION_UNREAD_CACHE_TTL,
+)
+
+def _unread_key(user_id: int) -> str:
+    return unread_cache.make_key("unread", user_id)
+
+@dataclass
+class InboxItem:
+    """Item do inbox de uma usuária; `id` é o id da notificação nos dois modos de entrega."""
+    id: int
+    notification: Notification
+    is_read: bool
+    created_at: datetime
+
+def target_filters(target: NotificationTarget) -> list:
+    """Filtros de `User` para o público de uma notificação."""
+    if target == NotificationTarget.PLAYERS:
+        return [User.role == UserRole.PLAYER]
+    if target == NotificationTarget.MVP:
+        return [User.plan == UserPlan.PRO]
+    if target == NotificationTarget.TEAM:
+        return [User.plan == UserPlan.TEAM]
+    return []
+
+def user_targets(user: User) -> List[NotificationTarget]:
+    """Públicos dos quais a usuária faz parte (inverso de `target_filters`)."""
+    targets = [NotificationTarget.ALL]
+    if user.role == UserRole.PLAYER:
+        targets.append(NotificationTarget.PLAYERS)
+    if user.plan == UserPlan.PRO:
+        targets.append(NotificationTarget.MVP)
+    if user.plan == UserPlan.TEAM:
+        targets.append(NotificationTarget.TEAM)
+    return targets
+
+def notification_email(notification: NotificationCreate):
+    subject = notification.content[:50] + ("..." if len(notification.content) > 50 else "")
+    body = f"<p>{notification.content}</p>"
+    if notification.url:
+        body += f'<p><a href="{notification.url}">Acessar</a></p>'
+    return subject, body
+
+def create_notification(
+    db: Session,
+    notification: NotificationCreate,
+    creator_id: int,
+    delivery_mode: Optional[str] = None,
+) -> Notification:
+    """Cria a notificação e distribui para o público alvo.
+
+    No modo "fanout" as linhas de `user_notifications` entram com um único
+    INSERT ... SELECT; no modo "audience" só a notificação é gravada. Os
+    emails vão para a outbox da mesma forma nos dois modos; o envio fica com
+    o worker de email e pode ser acompanhado por `email_job_id`.
+    """
+    delivery_mode = delivery_mode or settings.NOTIFICATION_DELIVERY_MODE
+    if delivery_mode not in (DELIVERY_FANOUT, DELIVERY_AUDIENCE):
+        raise ValueError(f"Modo de entrega desconhecido: {delivery_mode}")
 
-def create_notification(db: Session, notification: NotificationCreate, creator_id: int) -> Notification:
     db_notification = Notification(
         content=notification.content,
         url=notification.url,
         target=notification.target,
-        created_by=creator_id
+        created_by=creator_id,
+        email_job_id=uuid.uuid4().hex,
+        delivery_mode=delivery_mode,
     )
     db.add(db_notification)
     db.flush()  # Para obter o ID da notificação
 
-    # Criar notificações para os usuários alvo
-    users = db.query(User)
-    if notification.target == NotificationTarget.PLAYERS:
-        users = users.filter(User.role == "player")
-    elif notification.target == NotificationTarget.MVP:
-        users = users.filter(User.role == "mvp")
-    elif notification.target == NotificationTarget.TEAM:
-        users = users.filter(User.role == "team")
-    elif notification.target == NotificationTarget.ADMIN:
-        users = users.filter(User.role == "admin")
-    elif notification.target == NotificationTarget.COACH:
-        users = users.filter(User.role == "coach")
-    elif notification.target == NotificationTarget.ANALYST:
-        users = users.filter(User.role == "analyst")
-
-    for user in users.all():
-        user_notification = UserNotification(
-            user_id=user.id,
-            notification_id=db_notification.id
-        )
-        db.add(user_notification)
-        # Enviar e-mail
-        subject = notification.content[:50] + ("..." if len(notification.content) > 50 else "")
-        body = f"<p>{notification.content}</p>"
-        if notification.url:
-            body += f'<p><a href="{notification.url}">Acessar</a></p>'
-        email_service.send_notification_email(user.email, subject, body)
+    filters = target_filters(notification.target)
+    if delivery_mode == DELIVERY_FANOUT:
+        recipients = select(
+            User.id,
+            literal(db_notification.id),
+            literal(False),
+            literal(datetime.utcnow()),
+        ).where(*filters)
+        db.execute(insert(UserNotification).from_select(
+            ["user_id", "notification_id", "is_read", "created_at"], recipients
+        ))
+
+    subject, body = notification_email(notification)
+    db_notification.recipient_count = enqueue_bulk_email(
+        db, select(User.email).where(*filters), subject, body, db_notification.email_job_id
+    )
 
     db.commit()
+    _discard_unread_past(db_notification.id)
+    notify_outbox()
     db.refresh(db_notification)
     return db_notification
 
+def get_notification_job(db: Session, job_id: str) -> Optional[dict]:
+    notification = db.query(Notification).filter(Notification.email_job_id == job_id).first()
+    if notification is None:
+        return None
+    counts = email_job_status(db, job_id)
+    total = sum(counts.values())
+    return {
+        "job_id": job_id,
+        "notification_id": notification.id,
+        "total": total,
+        **counts,
+        "done": counts["pending"] == 0 and counts["sending"] == 0,
+    }
+
+def get_watermark(db: Session, user_id: int) -> int:
+    watermark = db.query(NotificationWatermark.last_read_id).filter(
+        NotificationWatermark.user_id == user_id
+    ).scalar()
+    return watermark or 0
+
+def audience_filters(user: User) -> list:
+    """Notificações do modo "audience" visíveis para a usuária.
+
+    Só contam as enviadas depois do cadastro, como aconteceria no fan-out.
+    """
+    filters = [
+        Notification.delivery_mode == DELIVERY_AUDIENCE,
+        Notification.target.in_(user_targets(user)),
+    ]
+    if user.created_at is not None:
+        filters.append(Notification.created_at >= user.created_at)
+    return filters
+
+def _audience_read(user_id: int, watermark: int):
+    return or_(
+        Notification.id <= watermark,
+        exists().where(
+            NotificationRead.user_id == user_id,
+            NotificationRead.notification_id == Notification.id,
+        ),
+    )
+
 def get_user_notifications(
     db: Session, 
     user_id: int, 
     skip: int = 0, 
     limit: int = 100,
-    unread_only: bool = False
-) -> List[UserNotification]:
-    query = db.query(UserNotification).filter(UserNotification.user_id == user_id)
-    
+    unread_only: bool = False,
+    cursor: Optional[str] = None
+) -> Page[InboxItem]:
+    """Inbox da usuária: linhas de `user_notifications` mais as notificações por público.
+
+    Paginado por cursor em (created_at, id da notificação).
+    """
+    user = db.get(User, user_id)
+    if user is None:
+        return Page(items=[])
+    watermark = get_watermark(db, user_id)
+
+    fanout = select(
+        UserNotification.notification_id.label("notification_id"),
+        UserNotification.is_read.label("is_read"),
+        UserNotification.created_at.label("created_at"),
+    ).where(UserNotification.user_id == user_id)
+    audience = select(
+        Notification.id.label("notification_id"),
+        _audience_read(user_id, watermark).label("is_read"),
+        Notification.created_at.label("created_at"),
+    ).where(*audience_filters(user))
+    inbox = union_all(fanout, audience).subquery()
+
+    query = select(inbox)
     if unread_only:
-        query = query.filter(UserNotification.is_read == False)
-    
-    return query.order_by(desc(UserNotification.created_at)).offset(skip).limit(limit).all()
+        query = query.where(inbox.c.is_read == False)
+    query = pagination.keyset(query, inbox.c.created_at, inbox.c.notification_id, cursor)
+    page = pagination.build_page(
+        db.execute(query.offset(skip).limit(limit + 1)).all(),
+        limit,
+        key=lambda row: (row.created_at, row.notification_id),
+    )
+    rows = page.items
 
-def mark_notification_as_read(db: Session, notification_id: int, user_id: int) -> Optional[UserNotification]:
-    user_notification = db.query(UserNotification).filter(
-        UserNotification.id == notification_id,
-        UserNotification.user_id == user_id
+    notifications = {
+        notification.id: notification
+        for notification in db.query(Notification).filter(
+            Notification.id.in_([row.notification_id for row in rows])
+        )
+    }
+    page.items = [
+        InboxItem(
+            id=row.notification_id,
+            notification=notifications[row.notification_id],
+            is_read=bool(row.is_read),
+            created_at=row.created_at,
+        )
+        for row in rows
+    ]
+    return page
+
+def _discard_unread_past(notification_id: int) -> None:
+    """Descarta os contadores com `through` >= `notification_id`, que não a contaram."""
+    for key in unread_cache.backend.keys():
+        entry = unread_cache.backend.get(key)
+        if entry is not None and entry["through"] >= notification_id:
+            unread_cache.delete(key)
+
+def _decrement_unread(user_id: int, notification_id: int) -> None:
+    entry = unread_cache.get(_unread_key(user_id))
+    if entry is not None and notification_id <= entry["through"]:
+        unread_cache.set(_unread_key(user_id), {**entry, "count": max(entry["count"] - 1, 0)})
+
+def mark_notification_as_read(db: Session, notification_id: int, user_id: int) -> Optional[Notification]:
+    fanout_filters = (
+        UserNotification.user_id == user_id,
+        UserNotification.notification_id == notification_id,
+    )
+    result = db.execute(
+        update(UserNotification)
+        .where(*fanout_filters, UserNotification.is_read == False)
+        .values(is_read=True)
+    )
+    if result.rowcount:
+        db.commit()
+        _decrement_unread(user_id, notification_id)
+        return db.get(Notification, notification_id)
+    if db.query(exists().where(*fanout_filters)).scalar():
+        return db.get(Notification, notification_id)
+
+    user = db.get(User, user_id)
+    if user is None:
+        return None
+    notification = db.query(Notification).filter(
+        Notification.id == notification_id, *audience_filters(user)
     ).first()
-    
-    if user_notification:
-        user_notification.is_read = True
+    if notification is None:
+        return None
+
+    already_read = notification.id <= get_watermark(db, user_id) or db.get(
+        NotificationRead, (user_id, notification.id)
+    ) is not None
+    if not already_read:
+        db.add(NotificationRead(user_id=user_id, notification_id=notification.id))
         db.commit()
-        db.refresh(user_notification)
-    
-    return user_notification
+        _decrement_unread(user_id, notification.id)
+    return notification
+
+def mark_all_as_read(db: Session, user_id: int) -> int:
+    """Marca todo o inbox como lido: um UPDATE em `user_notifications` e o avanço do watermark."""
+    through = latest_notification_id(db)
+    result = db.execute(
+        update(UserNotification)
+        .where(UserNotification.user_id == user_id, UserNotification.is_read == False)
+        .values(is_read=True)
+    )
+    watermark = db.get(NotificationWatermark, user_id)
+    if watermark is None:
+        db.add(NotificationWatermark(user_id=user_id, last_read_id=through))
+    elif watermark.last_read_id < through:
+        watermark.last_read_id = through
+    # Recibos abaixo do watermark ficam redundantes
+    db.execute(delete(NotificationRead).where(
+        NotificationRead.user_id == user_id,
+        NotificationRead.notification_id <= through,
+    ))
+    db.commit()
+    unread_cache.set(_unread_key(user_id), {"count": 0, "through": through})
+    return result.rowcount
 
 def get_notification_log(
     db: Session,
     skip: int = 0,
-    limit: int = 100
-) -> List[Notification]:
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Page[Notification]:
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
     
-    return db.query(Notification)\
-        .filter(Notification.created_at >= thirty_days_ago)\
-        .order_by(desc(Notification.created_at))\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    query = db.query(Notification)\
+        .options(joinedload(Notification.creator))\
+        .filter(Notification.created_at >= thirty_days_ago)
+    query = pagination.keyset(query, Notification.created_at, Notification.id, cursor)
+    return pagination.build_page(
+        query.offset(skip).limit(limit + 1).all(),
+        limit,
+        key=lambda notification: (notification.created_at, notification.id),
+    )
 
-def get_unread_count(db: Session, user_id: int) -> int:
-    return db.query(UserNotification)\
+def latest_notification_id(db: Session) -> int:
+    # Lida sempre do banco: um valor guardado por processo ficaria defasado entre workers
+    return db.query(func.max(Notification.id)).scalar() or 0
+
+def count_unread(db: Session, user_id: int, after_id: int = 0, through: Optional[int] = None) -> int:
+    """Conta no banco as não lidas com id em (after_id, through]."""
+    fanout = db.query(func.count(UserNotification.id))\
         .filter(
             UserNotification.user_id == user_id,
-            UserNotification.is_read == False
-        ).count() 
\ No newline at end of file
+            UserNotification.is_read == False,
+            UserNotification.notification_id > after_id,
+        )
+    if through is not None:
+        fanout = fanout.filter(UserNotification.notification_id <= through)
+    count = fanout.scalar()
+
+    user = db.get(User, user_id)
+    if user is None:
+        return count
+    watermark = get_watermark(db, user_id)
+    audience = db.query(func.count(Notification.id))\
+        .filter(*audience_filters(user))\
+        .filter(Notification.id > after_id)\
+        .filter(~_audience_read(user_id, watermark))
+    if through is not None:
+        audience = audience.filter(Notification.id <= through)
+    return count + audience.scalar()
+
+def get_unread_count(db: Session, user_id: int) -> int:
+    """Contagem de não lidas servida pelo cache; o banco só conta o que é novo."""
+    latest = latest_notification_id(db)
+    entry = unread_cache.get(_unread_key(user_id))
+    if entry is None:
+        entry = {"count": count_unread(db, user_id, through=latest), "through": latest}
+    elif entry["through"] < latest:
+        entry = {
+            "count": entry["count"] + count_unread(db, user_id, after_id=entry["through"], through=latest),
+            "through": latest,
+        }
+    else:
+        return entry["count"]
+    unread_cache.set(_unread_key(user_id), entry)
+    return entry["count"]
@@ -0,0 +1,244 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, extract, insert, select, delete, literal, null, tuple_
+from datetime import datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+from app.models.game import Game
+from app.models.statistic import Statistic
+from app.crud.statistic import UPSERT_DIALECTS
+from app.models.statistic_rollup import (
+    StatisticRollup,
+    ROLLUP_GAME,
+    ROLLUP_GAME_QUARTER,
+    ROLLUP_GAME_PLAYER,
+    ROLLUP_SEASON_PLAYER,
+    ROLLUP_MONTH_PLAYER,
+    ROLLUP_SEASON,
+    ROLLUP_KEY,
+)
+
+# Colunas de Statistic somadas nos rollups
+ROLLUP_FIELDS = (
+    "points",
+    "rebounds",
+    "assists",
+    "steals",
+    "blocks",
+    "fouls",
+    "minutes_played",
+    "two_attempts",
+    "two_made",
+    "three_attempts",
+    "three_made",
+    "free_throw_attempts",
+    "free_throw_made",
+    "interference",
+)
+
+GAME_LEVELS = (ROLLUP_GAME, ROLLUP_GAME_QUARTER, ROLLUP_GAME_PLAYER)
+SEASON_LEVELS = (ROLLUP_SEASON_PLAYER, ROLLUP_MONTH_PLAYER, ROLLUP_SEASON)
+
+# (level, season, game_id, player_id, quarter, month)
+RollupKey = Tuple[str, int, Optional[int], Optional[int], Optional[int], Optional[int]]
+
+def statistic_values(statistic: Union[Statistic, Mapping[str, Any]]) -> Dict[str, float]:
+    # Aceita também a imagem anterior (dict) devolvida por upsert_statistic
+    if isinstance(statistic, Mapping):
+        return {field: statistic.get(field) or 0 for field in ROLLUP_FIELDS}
+    return {field: getattr(statistic, field) or 0 for field in ROLLUP_FIELDS}
+
+def diff_values(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, float]:
+    return {field: after[field] - before[field] for field in ROLLUP_FIELDS}
+
+def _rollup_keys(season: int, month: int, game_id: int, player_id: int, quarter: Optional[int]):
+    # (level, season, game_id, player_id, quarter, month)
+    return [
+        (ROLLUP_GAME, season, game_id, None, None, None),
+        (ROLLUP_GAME_QUARTER, season, game_id, None, quarter, None),
+        (ROLLUP_GAME_PLAYER, season, game_id, player_id, None, None),
+        (ROLLUP_SEASON_PLAYER, season, None, player_id, None, None),
+        (ROLLUP_MONTH_PLAYER, season, None, player_id, None, month),
+        (ROLLUP_SEASON, season, None, None, None, None),
+    ]
+
+def _match(column, value):
+    return column.is_(None) if value is None else column == value
+
+def _get_rollup(db: Session, level, season, game_id, player_id, quarter, month) -> Optional[StatisticRollup]:
+    # FOR UPDATE: segura a linha até o commit, sem perder a soma de um escritor concorrente
+    return db.query(StatisticRollup).filter(
+        StatisticRollup.level == level,
+        StatisticRollup.season == season,
+        _match(StatisticRollup.game_id, game_id),
+        _match(StatisticRollup.player_id, player_id),
+        _match(StatisticRollup.quarter, quarter),
+        _match(StatisticRollup.month, month),
+    ).with_for_update().first()
+
+def accumulate(
+    totals: Dict[RollupKey, Dict[str, float]],
+    game_id: int,
+    game_date: datetime,
+    player_id: int,
+    quarter: Optional[int],
+    delta: Dict[str, float],
+    count_delta: int = 0,
+) -> None:
+    """Soma a variação de uma estatística em `totals`, por chave de rollup."""
+    for key in _rollup_keys(game_date.year, game_date.month, game_id, player_id, quarter):
+        row = totals.get(key)
+        if row is None:
+            row = totals[key] = dict.fromkeys(("stat_count",) + ROLLUP_FIELDS, 0)
+        row["stat_count"] += count_delta
+        for field, value in delta.items():
+            row[field] += value
+
+def _key_values(key: RollupKey) -> Dict[str, object]:
+    return dict(zip(("level", "season", "game_id", "player_id", "quarter", "month"), key))
+
+def _apply_locked(db: Session, totals: Dict[RollupKey, Dict[str, float]]) -> None:
+    # Bancos sem upsert nativo: SELECT ... FOR UPDATE e soma no ORM
+    for key, values in totals.items():
+        rollup = _get_rollup(db, *key)
+        if rollup is None:
+            rollup = StatisticRollup(**_key_values(key), stat_count=0, **{field: 0 for field in ROLLUP_FIELDS})
+            db.add(rollup)
+        for field, value in values.items():
+            setattr(rollup, field, (getattr(rollup, field) or 0) + value)
+    db.flush()
+
+def apply_totals(db: Session, totals: Dict[RollupKey, Dict[str, float]]) -> None:
+    """Aplica as variações acumuladas por `accumulate`, uma linha por chave.
+
+    Em PostgreSQL e SQLite é um único `INSERT ... ON CONFLICT DO UPDATE`
+    que soma no próprio banco (`col = statistic_rollups.col + excluded.col`):
+    escritores concorrentes não perdem atualizações nem duplicam a chave.
+    Recortes que ficam sem estatísticas são apagados. Não faz commit: as
+    alterações entram na mesma transação da escrita em `statistics`.
+    """
+    if not totals:
+        return
+    insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        _apply_locked(db, totals)
+    else:
+        now = datetime.utcnow()
+        stmt = insert(StatisticRollup).values([
+            {**_key_values(key), **values, "updated_at": now} for key, values in totals.items()
+        ])
+        summed = {
+            field: func.coalesce(getattr(StatisticRollup, field), 0) + stmt.excluded[field]
+            for field in ("stat_count",) + ROLLUP_FIELDS
+        }
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={**summed, "updated_at": stmt.excluded.updated_at},
+        ))
+
+    emptied = [key for key, values in totals.items() if values["stat_count"] < 0]
+    if emptied:
+        db.execute(delete(StatisticRollup).where(
+            tuple_(*ROLLUP_KEY).in_([tuple(-1 if value is None else value for value in key) for key in emptied]),
+            StatisticRollup.stat_count <= 0,
+        ))
+
+def apply_delta(
+    db: Session,
+    game: Game,
+    player_id: int,
+    quarter: Optional[int],
+    delta: Dict[str, float],
+    count_delta: int = 0,
+) -> None:
+    """Aplica a variação de uma estatística a todos os rollups afetados (sem commit)."""
+    totals: Dict[RollupKey, Dict[str, float]] = {}
+    accumulate(totals, game.id, game.date, player_id, quarter, delta, count_delta)
+    apply_totals(db, totals)
+
+def add_statistic(db: Session, statistic: Statistic, game: Game) -> None:
+    apply_delta(db, game, statistic.player_id, statistic.quarter, statistic_values(statistic), 1)
+
+def remove_statistic(db: Session, statistic: Statistic, game: Game) -> None:
+    negative = {field: -value for field, value in statistic_values(statistic).items()}
+    apply_delta(db, game, statistic.player_id, statistic.quarter, negative, -1)
+
+def monthly_player_rollups(db: Session, player_id: int, season: int) -> Dict[int, StatisticRollup]:
+    """Totais mensais de uma jogadora na temporada, por mês (1-12); uma consulta indexada."""
+    return {
+        rollup.month: rollup
+        for rollup in db.query(StatisticRollup).filter(
+            StatisticRollup.level == ROLLUP_MONTH_PLAYER,
+            StatisticRollup.season == season,
+            StatisticRollup.player_id == player_id,
+        )
+    }
+
+def _insert_from_statistics(db: Session, level: str, group_by: Dict[str, object], *filters) -> None:
+    season = extract("year", Game.date)
+    keys = {"season": season, "game_id": null(), "player_id": null(), "quarter": null(), "month": null()}
+    keys.update(group_by)
+    columns = [
+        literal(level).label("level"),
+        *[value.label(name) for name, value in keys.items()],
+        func.count(Statistic.id).label("stat_count"),
+        *[func.coalesce(func.sum(getattr(Statistic, field)), 0).label(field) for field in ROLLUP_FIELDS],
+        literal(datetime.utcnow()).label("updated_at"),
+    ]
+    group_columns = [season] + [value for name, value in group_by.items()]
+    query = select(*columns).select_from(Statistic).join(
+        Game, Game.id == Statistic.game_id
+    ).where(*filters).group_by(*group_columns)
+    db.execute(insert(StatisticRollup).from_select([c.name for c in columns], query))
+
+def rebuild_rollups(
+    db: Session,
+    game_ids: Optional[Iterable[int]] = None,
+    seasons: Optional[Iterable[int]] = None,
+) -> None:
+    """Recalcula os rollups a partir de `statistics` com consultas em lote.
+
+    Sem argumentos recalcula tudo (backfill). Com `game_ids`, refaz os
+    recortes desses jogos e os totais (anuais e mensais) das temporadas
+    afetadas; `seasons` permite incluir temporadas extras (ex.: quando a
+    data de um jogo muda de ano). Não faz commit.
+    """
+    db.flush()
+    game_filters = []
+    season_filters = []
+    if game_ids is not None:
+        game_ids = list(game_ids)
+        seasons = set(seasons or [])
+        seasons.update(
+            year for year, in db.query(extract("year", Game.date)).filter(Game.id.in_(game_ids)).all()
+        )
+        game_filters = [Statistic.game_id.in_(game_ids)]
+        season_filters = [extract("year", Game.date).in_(seasons)]
+        db.execute(delete(StatisticRollup).where(
+            StatisticRollup.level.in_(GAME_LEVELS),
+            StatisticRollup.game_id.in_(game_ids),
+        ))
+        db.execute(delete(StatisticRollup).where(
+            StatisticRollup.level.in_(SEASON_LEVELS),
+            StatisticRollup.season.in_(seasons),
+        ))
+    else:
+        db.execute(delete(StatisticRollup))
+
+    _insert_from_statistics(db, ROLLUP_GAME, {"game_id": Statistic.game_id}, *game_filters)
+    _insert_from_statistics(
+        db, ROLLUP_GAME_QUARTER,
+        {"game_id": Statistic.game_id, "quarter": Statistic.quarter},
+        *game_filters,
+    )
+    _insert_from_statistics(
+        db, ROLLUP_GAME_PLAYER,
+        {"game_id": Statistic.game_id, "player_id": Statistic.player_id},
+        *game_filters,
+    )
+    _insert_from_statistics(db, ROLLUP_SEASON_PLAYER, {"player_id": Statistic.player_id}, *season_filters)
+    _insert_from_statistics(
+        db, ROLLUP_MONTH_PLAYER,
+        {"player_id": Statistic.player_id, "month": extract("month", Game.date)},
+        *season_filters,
+    )
+    _insert_from_statistics(db, ROLLUP_SEASON, {}, *season_filters)
+    db.expire_all()
@@ -0,0 +1,63 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from app.models.statistic import Statistic
+
+# Chave natural de uma linha de estatística (uq_statistics_game_player_quarter)
+NATURAL_KEY = ("game_id", "player_id", "quarter")
+
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def upsert_statistic(db: Session, values: Dict[str, Any]) -> Tuple[Statistic, Optional[Dict[str, Any]]]:
+    """Insere ou atualiza a estatística de (jogo, jogadora, quarto).
+
+    Retorna a linha gravada e a imagem anterior (dict com as colunas antigas,
+    ou None se a linha foi criada), para os rollups receberem só a diferença.
+    Em PostgreSQL e SQLite tenta `INSERT ... ON CONFLICT DO NOTHING RETURNING`;
+    se a linha já existe, lê os valores antigos com `SELECT ... FOR UPDATE`
+    e atualiza. Com dois scouts gravando ao mesmo tempo a linha não duplica
+    e a imagem anterior de cada um é a que ele de fato sobrescreveu.
+    Não faz commit.
+    """
+    now = datetime.utcnow()
+    values = dict(values, created_at=now, updated_at=now)
+    key = [getattr(Statistic, field) == values[field] for field in NATURAL_KEY]
+    insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+
+    if insert is None:
+        statistic = db.query(Statistic).filter(*key).with_for_update().first()
+        if statistic is None:
+            statistic = Statistic(**values)
+            db.add(statistic)
+            db.flush()
+            return statistic, None
+        before = {column.name: getattr(statistic, column.name) for column in Statistic.__table__.columns}
+        values.pop("created_at")
+        for field, value in values.items():
+            setattr(statistic, field, value)
+        db.flush()
+        return statistic, before
+
+    stmt = insert(Statistic).values(**values).on_conflict_do_nothing(
+        index_elements=list(NATURAL_KEY),
+    ).returning(Statistic)
+    statistic = db.scalars(stmt, execution_options={"populate_existing": True}).first()
+    if statistic is not None:
+        return statistic, None
+
+    before = db.execute(select(Statistic.__table__).where(*key).with_for_update()).mappings().one()
+    update_fields = {
+        field: value
+        for field, value in values.items()
+        if field not in NATURAL_KEY and field != "created_at"
+    }
+    statistic = db.scalars(
+        update(Statistic).where(Statistic.id == before["id"]).values(**update_fields).returning(Statistic),
+        execution_options={"populate_existing": True, "synchronize_session": False},
+    ).one()
+    return statistic, dict(before)
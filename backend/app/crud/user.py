@@ -1,10 +1,13 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc
-from typing import List, Optional
+from sqlalchemy import or_
+from typing import Optional
+from app.core import pagination
+from app.core.pagination import Page
 from app.models.user import User, UserRole, UserPlan
 from app.schemas.user import UserCreate, UserUpdate, UserFilter, UserPagination
 from app.core.security import get_password_hash
 from app.core.email import email_service
+from app.core.identity import invalidate_user_identity
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
@@ -15,8 +18,13 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
 def get_users(
     db: Session,
     filters: UserFilter,
-    pagination: UserPagination
-) -> tuple[List[User], int]:
+    page_params: UserPagination
+) -> Page[User]:
+    """Usuários mais recentes primeiro, paginados por cursor em (created_at, id).
+
+    O total só é calculado quando pedido (`total`), exato ou estimado.
+    Levanta InvalidCursor se o cursor não for válido.
+    """
     query = db.query(User)
 
     if filters.name:
@@ -33,13 +41,15 @@ def get_users(
     if filters.is_active is not None:
         query = query.filter(User.is_active == filters.is_active)
 
-    total = query.count()
-    users = query.order_by(desc(User.created_at))\
-        .offset(pagination.skip)\
-        .limit(pagination.limit)\
-        .all()
-
-    return users, total
+    total, estimated = pagination.count_total(db, query, page_params.total)
+    query = pagination.keyset(query, User.created_at, User.id, page_params.cursor)
+    page = pagination.build_page(
+        query.offset(page_params.skip).limit(page_params.limit + 1).all(),
+        page_params.limit,
+        key=lambda user: (user.created_at, user.id),
+    )
+    page.total, page.total_estimated = total, estimated
+    return page
 
 def create_user(db: Session, user: UserCreate) -> User:
     hashed_password = get_password_hash(user.password)
@@ -59,8 +69,10 @@ def create_user(db: Session, user: UserCreate) -> User:
         email_service.send_notification_email(
             to_email=db_user.email,
             subject="Ativação de Conta - ScoreMVP",
-            body=f"Olá {db_user.name}, sua conta foi criada com sucesso!"
+            body=f"Olá {db_user.name}, sua conta foi criada com sucesso!",
+            db=db,
         )
+        db.commit()
 
     return db_user
 
@@ -73,11 +85,13 @@ def update_user(
     if not db_user:
         return None
 
+    email_anterior = db_user.email
     update_data = user_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_user, field, value)
 
     db.commit()
+    invalidate_user_identity(user_id, email_anterior, db_user.email)
     db.refresh(db_user)
     return db_user
 
@@ -86,8 +100,10 @@ def delete_user(db: Session, user_id: int) -> bool:
     if not db_user:
         return False
 
+    email = db_user.email
     db.delete(db_user)
     db.commit()
+    invalidate_user_identity(user_id, email)
     return True
 
 def update_subscription(
@@ -108,6 +124,7 @@ def update_subscription(
     db_user.card_brand = card_brand
 
     db.commit()
+    invalidate_user_identity(user_id, db_user.email)
     db.refresh(db_user)
     return db_user
 
@@ -124,5 +141,6 @@ def cancel_subscription(db: Session, user_id: int) -> Optional[User]:
     db_user.next_payment_date = None
 
     db.commit()
+    invalidate_user_identity(user_id, db_user.email)
     db.refresh(db_user)
     return db_user 
\ No newline at end of file
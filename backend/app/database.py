@@ -1,25 +1,65 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.db_pool import engine_options
 
 # Usar DATABASE_URL do ambiente diretamente, com fallback para settings
 import os
 DATABASE_URL = os.getenv("DATABASE_URL") or settings.SQLALCHEMY_DATABASE_URI
 
+# Driver assíncrono equivalente a cada driver síncrono suportado
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    """Converte a URL síncrona (psycopg2/pysqlite) para o driver assíncrono."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    query = dict(parsed.query)
+    # asyncpg não entende sslmode da libpq
+    if drivername == "postgresql+asyncpg" and "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername=drivername, query=query).render_as_string(hide_password=False)
+
 # Configuracao do engine
 engine = create_engine(
     DATABASE_URL, 
-    pool_pre_ping=True,
-    echo=False  # Set to True for SQL debugging
+    echo=False,  # Set to True for SQL debugging
+    **engine_options(DATABASE_URL, QueuePool)
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Engine assíncrono para as rotas de leitura mais acessadas, que rodam no
+# event loop em vez de ocupar o threadpool do Starlette
+ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    **engine_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool)
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -10,8 +10,12 @@ from app.routes.leads import router as leads_router
 from app.core.config import settings
 from app.routes.dashboard import router as dashboard_router
 from app.routes.profile import router as profile_router
+from app.routes.notifications import router as notifications_router
 import logging
-from app.database import engine, Base
+from app.database import engine, async_engine, Base
+from app.core.db_pool import pool_status
+from app.core.pagination import CURSOR_HEADER, TOTAL_HEADER, ESTIMATE_HEADER
+from app.services.email_worker import email_worker
 
 # Importar todos os modelos para garantir que sejam carregados
 from app.models import (
@@ -57,6 +61,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Permite ao frontend ler o cursor e o total da paginação
+    expose_headers=[CURSOR_HEADER, TOTAL_HEADER, ESTIMATE_HEADER],
 )
 
 # Incluir routers
@@ -68,10 +74,20 @@ app.include_router(stats_router, prefix="/api")
 app.include_router(dashboard_router, prefix="/api")
 app.include_router(profile_router, prefix="/api")
 app.include_router(leads_router, prefix="/api")  # Adicionar prefix /api
+app.include_router(notifications_router, prefix="/api")
 
 # Montar arquivos estáticos
 app.mount("/media", StaticFiles(directory=MEDIA_DIR), name="media")
 
+@app.on_event("startup")
+def start_email_worker():
+    if settings.EMAIL_WORKER_ENABLED:
+        email_worker.start()
+
+@app.on_event("shutdown")
+def stop_email_worker():
+    email_worker.stop()
+
 @app.get("/")
 def root():
     logger.info("Root endpoint accessed")
@@ -82,6 +98,14 @@ def health_check():
     logger.info("Health check endpoint accessed")
     return {"status": "ok"}
 
+@app.get("/health/db")
+def health_db():
+    # Conexões em uso/ociosas e espera por conexão de cada pool deste worker
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
+
 @app.get("/api/debug-db-url")
 def debug_db_url():
     logger.info(f"Database URL: {settings.SQLALCHEMY_DATABASE_URI}")
@@ -8,8 +8,12 @@ from app.models.user import User, UserRole, UserPlan
 from app.models.game import Game
 from app.models.player import Player
 from app.models.statistic import Statistic
+from app.models.statistic_rollup import StatisticRollup
 from app.models.lead import Lead
-from app.models.notification import Notification, UserNotification, NotificationTarget
+from app.models.email_outbox import EmailOutbox
+from app.models.notification import (
+    Notification, UserNotification, NotificationTarget, NotificationRead, NotificationWatermark
+)
 
 # Para garantir que o Alembic detecte todos os modelos
 __all__ = [
@@ -20,8 +24,12 @@ __all__ = [
     "Game",
     "Player",
     "Statistic",
+    "StatisticRollup",
     "Lead",
+    "EmailOutbox",
     "Notification",
     "UserNotification",
-    "NotificationTarget"
+    "NotificationTarget",
+    "NotificationRead",
+    "NotificationWatermark"
 ] 
\ No newline at end of file
@@ -1,10 +1,16 @@
 from app.models.base import Base, game_player
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 class Game(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        # Listagem de jogos do usuário (games.py) e checagens de dono
+        Index("ix_games_owner_date", "owner_id", "date"),
+        # Filtros de período do dashboard e da exportação
+        Index("ix_games_date", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     opponent = Column(String, nullable=False)
@@ -9,4 +9,4 @@ class Lead(Base):
     nome = Column(String, nullable=False)
     email = Column(String, nullable=False)
     telefone = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow) 
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -10,15 +10,27 @@ class NotificationTarget(enum.Enum):
     MVP = "mvp"
     TEAM = "team"
 
+# Modos de entrega: uma linha em user_notifications por destinatária, ou só a
+# notificação, com o inbox calculado pelo público alvo (recibos + watermark)
+DELIVERY_FANOUT = "fanout"
+DELIVERY_AUDIENCE = "audience"
+
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_delivery_target_created", "delivery_mode", "target", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(String(250), nullable=False)
     url = Column(String(255), nullable=True)
     target = Column(Enum(NotificationTarget), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    recipient_count = Column(Integer, nullable=False, default=0)
+    # Job da outbox com os emails desta notificação (ver app/core/email.py)
+    email_job_id = Column(String(32), nullable=True, unique=True, index=True)
+    delivery_mode = Column(String(16), nullable=False, default=DELIVERY_FANOUT)
     
     # Relacionamentos
     creator = relationship("User", back_populates="sent_notifications")
@@ -26,13 +38,32 @@ class Notification(Base):
 
 class UserNotification(Base):
     __tablename__ = "user_notifications"
+    __table_args__ = (
+        Index("ix_user_notifications_user_notification", "user_id", "notification_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     notification_id = Column(Integer, ForeignKey("notifications.id"), nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relacionamentos
     user = relationship("User", back_populates="notifications")
-    notification = relationship("Notification", back_populates="user_notifications") 
\ No newline at end of file
+    notification = relationship("Notification", back_populates="user_notifications")
+
+class NotificationRead(Base):
+    """Recibo de leitura de uma notificação entregue por público (modo "audience")."""
+    __tablename__ = "notification_reads"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    notification_id = Column(Integer, ForeignKey("notifications.id"), primary_key=True)
+    read_at = Column(DateTime, default=datetime.utcnow)
+
+class NotificationWatermark(Base):
+    """Notificações por público com id <= `last_read_id` contam como lidas."""
+    __tablename__ = "notification_watermarks"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_read_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,18 +1,47 @@
+import unicodedata
+
 from app.models.base import Base, game_player
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+
+
+def search_key(text: str) -> str:
+    """Forma normalizada usada na busca: sem acentos, minúscula e com espaços simples."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+
+def _default_search_name(context) -> str:
+    # Vale também para INSERTs em lote do Core (ex.: importação de estatísticas)
+    return search_key(context.get_current_parameters().get("name"))
+
 
 class Player(Base):
     __tablename__ = "players"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
+    # Ordenação binária (collation "C" no Postgres): o mesmo índice atende a
+    # busca por prefixo (intervalo) e a ordenação do diretório
+    search_name = Column(
+        String().with_variant(String(collation="C"), "postgresql"),
+        nullable=False,
+        index=True,
+        default=_default_search_name,
+    )
     number = Column(Integer, nullable=True)
     position = Column(String, nullable=True)
     categoria = Column(String, nullable=True)
     active = Column(Boolean, default=True)
+    # Conta da própria jogadora, usada nas estatísticas do perfil
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, unique=True, index=True)
     created_at = Column(DateTime, server_default="now()")
 
     # Relacionamentos
     games = relationship("Game", secondary=game_player, back_populates="players")
-    statistics = relationship("Statistic", back_populates="player") 
\ No newline at end of file
+    statistics = relationship("Statistic", back_populates="player")
+
+    @validates("name")
+    def _sync_search_name(self, key, value):
+        self.search_name = search_key(value)
+        return value
@@ -1,10 +1,17 @@
 from app.models.base import Base
-from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 class Statistic(Base):
     __tablename__ = "statistics"
+    __table_args__ = (
+        # Uma linha por jogadora, jogo e quarto; alvo do ON CONFLICT no upsert
+        # Também atende os filtros por jogo (e jogo + quarto) de estatisticas.py
+        UniqueConstraint("game_id", "player_id", "quarter", name="uq_statistics_game_player_quarter"),
+        # Estatísticas de uma jogadora (exportação, médias por jogadora)
+        Index("ix_statistics_player_game", "player_id", "game_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
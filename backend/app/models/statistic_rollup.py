@@ -0,0 +1,69 @@
+from app.models.base import Base
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Index, func, literal_column
+from datetime import datetime
+
+# Níveis de agregação mantidos na tabela de rollups
+ROLLUP_GAME = "game"
+ROLLUP_GAME_QUARTER = "game_quarter"
+ROLLUP_GAME_PLAYER = "game_player"
+ROLLUP_SEASON_PLAYER = "season_player"
+ROLLUP_MONTH_PLAYER = "month_player"
+ROLLUP_SEASON = "season"
+
+class StatisticRollup(Base):
+    """Totais pré-agregados de `statistics`, atualizados a cada escrita.
+
+    Cada linha guarda a soma das estatísticas de um recorte (`level`):
+    jogo, jogo + quarto, jogo + jogadora, temporada + jogadora, mês +
+    jogadora (`season` + `month`) e temporada. As colunas que não fazem
+    parte do recorte ficam nulas. A chave do recorte é única
+    (`uq_statistic_rollups_key`), o que permite somar as variações com
+    `INSERT ... ON CONFLICT DO UPDATE`.
+    """
+    __tablename__ = "statistic_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    level = Column(String, nullable=False)
+    season = Column(Integer, nullable=False)
+    game_id = Column(Integer, ForeignKey("games.id"), nullable=True)
+    player_id = Column(Integer, ForeignKey("players.id"), nullable=True)
+    quarter = Column(Integer, nullable=True)
+    month = Column(Integer, nullable=True)
+    stat_count = Column(Integer, nullable=False, default=0)
+    points = Column(Integer, default=0)
+    rebounds = Column(Integer, default=0)
+    assists = Column(Integer, default=0)
+    steals = Column(Integer, default=0)
+    blocks = Column(Integer, default=0)
+    fouls = Column(Integer, default=0)
+    minutes_played = Column(Float, default=0.0)
+    two_attempts = Column(Integer, default=0)
+    two_made = Column(Integer, default=0)
+    three_attempts = Column(Integer, default=0)
+    three_made = Column(Integer, default=0)
+    free_throw_attempts = Column(Integer, default=0)
+    free_throw_made = Column(Integer, default=0)
+    interference = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_statistic_rollups_level_game", "level", "game_id", "quarter", "player_id"),
+        Index("ix_statistic_rollups_level_season", "level", "season", "player_id"),
+    )
+
+# Chave do recorte com os NULLs trocados por -1: NULL nunca conflita num
+# índice único, e NULLS NOT DISTINCT só existe a partir do Postgres 15
+ROLLUP_KEY = (
+    StatisticRollup.level,
+    StatisticRollup.season,
+    *[
+        func.coalesce(column, literal_column("-1"))
+        for column in (
+            StatisticRollup.game_id,
+            StatisticRollup.player_id,
+            StatisticRollup.quarter,
+            StatisticRollup.month,
+        )
+    ],
+)
+Index("uq_statistic_rollups_key", *ROLLUP_KEY, unique=True)
@@ -1,21 +1,25 @@
 # backend/app/routes/auth.py
+import logging
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
 from app.schemas.user import UserResponse, UserCreate
 from app.schemas.token import Token
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
-    get_current_user,
+    get_current_user_async,
 )
-from app.database import get_db
+from app.database import get_async_db
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/auth",
     tags=["auth"],
@@ -27,26 +31,27 @@ router = APIRouter(
     status_code=status.HTTP_201_CREATED,
     summary="Registra um novo usuário",
 )
-def register(
+async def register(
     user_in: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Verifica se o usuário já existe
-    if db.query(User).filter(User.email == user_in.email).first():
+    result = await db.execute(select(User.id).where(User.email == user_in.email))
+    if result.first():
         raise HTTPException(
             status_code=400,
             detail="Email já registrado",
         )
     
-    # Cria o novo usuário
+    # Cria o novo usuário; o bcrypt roda no pool dedicado, como no login
     user = User(
         name=user_in.name,
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.post(
@@ -56,15 +61,12 @@ def register(
 )
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    print("[DEBUG] LOGIN ENDPOINT CHAMADO")
-    print("[DEBUG] form_data.username:", form_data.username)
-    print("[DEBUG] form_data.password:", form_data.password)
-    user = db.query(User).filter(User.email == form_data.username).first()
-    print("[DEBUG] user:", user)
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        print("[DEBUG] Usuário não encontrado ou senha inválida")
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
+        logger.debug(f"Login recusado para {form_data.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -74,7 +76,7 @@ async def login(
         subject=user.email,
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    print("[DEBUG] Login bem-sucedido para:", user.email)
+    logger.debug(f"Login bem-sucedido para {user.email}")
     return Token(
         access_token=access_token,
         token_type="bearer",
@@ -86,7 +88,7 @@ async def login(
     response_model=UserResponse,
     summary="Retorna informações do usuário logado",
 )
-def read_users_me(
-    current_user: User = Depends(get_current_user),
+async def read_users_me(
+    current_user: User = Depends(get_current_user_async),
 ):
     return current_user
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date
+import json
 import logging
 
-from app.database import get_db
+from app.database import get_async_db
 from app import models, schemas
-from app.core.security import get_current_user
+from app.core.security import get_current_identity_async
+from app.core.identity import UserIdentity
+from app.core.cache import dashboard_cache
+from app.core.etag import make_etag, is_not_modified, not_modified_response
 from app.models.base import game_player
+from app.models.statistic_rollup import ROLLUP_GAME, ROLLUP_GAME_QUARTER, ROLLUP_GAME_PLAYER
+from app.services import stats_analytics
 
 router = APIRouter(
     prefix="/dashboard",
@@ -17,34 +24,106 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-def get_stats_query(db: Session, data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None):
-    query = db.query(models.Game)
-
+def get_periodo(data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None):
     # Se nenhuma data for fornecida, assume o ano corrente como padrão
     if data_inicio is None and data_fim is None:
         current_year = date.today().year
         data_inicio = datetime(current_year, 1, 1)
         data_fim = datetime(current_year, 12, 31, 23, 59, 59)
+    return data_inicio, data_fim
+
+def get_stats_query(data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None):
+    query = select(models.Game)
+    data_inicio, data_fim = get_periodo(data_inicio, data_fim)
 
     if data_inicio:
-        query = query.filter(models.Game.date >= data_inicio)
+        query = query.where(models.Game.date >= data_inicio)
     if data_fim:
-        query = query.filter(models.Game.date <= data_fim)
+        query = query.where(models.Game.date <= data_fim)
     return query
 
+def get_jogos_query(data_inicio: Optional[datetime], data_fim: Optional[datetime], jogo_id: Optional[int]):
+    if jogo_id:
+        return select(models.Game).where(models.Game.id == jogo_id)
+    return get_stats_query(data_inicio, data_fim)
+
+def media(total, linhas) -> float:
+    # Média por linha de estatística, como o AVG() sobre `statistics`
+    return round(total / linhas, 2) if linhas else 0
+
+def _sem_fuso(valor: Optional[datetime]) -> Optional[datetime]:
+    return valor.replace(tzinfo=None) if valor is not None else None
+
+async def cached_response(request: Request, response: Response, endpoint: str, data_inicio, data_fim, jogo_id, calcular):
+    """Devolve a resposta do cache ou calcula e armazena por (endpoint, filtros).
+
+    O ETag é calculado uma vez, quando a resposta entra no cache, e
+    responde 304 a clientes que já têm a mesma versão.
+    """
+    cache_key = dashboard_cache.make_key(endpoint, data_inicio, data_fim, jogo_id)
+    entrada = dashboard_cache.get(cache_key)
+    if entrada is None:
+        dados = jsonable_encoder(await calcular())
+        entrada = {
+            "etag": make_etag(endpoint, json.dumps(dados, sort_keys=True)),
+            "dados": dados,
+        }
+        dashboard_cache.set(cache_key, entrada)
+
+    if is_not_modified(request, entrada["etag"]):
+        return not_modified_response(entrada["etag"])
+    response.headers["ETag"] = entrada["etag"]
+    return entrada["dados"]
+
+def invalidate_dashboard_cache(game_id: int, *datas: datetime) -> int:
+    """Remove do cache as respostas que podem incluir o jogo informado.
+
+    `datas` são as datas do jogo a considerar (ex.: a antiga e a nova
+    quando um jogo é remarcado).
+    """
+    datas = [_sem_fuso(d) for d in datas if d is not None]
+
+    def afetada(partes) -> bool:
+        # só as chaves de `cached_response` (endpoint, início, fim, jogo)
+        if not isinstance(partes, list) or len(partes) != 4:
+            return False
+        _, data_inicio, data_fim, jogo_id = partes
+        if jogo_id is not None:
+            return jogo_id == game_id
+        data_inicio, data_fim = get_periodo(
+            datetime.fromisoformat(data_inicio) if data_inicio else None,
+            datetime.fromisoformat(data_fim) if data_fim else None,
+        )
+        data_inicio, data_fim = _sem_fuso(data_inicio), _sem_fuso(data_fim)
+        return any(
+            (data_inicio is None or d >= data_inicio) and (data_fim is None or d <= data_fim)
+            for d in datas
+        )
+
+    return dashboard_cache.invalidate(afetada)
+
+@router.get("/cache/stats", response_model=Dict[str, Any])
+async def get_cache_stats(
+    current_user: UserIdentity = Depends(get_current_identity_async),
+):
+    return dashboard_cache.stats()
+
 @router.get("/public/overview", response_model=Dict[str, Any])
-def get_public_overview(
+async def get_public_overview(
+    request: Request,
+    response: Response,
     data_inicio: Optional[datetime] = Query(None),
     data_fim: Optional[datetime] = Query(None),
     jogo_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    if jogo_id:
-        jogos_query = db.query(models.Game).filter(models.Game.id == jogo_id)
-    else:
-        jogos_query = get_stats_query(db, data_inicio, data_fim)
+    return await cached_response(
+        request, response, "overview", data_inicio, data_fim, jogo_id,
+        lambda: overview_stats(db, data_inicio, data_fim, jogo_id),
+    )
 
-    jogos = jogos_query.all()
+async def overview_stats(db: AsyncSession, data_inicio: Optional[datetime], data_fim: Optional[datetime], jogo_id: Optional[int]):
+    jogos = (await db.execute(get_jogos_query(data_inicio, data_fim, jogo_id))).scalars().all()
     jogos_ids = [j.id for j in jogos]
     
     logger.info(f"Dashboard overview: jogos_ids={jogos_ids}")
@@ -69,49 +148,49 @@ def get_public_overview(
 
     total_jogos = len(jogos)
 
-    estatisticas_gerais = db.query(
-        func.sum(models.Statistic.points).label('total_pontos'),
-        func.sum(models.Statistic.assists).label('total_assistencias'),
-        func.sum(models.Statistic.rebounds).label('total_rebotes'),
-        func.sum(models.Statistic.steals).label('total_roubos'),
-        func.sum(models.Statistic.fouls).label('total_faltas'),
-        func.avg(models.Statistic.points).label('media_pontos'),
-        func.avg(models.Statistic.assists).label('media_assistencias'),
-        func.avg(models.Statistic.rebounds).label('media_rebotes'),
-        func.avg(models.Statistic.steals).label('media_roubos'),
-        func.avg(models.Statistic.fouls).label('media_faltas')
-    ).filter(
-        models.Statistic.game_id.in_(jogos_ids)
-    ).first()
-
-    jogadora_mais_pontos = db.query(
+    # Totais lidos dos rollups por jogo, mantidos a cada escrita em `statistics`
+    Rollup = models.StatisticRollup
+    estatisticas_gerais = (await db.execute(select(
+        func.sum(Rollup.points).label('total_pontos'),
+        func.sum(Rollup.assists).label('total_assistencias'),
+        func.sum(Rollup.rebounds).label('total_rebotes'),
+        func.sum(Rollup.steals).label('total_roubos'),
+        func.sum(Rollup.fouls).label('total_faltas'),
+        func.sum(Rollup.stat_count).label('total_linhas')
+    ).where(
+        Rollup.level == ROLLUP_GAME,
+        Rollup.game_id.in_(jogos_ids)
+    ))).first()
+
+    jogadora_mais_pontos = (await db.execute(select(
         models.Player,
-        func.sum(models.Statistic.points).label('total_pontos')
+        func.sum(Rollup.points).label('total_pontos')
     ).join(
-        models.Statistic
-    ).filter(
-        models.Statistic.game_id.in_(jogos_ids)
+        Rollup, Rollup.player_id == models.Player.id
+    ).where(
+        Rollup.level == ROLLUP_GAME_PLAYER,
+        Rollup.game_id.in_(jogos_ids)
     ).group_by(
         models.Player.id
     ).order_by(
-        func.sum(models.Statistic.points).desc()
-    ).first()
+        func.sum(Rollup.points).desc()
+    ).limit(1))).first()
 
     ultimos_jogos = sorted(jogos, key=lambda j: j.date, reverse=True)[:5]
 
     return {
         "total_jogos": total_jogos,
         "estatisticas_gerais": {
-            "total_pontos": estatisticas_gerais.total_pontos if estatisticas_gerais and estatisticas_gerais.total_pontos is not None else 0,
-            "total_assistencias": estatisticas_gerais.total_assistencias if estatisticas_gerais and estatisticas_gerais.total_assistencias is not None else 0,
-            "total_rebotes": estatisticas_gerais.total_rebotes if estatisticas_gerais and estatisticas_gerais.total_rebotes is not None else 0,
-            "total_roubos": estatisticas_gerais.total_roubos if estatisticas_gerais and estatisticas_gerais.total_roubos is not None else 0,
-            "total_faltas": estatisticas_gerais.total_faltas if estatisticas_gerais and estatisticas_gerais.total_faltas is not None else 0,
-            "media_pontos": round(estatisticas_gerais.media_pontos, 2) if estatisticas_gerais and estatisticas_gerais.media_pontos is not None else 0,
-            "media_assistencias": round(estatisticas_gerais.media_assistencias, 2) if estatisticas_gerais and estatisticas_gerais.media_assistencias is not None else 0,
-            "media_rebotes": round(estatisticas_gerais.media_rebotes, 2) if estatisticas_gerais and estatisticas_gerais.media_rebotes is not None else 0,
-            "media_roubos": round(estatisticas_gerais.media_roubos, 2) if estatisticas_gerais and estatisticas_gerais.media_roubos is not None else 0,
-            "media_faltas": round(estatisticas_gerais.media_faltas, 2) if estatisticas_gerais and estatisticas_gerais.media_faltas is not None else 0
+            "total_pontos": estatisticas_gerais.total_pontos or 0,
+            "total_assistencias": estatisticas_gerais.total_assistencias or 0,
+            "total_rebotes": estatisticas_gerais.total_rebotes or 0,
+            "total_roubos": estatisticas_gerais.total_roubos or 0,
+            "total_faltas": estatisticas_gerais.total_faltas or 0,
+            "media_pontos": media(estatisticas_gerais.total_pontos, estatisticas_gerais.total_linhas),
+            "media_assistencias": media(estatisticas_gerais.total_assistencias, estatisticas_gerais.total_linhas),
+            "media_rebotes": media(estatisticas_gerais.total_rebotes, estatisticas_gerais.total_linhas),
+            "media_roubos": media(estatisticas_gerais.total_roubos, estatisticas_gerais.total_linhas),
+            "media_faltas": media(estatisticas_gerais.total_faltas, estatisticas_gerais.total_linhas)
         },
         "jogadora_mais_pontos": {
             "id": jogadora_mais_pontos[0].id,
@@ -130,139 +209,211 @@ def get_public_overview(
     }
 
 @router.get("/public/jogadoras", response_model=List[Dict[str, Any]])
-def get_public_jogadoras_stats(
+async def get_public_jogadoras_stats(
+    request: Request,
+    response: Response,
     data_inicio: Optional[datetime] = Query(None),
     data_fim: Optional[datetime] = Query(None),
     jogo_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    if jogo_id:
-        jogos_query = db.query(models.Game).filter(models.Game.id == jogo_id)
-    else:
-        jogos_query = get_stats_query(db, data_inicio, data_fim)
+    return await cached_response(
+        request, response, "jogadoras", data_inicio, data_fim, jogo_id,
+        lambda: jogadoras_stats(db, data_inicio, data_fim, jogo_id),
+    )
 
-    jogos = jogos_query.all()
-    jogos_ids = [j.id for j in jogos]
+async def jogadoras_stats(db: AsyncSession, data_inicio: Optional[datetime], data_fim: Optional[datetime], jogo_id: Optional[int]):
+    # Os jogos filtrados entram como subquery: uma única consulta agrupada por
+    # jogadora sobre os rollups (jogo, jogadora), independente do tamanho do elenco
+    jogos_ids = get_jogos_query(data_inicio, data_fim, jogo_id).with_only_columns(models.Game.id).scalar_subquery()
 
-    logger.info(f"Dashboard jogadoras: jogos_ids={jogos_ids}")
-    if not jogos_ids:
-        return []
-
-    # Lógica corrigida: busca jogadoras que têm estatísticas nos jogos filtrados
-    player_ids_with_stats = db.query(models.Statistic.player_id).filter(
-        models.Statistic.game_id.in_(jogos_ids)
-    ).distinct().all()
+    logger.info(f"Dashboard jogadoras: data_inicio={data_inicio}, data_fim={data_fim}, jogo_id={jogo_id}")
 
-    player_ids = [p_id for p_id, in player_ids_with_stats]
-    if not player_ids:
-        return []
+    Rollup = models.StatisticRollup
+    estatisticas = (await db.execute(select(
+        models.Player,
+        func.sum(Rollup.stat_count).label('total_jogos'),
+        func.sum(Rollup.points).label('total_pontos'),
+        func.sum(Rollup.assists).label('total_assistencias'),
+        func.sum(Rollup.rebounds).label('total_rebotes'),
+        func.sum(Rollup.steals).label('total_roubos'),
+        func.sum(Rollup.fouls).label('total_faltas')
+    ).join(
+        Rollup, Rollup.player_id == models.Player.id
+    ).where(
+        Rollup.level == ROLLUP_GAME_PLAYER,
+        Rollup.game_id.in_(jogos_ids)
+    ).group_by(
+        models.Player.id
+    ).order_by(
+        models.Player.id
+    ))).all()
 
-    jogadoras = db.query(models.Player).filter(models.Player.id.in_(player_ids)).all()
     stats = []
-
-    for jogadora in jogadoras:
-        # Estatísticas da jogadora
-        estatisticas = db.query(
-            func.avg(models.Statistic.points).label('media_pontos'),
-            func.avg(models.Statistic.assists).label('media_assistencias'),
-            func.avg(models.Statistic.rebounds).label('media_rebotes'),
-            func.avg(models.Statistic.steals).label('media_roubos'),
-            func.avg(models.Statistic.fouls).label('media_faltas'),
-            func.count(models.Statistic.id).label('total_jogos'),
-            func.sum(models.Statistic.points).label('total_pontos'),
-            func.sum(models.Statistic.assists).label('total_assistencias'),
-            func.sum(models.Statistic.rebounds).label('total_rebotes'),
-            func.sum(models.Statistic.steals).label('total_roubos'),
-            func.sum(models.Statistic.fouls).label('total_faltas')
-        ).filter(
-            models.Statistic.player_id == jogadora.id,
-            models.Statistic.game_id.in_(jogos_ids)
-        ).first()
-
-        if estatisticas and estatisticas.total_jogos > 0:
-            stats.append({
-                "id": jogadora.id,
-                "name": jogadora.name,
-                "number": jogadora.number,
-                "position": jogadora.position,
-                "categoria": jogadora.categoria,
-                "active": jogadora.active,
-                "created_at": jogadora.created_at,
-                "media_pontos": round(estatisticas.media_pontos or 0, 2),
-                "media_assistencias": round(estatisticas.media_assistencias or 0, 2),
-                "media_rebotes": round(estatisticas.media_rebotes or 0, 2),
-                "media_roubos": round(estatisticas.media_roubos or 0, 2),
-                "media_faltas": round(estatisticas.media_faltas or 0, 2),
-                "total_jogos": estatisticas.total_jogos or 0,
-                "total_pontos": estatisticas.total_pontos or 0,
-                "total_assistencias": estatisticas.total_assistencias or 0,
-                "total_rebotes": estatisticas.total_rebotes or 0,
-                "total_roubos": estatisticas.total_roubos or 0,
-                "total_faltas": estatisticas.total_faltas or 0
-            })
+    for e in estatisticas:
+        jogadora = e[0]
+        stats.append({
+            "id": jogadora.id,
+            "name": jogadora.name,
+            "number": jogadora.number,
+            "position": jogadora.position,
+            "categoria": jogadora.categoria,
+            "active": jogadora.active,
+            "created_at": jogadora.created_at,
+            "media_pontos": media(e.total_pontos or 0, e.total_jogos),
+            "media_assistencias": media(e.total_assistencias or 0, e.total_jogos),
+            "media_rebotes": media(e.total_rebotes or 0, e.total_jogos),
+            "media_roubos": media(e.total_roubos or 0, e.total_jogos),
+            "media_faltas": media(e.total_faltas or 0, e.total_jogos),
+            "total_jogos": e.total_jogos or 0,
+            "total_pontos": e.total_pontos or 0,
+            "total_assistencias": e.total_assistencias or 0,
+            "total_rebotes": e.total_rebotes or 0,
+            "total_roubos": e.total_roubos or 0,
+            "total_faltas": e.total_faltas or 0
+        })
 
     return stats
 
 @router.get("/public/jogos", response_model=List[Dict[str, Any]])
-def get_public_jogos_stats(
+async def get_public_jogos_stats(
+    request: Request,
+    response: Response,
     data_inicio: Optional[datetime] = Query(None),
     data_fim: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    jogos_query = get_stats_query(db, data_inicio, data_fim)
-    jogos = jogos_query.order_by(models.Game.date.desc()).all()
+    return await cached_response(
+        request, response, "jogos", data_inicio, data_fim, None,
+        lambda: jogos_stats(db, data_inicio, data_fim),
+    )
+
+async def jogos_stats(db: AsyncSession, data_inicio: Optional[datetime], data_fim: Optional[datetime]):
+    jogos_query = get_stats_query(data_inicio, data_fim)
+    jogos = (await db.execute(jogos_query.order_by(models.Game.date.desc()))).scalars().all()
     logger.info(f"Dashboard jogos: jogos={[(j.id, j.date) for j in jogos]}")
     if not jogos:
         return []
-    stats = []
 
-    for jogo in jogos:
-        # Estatísticas do jogo
-        estatisticas = db.query(
-            func.sum(models.Statistic.points).label('total_pontos'),
-            func.sum(models.Statistic.assists).label('total_assistencias'),
-            func.sum(models.Statistic.rebounds).label('total_rebotes'),
-            func.sum(models.Statistic.steals).label('total_roubos'),
-            func.sum(models.Statistic.fouls).label('total_faltas'),
-            func.count(models.Statistic.id).label('total_jogadoras')
-        ).filter(
-            models.Statistic.game_id == jogo.id
-        ).first()
-
-        # Estatísticas por quarto
-        estatisticas_por_quarto = db.query(
-            models.Statistic.quarter,
-            func.sum(models.Statistic.points).label('total_pontos'),
-            func.sum(models.Statistic.assists).label('total_assistencias'),
-            func.sum(models.Statistic.rebounds).label('total_rebotes'),
-            func.sum(models.Statistic.steals).label('total_roubos'),
-            func.sum(models.Statistic.fouls).label('total_faltas')
-        ).filter(
-            models.Statistic.game_id == jogo.id
-        ).group_by(models.Statistic.quarter).order_by(models.Statistic.quarter).all()
-
-        if estatisticas:
-            stats.append({
-                "id": jogo.id,
-                "opponent": jogo.opponent,
-                "date": jogo.date,
-                "status": jogo.status,
-                "total_pontos": estatisticas.total_pontos or 0,
-                "total_assistencias": estatisticas.total_assistencias or 0,
-                "total_rebotes": estatisticas.total_rebotes or 0,
-                "total_roubos": estatisticas.total_roubos or 0,
-                "total_faltas": estatisticas.total_faltas or 0,
-                "total_jogadoras": estatisticas.total_jogadoras or 0,
-                "por_quarto": [
-                    {
-                        "quarto": q[0],
-                        "total_pontos": q[1] or 0,
-                        "total_assistencias": q[2] or 0,
-                        "total_rebotes": q[3] or 0,
-                        "total_roubos": q[4] or 0,
-                        "total_faltas": q[5] or 0
-                    } for q in estatisticas_por_quarto
-                ]
-            })
-
-    return stats 
\ No newline at end of file
+    # Os rollups (jogo, quarto) de todos os jogos do período vêm numa única
+    # consulta; os totais de cada jogo saem da soma dos seus quartos
+    jogos_ids = jogos_query.with_only_columns(models.Game.id).scalar_subquery()
+    Rollup = models.StatisticRollup
+    estatisticas_por_quarto = (await db.execute(select(
+        Rollup.game_id,
+        Rollup.quarter,
+        Rollup.points.label('total_pontos'),
+        Rollup.assists.label('total_assistencias'),
+        Rollup.rebounds.label('total_rebotes'),
+        Rollup.steals.label('total_roubos'),
+        Rollup.fouls.label('total_faltas'),
+        Rollup.stat_count.label('total_jogadoras')
+    ).where(
+        Rollup.level == ROLLUP_GAME_QUARTER,
+        Rollup.game_id.in_(jogos_ids)
+    ).order_by(
+        Rollup.game_id, Rollup.quarter
+    ))).all()
+
+    totais_por_jogo = {}
+    for q in estatisticas_por_quarto:
+        totais = totais_por_jogo.setdefault(q.game_id, {
+            "total_pontos": 0,
+            "total_assistencias": 0,
+            "total_rebotes": 0,
+            "total_roubos": 0,
+            "total_faltas": 0,
+            "total_jogadoras": 0,
+            "por_quarto": []
+        })
+        totais["total_pontos"] += q.total_pontos or 0
+        totais["total_assistencias"] += q.total_assistencias or 0
+        totais["total_rebotes"] += q.total_rebotes or 0
+        totais["total_roubos"] += q.total_roubos or 0
+        totais["total_faltas"] += q.total_faltas or 0
+        totais["total_jogadoras"] += q.total_jogadoras or 0
+        totais["por_quarto"].append({
+            "quarto": q.quarter,
+            "total_pontos": q.total_pontos or 0,
+            "total_assistencias": q.total_assistencias or 0,
+            "total_rebotes": q.total_rebotes or 0,
+            "total_roubos": q.total_roubos or 0,
+            "total_faltas": q.total_faltas or 0
+        })
+
+    sem_estatisticas = {
+        "total_pontos": 0,
+        "total_assistencias": 0,
+        "total_rebotes": 0,
+        "total_roubos": 0,
+        "total_faltas": 0,
+        "total_jogadoras": 0,
+        "por_quarto": []
+    }
+    return [
+        {
+            "id": jogo.id,
+            "opponent": jogo.opponent,
+            "date": jogo.date,
+            "status": jogo.status,
+            **totais_por_jogo.get(jogo.id, sem_estatisticas)
+        }
+        for jogo in jogos
+    ]
+
+@router.get("/public/jogadoras/avancadas", response_model=List[Dict[str, Any]])
+async def get_public_jogadoras_avancadas(
+    request: Request,
+    response: Response,
+    data_inicio: Optional[datetime] = Query(None),
+    data_fim: Optional[datetime] = Query(None),
+    jogo_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Aproveitamentos, eFG, true shooting, eficiência e taxas por minuto de cada jogadora."""
+    return await cached_response(
+        request, response, "jogadoras_avancadas", data_inicio, data_fim, jogo_id,
+        lambda: metricas_avancadas(db, stats_analytics.GROUP_PLAYER, data_inicio, data_fim, jogo_id),
+    )
+
+@router.get("/public/jogos/avancadas", response_model=List[Dict[str, Any]])
+async def get_public_jogos_avancadas(
+    request: Request,
+    response: Response,
+    data_inicio: Optional[datetime] = Query(None),
+    data_fim: Optional[datetime] = Query(None),
+    jogo_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """As mesmas métricas avançadas, somando o time em cada jogo."""
+    return await cached_response(
+        request, response, "jogos_avancadas", data_inicio, data_fim, jogo_id,
+        lambda: metricas_avancadas(db, stats_analytics.GROUP_GAME, data_inicio, data_fim, jogo_id),
+    )
+
+async def metricas_avancadas(db: AsyncSession, group_by: str, data_inicio: Optional[datetime],
+                             data_fim: Optional[datetime], jogo_id: Optional[int]):
+    # Uma consulta carrega as colunas dos rollups (jogo, jogadora) do filtro;
+    # as métricas de todas as jogadoras (ou jogos) saem em lote do NumPy
+    jogos_ids = get_jogos_query(data_inicio, data_fim, jogo_id).with_only_columns(models.Game.id).scalar_subquery()
+    rows = (await db.execute(stats_analytics.metrics_query(jogos_ids))).all()
+    metricas = stats_analytics.compute_metrics(stats_analytics.load_columns(rows), group_by)
+    if not metricas:
+        return []
+
+    ids = [m[group_by] for m in metricas]
+    if group_by == stats_analytics.GROUP_PLAYER:
+        nomes = {
+            row.id: {"name": row.name, "number": row.number}
+            for row in await db.execute(
+                select(models.Player.id, models.Player.name, models.Player.number).where(models.Player.id.in_(ids))
+            )
+        }
+    else:
+        nomes = {
+            row.id: {"opponent": row.opponent, "date": row.date}
+            for row in await db.execute(
+                select(models.Game.id, models.Game.opponent, models.Game.date).where(models.Game.id.in_(ids))
+            )
+        }
+    return [{**nomes.get(m[group_by], {}), **m} for m in metricas]
@@ -1,10 +1,24 @@
+import asyncio
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select
 
-from app.core.security import get_current_user
-from app.database import get_db
+from app.core.security import get_current_identity, get_current_identity_async
+from app.core.identity import UserIdentity
+from app.database import get_db, get_async_db
 from app import models, schemas
+from app.crud import rollup
+from app.crud import statistic as crud_statistic
+from app.core.etag import make_etag, is_not_modified, not_modified_response
+from app.core.events import Subscription, game_events, format_sse
+from app.core.config import settings
+from app.routes.dashboard import invalidate_dashboard_cache
+from app.services import stats_export
 
 router = APIRouter(
     prefix="/estatisticas",
@@ -12,6 +26,30 @@ router = APIRouter(
     redirect_slashes=False,
 )
 
+async def statistics_version(db: AsyncSession, game_id: int):
+    """Token barato de versão das estatísticas de um jogo: (max updated_at, total de linhas)."""
+    result = await db.execute(select(
+        func.max(models.Statistic.updated_at),
+        func.count(models.Statistic.id)
+    ).where(
+        models.Statistic.game_id == game_id
+    ))
+    return result.one()
+
+def get_statistics_query(game_id: int, quarter: Optional[int] = None, player_id: Optional[int] = None):
+    query = select(models.Statistic).where(
+        models.Statistic.game_id == game_id
+    )
+    if quarter:
+        query = query.where(models.Statistic.quarter == quarter)
+    if player_id:
+        query = query.where(models.Statistic.player_id == player_id)
+    return query
+
+def publish_statistic(game_id: int, event_type: str, statistic: models.Statistic) -> None:
+    """Envia a estatística gravada aos clientes conectados ao stream do jogo."""
+    game_events.publish(game_id, event_type, jsonable_encoder(schemas.StatisticOut.from_orm(statistic)))
+
 @router.post(
     "",
     response_model=schemas.StatisticOut,
@@ -21,7 +59,7 @@ router = APIRouter(
 def create_statistic(
     statistic_in: schemas.StatisticCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     # Verifica se o jogo existe e pertence ao usuário
     game = db.query(models.Game).filter(
@@ -38,58 +76,142 @@ def create_statistic(
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    # Verifica se já existe estatística para essa jogadora, jogo e quarto
-    existing_stat = db.query(models.Statistic).filter(
-        models.Statistic.game_id == statistic_in.game_id,
-        models.Statistic.player_id == statistic_in.player_id,
-        models.Statistic.quarter == statistic_in.quarter
+    # Upsert em (jogo, jogadora, quarto) que devolve os valores anteriores da linha
+    statistic, before = crud_statistic.upsert_statistic(db, statistic_in.dict())
+    created = before is None
+    # Serializa antes do commit, que expira a instância
+    result = schemas.StatisticOut.from_orm(statistic)
+    game_id, game_date = game.id, game.date
+    # Rollups recebem só a diferença, na mesma transação
+    if created:
+        rollup.add_statistic(db, statistic, game)
+    else:
+        rollup.apply_delta(
+            db, game, statistic.player_id, statistic.quarter,
+            rollup.diff_values(rollup.statistic_values(before), rollup.statistic_values(statistic)),
+        )
+    db.commit()
+    invalidate_dashboard_cache(game_id, game_date)
+    game_events.publish(
+        game_id,
+        "statistic.created" if created else "statistic.updated",
+        jsonable_encoder(result),
+    )
+    return result
+
+@router.post(
+    "/game/{game_id}/bulk",
+    response_model=List[schemas.StatisticOut],
+    status_code=status.HTTP_201_CREATED,
+    summary="Register or update a batch of statistics of a game",
+)
+def bulk_upsert_statistics(
+    game_id: int,
+    batch: schemas.StatisticBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_identity),
+):
+    # Verifica uma única vez se o jogo existe e pertence ao usuário
+    game = db.query(models.Game).filter(
+        models.Game.id == game_id,
+        models.Game.owner_id == current_user.id
     ).first()
-    
-    if existing_stat:
-        # Atualiza a estatística existente
-        for field, value in statistic_in.dict().items():
-            setattr(existing_stat, field, value)
-        db.commit()
-        db.refresh(existing_stat)
-        return existing_stat
-    
-    # Cria nova estatística
-    new_stat = models.Statistic(**statistic_in.dict())
-    db.add(new_stat)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    # Resolve todas as jogadoras do lote numa única consulta IN
+    player_ids = {item.player_id for item in batch.items}
+    found_ids = {
+        player_id for player_id, in db.query(models.Player.id).filter(
+            models.Player.id.in_(player_ids)
+        ).all()
+    }
+    missing_ids = player_ids - found_ids
+    if missing_ids:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Players not found: {sorted(missing_ids)}"
+        )
+
+    # FOR UPDATE: os valores anteriores valem até o commit, mesmo com outro lote no mesmo jogo
+    existing = {
+        (stat.player_id, stat.quarter): stat
+        for stat in db.query(models.Statistic).filter(
+            models.Statistic.game_id == game_id,
+            models.Statistic.player_id.in_(player_ids)
+        ).with_for_update().all()
+    }
+
+    saved = {}
+    created = set()
+    before = {}
+    for item in batch.items:
+        key = (item.player_id, item.quarter)
+        stat = existing.get(key)
+        if stat is None:
+            stat = models.Statistic(game_id=game_id, **item.dict())
+            db.add(stat)
+            existing[key] = stat
+            created.add(key)
+        else:
+            if key not in created and key not in before:
+                before[key] = rollup.statistic_values(stat)
+            for field, value in item.dict().items():
+                setattr(stat, field, value)
+        saved[key] = stat
+
+    # Variações do lote somadas por chave de rollup: um único upsert incremental
+    totals = {}
+    for (player_id, quarter), stat in saved.items():
+        after = rollup.statistic_values(stat)
+        if (player_id, quarter) in created:
+            rollup.accumulate(totals, game_id, game.date, player_id, quarter, after, 1)
+        else:
+            delta = rollup.diff_values(before[(player_id, quarter)], after)
+            rollup.accumulate(totals, game_id, game.date, player_id, quarter, delta)
+
+    # Tudo numa transação: linhas do lote e rollups do jogo
+    db.flush()
+    saved_ids = [stat.id for stat in saved.values()]
+    game_date = game.date
+    rollup.apply_totals(db, totals)
     db.commit()
-    db.refresh(new_stat)
-    return new_stat
+    invalidate_dashboard_cache(game_id, game_date)
+
+    # Recarrega as linhas gravadas de uma vez (o commit expira os objetos)
+    db.query(models.Statistic).filter(models.Statistic.id.in_(saved_ids)).all()
+    for key, stat in saved.items():
+        publish_statistic(game_id, "statistic.created" if key in created else "statistic.updated", stat)
+    return list(saved.values())
 
 @router.get(
     "/game/{game_id}",
     response_model=List[schemas.StatisticOut],
     summary="List statistics of a game",
 )
-def list_game_statistics(
+async def list_game_statistics(
     game_id: int,
+    request: Request,
+    response: Response,
     quarter: Optional[int] = None,
     player_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserIdentity = Depends(get_current_identity_async),
 ):
     # Verifica se o jogo existe e pertence ao usuário
-    game = db.query(models.Game).filter(
+    game = (await db.execute(select(models.Game.id).where(
         models.Game.id == game_id,
         models.Game.owner_id == current_user.id
-    ).first()
+    ))).first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
-    
-    query = db.query(models.Statistic).filter(
-        models.Statistic.game_id == game_id
-    )
-    
-    if quarter:
-        query = query.filter(models.Statistic.quarter == quarter)
-    if player_id:
-        query = query.filter(models.Statistic.player_id == player_id)
-    
-    return query.all()
+
+    etag = make_etag("game", game_id, *await statistics_version(db, game_id), quarter, player_id)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+
+    return (await db.execute(get_statistics_query(game_id, quarter, player_id))).scalars().all()
 
 @router.get(
     "/game/{game_id}/summary",
@@ -99,7 +221,7 @@ def list_game_statistics(
 def game_statistics_summary(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     # Verifica se o jogo existe e pertence ao usuário
     game = db.query(models.Game).filter(
@@ -147,23 +269,32 @@ def update_statistic(
     statistic_id: int,
     statistic_in: schemas.StatisticUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     statistic = db.query(models.Statistic).join(
         models.Game
     ).filter(
         models.Statistic.id == statistic_id,
         models.Game.owner_id == current_user.id
-    ).first()
+    ).with_for_update(of=models.Statistic).populate_existing().first()
     
     if not statistic:
         raise HTTPException(status_code=404, detail="Statistic not found")
     
+    # valores lidos sob o lock: PUTs concorrentes calculam o delta em série
+    game = statistic.game
+    antes = rollup.statistic_values(statistic)
     for field, value in statistic_in.dict(exclude_unset=True).items():
         setattr(statistic, field, value)
+    rollup.apply_delta(
+        db, game, statistic.player_id, statistic.quarter,
+        rollup.diff_values(antes, rollup.statistic_values(statistic)),
+    )
     
     db.commit()
+    invalidate_dashboard_cache(game.id, game.date)
     db.refresh(statistic)
+    publish_statistic(game.id, "statistic.updated", statistic)
     return statistic
 
 @router.delete(
@@ -174,7 +305,7 @@ def update_statistic(
 def delete_statistic(
     statistic_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     statistic = db.query(models.Statistic).join(
         models.Game
@@ -186,37 +317,148 @@ def delete_statistic(
     if not statistic:
         raise HTTPException(status_code=404, detail="Statistic not found")
     
+    game = statistic.game
+    rollup.remove_statistic(db, statistic, game)
     db.delete(statistic)
     db.commit()
+    invalidate_dashboard_cache(game.id, game.date)
+    game_events.publish(game.id, "statistic.deleted", {"id": statistic_id})
     return None
 
+EXPORT_MEDIA_TYPES = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+@router.get(
+    "/export",
+    summary="Exporta estatísticas em Parquet, Arrow IPC, CSV ou NDJSON",
+)
+def exportar_estatisticas(
+    formato: str = Query("parquet", pattern="^(parquet|arrow|csv|ndjson)$"),
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    jogo_id: Optional[int] = None,
+    categoria: Optional[str] = None,
+    player_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_identity),
+):
+    """Temporadas inteiras com os dados do jogo e da jogadora, lidas com cursor
+    no servidor e enviadas lote a lote, sem passar cada linha pelo Pydantic.
+    Só entram os jogos do usuário logado, em todos os formatos."""
+    query = stats_export.export_query(
+        data_inicio, data_fim, categoria, player_id, jogo_id, owner_id=current_user.id
+    )
+    if formato in stats_export.TEXT_FORMATS:
+        chunks = stats_export.iter_text(db, query, formato)
+    else:
+        try:
+            chunks = stats_export.iter_columnar(db, query, formato)
+        except stats_export.ExportUnavailable as e:
+            raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    media_type, extension = EXPORT_MEDIA_TYPES[formato]
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="estatisticas.{extension}"'},
+    )
+
 @router.get(
     "/public/game/{game_id}",
     response_model=List[schemas.StatisticOut],
     summary="Lista estatísticas públicas de um jogo",
 )
-def listar_estatisticas_publicas(
+async def listar_estatisticas_publicas(
     game_id: int,
+    request: Request,
+    response: Response,
     quarter: Optional[int] = None,
     player_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    game = db.query(models.Game).filter(
+    game = (await db.execute(select(models.Game.id).where(
         models.Game.id == game_id
-    ).first()
+    ))).first()
     if not game:
         raise HTTPException(status_code=404, detail="Jogo não encontrado")
-    
-    query = db.query(models.Statistic).filter(
-        models.Statistic.game_id == game_id
+
+    # Pollers do placar recebem 304 enquanto nada mudar no jogo
+    etag = make_etag("public", game_id, *await statistics_version(db, game_id), quarter, player_id)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+
+    return (await db.execute(get_statistics_query(game_id, quarter, player_id))).scalars().all()
+
+def _is_stale(seen: dict, data: dict) -> bool:
+    """O evento traz uma versão da linha igual ou anterior à que o cliente já tem."""
+    known = seen.get(data.get("id"))
+    if known is None or data.get("updated_at") is None:
+        return False
+    return datetime.fromisoformat(data["updated_at"]) <= datetime.fromisoformat(known)
+
+async def _stream_game_statistics(request: Request, game_id: int, snapshot: list, subscription: Subscription):
+    # A assinatura é feita antes do snapshot: eventos publicados nesse meio
+    # tempo ficam na fila e os que o snapshot já contém são descartados
+    seen = {row["id"]: row.get("updated_at") for row in snapshot}
+    try:
+        yield format_sse("snapshot", snapshot)
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.LIVE_STREAM_KEEPALIVE_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                # Comentário SSE mantém a conexão aberta em proxies
+                yield ": keep-alive\n\n"
+                continue
+            data = event["data"]
+            if event["type"] == "statistic.deleted":
+                seen.pop(data["id"], None)
+            elif _is_stale(seen, data):
+                continue
+            else:
+                seen[data["id"]] = data.get("updated_at")
+            yield format_sse(event["type"], data)
+    finally:
+        game_events.unsubscribe(game_id, subscription)
+
+@router.get(
+    "/public/game/{game_id}/stream",
+    summary="Stream ao vivo (SSE) das estatísticas públicas de um jogo",
+)
+async def stream_estatisticas_publicas(
+    game_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    game = (await db.execute(select(models.Game.id).where(
+        models.Game.id == game_id
+    ))).first()
+    if not game:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+
+    # Assina antes de ler o estado atual para não perder escritas entre os dois
+    subscription = game_events.subscribe(game_id)
+    try:
+        snapshot = jsonable_encoder([
+            schemas.StatisticOut.from_orm(e)
+            for e in (await db.execute(get_statistics_query(game_id))).scalars().all()
+        ])
+        # Libera a conexão: o stream pode durar o jogo inteiro e não consulta mais o banco
+        await db.close()
+    except BaseException:
+        game_events.unsubscribe(game_id, subscription)
+        raise
+    return StreamingResponse(
+        _stream_game_statistics(request, game_id, snapshot, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    
-    if quarter:
-        query = query.filter(models.Statistic.quarter == quarter)
-    if player_id:
-        query = query.filter(models.Statistic.player_id == player_id)
-    
-    return query.all()
 
 @router.get(
     "/games/{game_id}/stats",
@@ -226,7 +468,7 @@ def listar_estatisticas_publicas(
 def listar_stats_game(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     # Verifica se o jogo existe e pertence ao usuário
     game = db.query(models.Game).filter(
@@ -246,7 +488,7 @@ def listar_stats_game(
 def stats_game_english(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     return listar_stats_game(game_id, db, current_user)
 
@@ -261,7 +503,7 @@ def create_stats_game_english(
     game_id: int,
     statistic_in: schemas.StatisticCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     # Garante que o game_id do path é usado
     statistic_in.game_id = game_id
@@ -276,7 +518,7 @@ def create_stats_game_english(
 def stats_game_players_english(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     # Reaproveita a função existente, pode ser customizada se necessário
     return listar_stats_game(game_id, db, current_user)
@@ -297,7 +539,7 @@ stats_router = FastAPIRouter(
 def stats_game_english_direct(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     return listar_stats_game(game_id, db, current_user)
 
@@ -311,7 +553,7 @@ def create_stats_game_english_direct(
     game_id: int,
     statistic_in: schemas.StatisticCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     statistic_in.game_id = game_id
     return create_statistic(statistic_in, db, current_user)
@@ -324,7 +566,7 @@ def create_stats_game_english_direct(
 def stats_game_players_english_direct(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     return listar_stats_game(game_id, db, current_user)
 
@@ -339,7 +581,7 @@ def create_stats_game_frontend(
     game_id: int,
     statistic_in: schemas.StatisticCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     # Garante que o game_id do path é usado
     statistic_in.game_id = game_id
@@ -354,7 +596,7 @@ def create_stats_game_frontend(
 def get_stats_game_frontend(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     return listar_stats_game(game_id, db, current_user)
 
@@ -367,7 +609,7 @@ def get_stats_game_frontend(
 def get_stats_game_players_frontend(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     return listar_stats_game(game_id, db, current_user)
 
@@ -1,13 +1,17 @@
 # backend/app/routes/games.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 
 from app.database import get_db
 from app import models, schemas
-from app.core.security import get_current_user
+from app.crud import rollup
+from app.core import pagination
+from app.routes.dashboard import invalidate_dashboard_cache
+from app.core.security import get_current_identity
+from app.core.identity import UserIdentity
 from app.schemas import GameOut
 
 router = APIRouter(
@@ -26,7 +30,7 @@ router = APIRouter(
 def criar_jogo(
     game_in: schemas.GameCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     data = game_in.dict()
     novo = models.Game(
@@ -40,6 +44,7 @@ def criar_jogo(
     db.add(novo)
     db.commit()
     db.refresh(novo)
+    invalidate_dashboard_cache(novo.id, novo.date)
 
     # Adiciona os jogadores selecionados
     if data.get('players'):
@@ -59,14 +64,21 @@ def criar_jogo(
     summary="Lista todos os jogos",
 )
 def listar_jogos(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    total: str = Query(pagination.TOTAL_NONE, pattern=pagination.TOTAL_PATTERN),
     status: Optional[str] = None,
     data_inicio: Optional[datetime] = None,
     data_fim: Optional[datetime] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
+    """Jogos mais recentes primeiro. A próxima página vem pelo cabeçalho
+    X-Next-Cursor (`?cursor=`); `skip` continua aceito, mas fica lento em
+    páginas profundas.
+    """
     query = db.query(models.Game).filter(models.Game.owner_id == current_user.id)
     
     if status:
@@ -75,8 +87,19 @@ def listar_jogos(
         query = query.filter(models.Game.date >= data_inicio)
     if data_fim:
         query = query.filter(models.Game.date <= data_fim)
-    
-    return query.offset(skip).limit(limit).all()
+
+    count, estimated = pagination.count_total(db, query, total)
+    try:
+        query = pagination.keyset(query, models.Game.date, models.Game.id, cursor)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page = pagination.build_page(
+        query.offset(skip).limit(limit + 1).all(), limit, key=lambda jogo: (jogo.date, jogo.id)
+    )
+    page.total, page.total_estimated = count, estimated
+    pagination.set_page_headers(response, page)
+    return page.items
 
 
 @router.get(
@@ -87,7 +110,7 @@ def listar_jogos(
 def ler_jogo(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     jogo = db.query(models.Game).options(joinedload(models.Game.players)).filter(
         models.Game.id == game_id,
@@ -115,7 +138,7 @@ def atualizar_jogo(
     game_id: int,
     game_in: schemas.GameUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     jogo = db.query(models.Game).options(joinedload(models.Game.players)).filter(
         models.Game.id == game_id,
@@ -125,10 +148,17 @@ def atualizar_jogo(
         raise HTTPException(status_code=404, detail="Jogo não encontrado")
 
     data = game_in.dict(exclude_unset=True)
+    data_anterior = jogo.date
+    temporada_anterior = data_anterior.year
     for field, value in data.items():
         if field != "players":
             setattr(jogo, field, value)
 
+    # Mudança de mês (ou de ano) move as estatísticas do jogo para outro
+    # recorte mensal e possivelmente outra temporada
+    if (jogo.date.year, jogo.date.month) != (data_anterior.year, data_anterior.month):
+        rollup.rebuild_rollups(db, game_ids=[jogo.id], seasons=[temporada_anterior])
+
     # Atualizar jogadores associados
     if "players" in data and data["players"] is not None:
         # Pega a lista de IDs de jogadores já associados
@@ -143,6 +173,7 @@ def atualizar_jogo(
 
     db.commit()
     db.refresh(jogo)
+    invalidate_dashboard_cache(jogo.id, data_anterior, jogo.date)
     return {
         "id": jogo.id,
         "opponent": jogo.opponent,
@@ -162,7 +193,7 @@ def atualizar_jogo(
 def remover_jogo(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     jogo = db.query(models.Game).filter(
         models.Game.id == game_id,
@@ -171,8 +202,10 @@ def remover_jogo(
     if not jogo:
         raise HTTPException(status_code=404, detail="Jogo não encontrado")
     
+    data_jogo = jogo.date
     db.delete(jogo)
     db.commit()
+    invalidate_dashboard_cache(game_id, data_jogo)
     return None
 
 
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.core.deps import get_db
+from app.core import pagination
 from app.models.lead import Lead
 from app.schemas.lead import LeadCreate, Lead as LeadSchema
-from typing import List
+from typing import List, Optional
 import logging
 
 logger = logging.getLogger("uvicorn")
@@ -37,14 +38,35 @@ def create_lead(lead: LeadCreate, db: Session = Depends(get_db)):
         logger.error(f"Tipo do erro: {type(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+def paginar_leads(db: Session, response: Response, limit: int, cursor: Optional[str]) -> List[Lead]:
+    try:
+        query = pagination.keyset(db.query(Lead), Lead.created_at, Lead.id, cursor)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page = pagination.build_page(
+        query.limit(limit + 1).all(), limit, key=lambda lead: (lead.created_at, lead.id)
+    )
+    pagination.set_page_headers(response, page)
+    return page.items
+
 @router.get("/leads", response_model=List[LeadSchema])
-def list_leads(db: Session = Depends(get_db)):
+def list_leads(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
     """
-    Lista todos os leads cadastrados.
+    Lista os leads cadastrados, mais recentes primeiro. Próxima página pelo cabeçalho X-Next-Cursor.
     """
-    return db.query(Lead).order_by(Lead.created_at.desc()).all()
+    return paginar_leads(db, response, limit, cursor)
 
 # Endpoint futuro para listar leads (admin)
 @router.get("/", response_model=List[LeadSchema])
-def list_leads_admin(db: Session = Depends(get_db)):
-    return db.query(Lead).order_by(Lead.created_at.desc()).all() 
\ No newline at end of file
+def list_leads_admin(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    return paginar_leads(db, response, limit, cursor) 
\ No newline at end of file
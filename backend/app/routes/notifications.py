@@ -0,0 +1,148 @@
+# backend/app/routes/notifications.py
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app.crud import notification as crud
+from app.core import pagination
+from app.core.security import get_current_identity
+from app.core.identity import ADMIN_ROLES, UserIdentity
+from app.schemas.notification import (
+    NotificationCreate,
+    NotificationResponse,
+    NotificationJobResponse,
+    NotificationJobStatus,
+    NotificationLogResponse,
+    UserNotificationResponse,
+)
+
+router = APIRouter(
+    prefix="/notifications",
+    tags=["notifications"],
+    redirect_slashes=False,
+)
+
+
+def get_current_admin(
+    current_user: UserIdentity = Depends(get_current_identity),
+) -> UserIdentity:
+    if current_user.role not in ADMIN_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The user doesn't have enough privileges"
+        )
+    return current_user
+
+
+@router.post(
+    "",
+    response_model=NotificationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Cria uma notificação e agenda o envio dos emails",
+)
+def criar_notificacao(
+    notification: NotificationCreate,
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_admin),
+):
+    db_notification = crud.create_notification(db=db, notification=notification, creator_id=current_user.id)
+    return NotificationJobResponse(
+        job_id=db_notification.email_job_id,
+        notification=NotificationResponse.from_orm(db_notification),
+        recipients=db_notification.recipient_count,
+    )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=NotificationJobStatus,
+    summary="Progresso do envio dos emails de uma notificação",
+)
+def status_envio(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_admin),
+):
+    job = crud.get_notification_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/log", response_model=List[NotificationLogResponse])
+def log_notificacoes(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_admin),
+):
+    try:
+        page = crud.get_notification_log(db=db, skip=skip, limit=limit, cursor=cursor)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    pagination.set_page_headers(response, page)
+    return [
+        NotificationLogResponse(
+            id=notification.id,
+            content=notification.content,
+            url=notification.url,
+            target=notification.target,
+            created_at=notification.created_at,
+            created_by=notification.created_by,
+            creator_name=notification.creator.name,
+        )
+        for notification in page.items
+    ]
+
+
+@router.get("/me", response_model=List[UserNotificationResponse])
+def minhas_notificacoes(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    unread_only: bool = False,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_identity),
+):
+    try:
+        page = crud.get_user_notifications(
+            db=db, user_id=current_user.id, skip=skip, limit=limit, unread_only=unread_only, cursor=cursor
+        )
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    pagination.set_page_headers(response, page)
+    return page.items
+
+
+@router.get("/me/unread/count")
+def contagem_nao_lidas(
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_identity),
+):
+    return {"count": crud.get_unread_count(db=db, user_id=current_user.id)}
+
+
+@router.post("/me/read-all")
+def marcar_todas_como_lidas(
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_identity),
+):
+    updated = crud.mark_all_as_read(db=db, user_id=current_user.id)
+    return {"message": "All notifications marked as read", "updated": updated}
+
+
+@router.post("/{notification_id}/read")
+def marcar_como_lida(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_identity),
+):
+    notification = crud.mark_notification_as_read(db=db, notification_id=notification_id, user_id=current_user.id)
+    if not notification:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return {"message": "Notification marked as read"}
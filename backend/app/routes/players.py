@@ -1,12 +1,16 @@
 # backend/app/routes/players.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from typing import Optional
 
 from app.database import get_db
 from app import models, schemas
-from app.core.security import get_current_user
+from app.core.security import get_current_identity
+from app.core.identity import ADMIN_ROLES, UserIdentity
+from app.core import pagination
+from app.models.player import search_key
 import logging
 
 router = APIRouter(
@@ -18,6 +22,31 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 
 
+def validar_vinculo(db: Session, current_user: UserIdentity, user_id: Optional[int]) -> None:
+    """Só administradores vinculam (ou desvinculam) a conta de uma jogadora.
+
+    O vínculo dá acesso às estatísticas em /profile/me/stats.
+    """
+    if current_user.role not in ADMIN_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem vincular usuários a jogadoras"
+        )
+    if user_id is not None and db.get(models.User, user_id) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não encontrado")
+
+
+def filtro_prefixo(prefixo: str):
+    """Nomes que começam com `prefixo` como intervalo em `search_name`.
+
+    [prefixo, prefixo com o último caractere incrementado) usa o índice de
+    `search_name` tanto no Postgres (collation "C") quanto no SQLite.
+    """
+    chave = search_key(prefixo)
+    fim = chave[:-1] + chr(ord(chave[-1]) + 1)
+    return (models.Player.search_name >= chave) & (models.Player.search_name < fim)
+
+
 @router.post(
     "/",
     response_model=schemas.PlayerOut,
@@ -27,8 +56,10 @@ logger = logging.getLogger(__name__)
 def criar_jogadora(
     player_in: schemas.PlayerCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
+    if player_in.user_id is not None:
+        validar_vinculo(db, current_user, player_in.user_id)
     try:
         nova = models.Player(**player_in.dict())
         db.add(nova)
@@ -54,15 +85,40 @@ def criar_jogadora(
 @router.get(
     "/",
     response_model=list[schemas.PlayerOut],
-    summary="Lista todas as jogadoras",
+    summary="Lista as jogadoras em ordem alfabética, paginadas",
 )
 def listar_jogadoras(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    categoria: Optional[str] = None,
+    active: Optional[bool] = None,
+    position: Optional[str] = None,
+    busca: Optional[str] = Query(None, max_length=100),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
+    """Diretório de jogadoras por nome; a próxima página vem no cabeçalho X-Next-Cursor."""
+    query = db.query(models.Player)
+    if categoria:
+        query = query.filter(models.Player.categoria == categoria)
+    if active is not None:
+        query = query.filter(models.Player.active == active)
+    if position:
+        query = query.filter(models.Player.position == position)
+    if busca and search_key(busca):
+        query = query.filter(filtro_prefixo(busca))
+    try:
+        query = pagination.keyset(query, models.Player.search_name, models.Player.id, cursor, descending=False)
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        jogadoras = db.query(models.Player).all()
-        return [schemas.PlayerOut.from_orm(j) for j in jogadoras]
+        page = pagination.build_page(
+            query.limit(limit + 1).all(), limit, key=lambda jogadora: (jogadora.search_name, jogadora.id)
+        )
+        pagination.set_page_headers(response, page)
+        return [schemas.PlayerOut.from_orm(j) for j in page.items]
     except Exception as e:
         logger.error(f"Erro ao listar jogadoras: {str(e)}")
         raise HTTPException(
@@ -73,10 +129,44 @@ def listar_jogadoras(
 
 @router.get("", response_model=list[schemas.PlayerOut], include_in_schema=False)
 def listar_jogadoras_sem_barra(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    categoria: Optional[str] = None,
+    active: Optional[bool] = None,
+    position: Optional[str] = None,
+    busca: Optional[str] = Query(None, max_length=100),
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_identity),
+):
+    return listar_jogadoras(response, limit, cursor, categoria, active, position, busca, db, current_user)
+
+
+@router.get(
+    "/autocomplete",
+    response_model=list[schemas.PlayerSuggestion],
+    summary="Sugestões de jogadoras pelo início do nome",
+)
+def autocompletar_jogadoras(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    active: Optional[bool] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
-    return listar_jogadoras(db, current_user)
+    """Busca por prefixo sem acento e sem diferenciar maiúsculas ("jul" acha "Júlia")."""
+    if not search_key(q):
+        return []
+    query = db.query(
+        models.Player.id,
+        models.Player.name,
+        models.Player.number,
+        models.Player.position,
+        models.Player.categoria,
+    ).filter(filtro_prefixo(q))
+    if active is not None:
+        query = query.filter(models.Player.active == active)
+    return query.order_by(models.Player.search_name, models.Player.id).limit(limit).all()
 
 
 @router.get(
@@ -103,14 +193,25 @@ def atualizar_jogadora(
     player_id: int,
     player_in: schemas.PlayerUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     jog = db.query(models.Player).filter(models.Player.id == player_id).first()
     if not jog:
         raise HTTPException(status_code=404, detail="Jogadora não encontrada")
-    for key, val in player_in.dict(exclude_unset=True).items():
+    dados = player_in.dict(exclude_unset=True)
+    if "user_id" in dados:
+        validar_vinculo(db, current_user, dados["user_id"])
+    for key, val in dados.items():
         setattr(jog, key, val)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        logger.error(f"Erro de integridade ao atualizar jogadora: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Esse usuário já está vinculado a outra jogadora."
+        )
     db.refresh(jog)
     return schemas.PlayerOut.from_orm(jog)
 
@@ -123,7 +224,7 @@ def atualizar_jogadora(
 def deletar_jogadora(
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     jog = db.query(models.Player).filter(models.Player.id == player_id).first()
     if not jog:
@@ -136,6 +237,6 @@ def deletar_jogadora(
 def criar_jogadora_sem_barra(
     player_in: schemas.PlayerCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_identity),
 ):
     return criar_jogadora(player_in, db, current_user)
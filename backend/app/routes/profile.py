@@ -5,7 +5,9 @@ from app.deps import get_db, get_current_user
 from app.schemas.user import UserResponse, UserUpdate
 from app.schemas.profile import UserStatsResponse, UserEventResponse
 from app.models.user import User
+from app.models.player import Player
 from app.crud import user as crud
+from app.crud import rollup
 from datetime import datetime
 
 router = APIRouter(prefix="/profile", tags=["profile"])
@@ -37,16 +39,22 @@ def get_my_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Buscar estatísticas individuais do usuário por ano
-    # (Implementação mock, ajustar para buscar dados reais)
+    # Evolução mês a mês da jogadora vinculada à conta, a partir do rollup
+    # mensal; meses sem jogos (ou conta sem jogadora) aparecem zerados
     if not year:
         year = datetime.now().year
-    # Exemplo de retorno
+    player_id = db.query(Player.id).filter(Player.user_id == current_user.id).scalar()
+    meses = rollup.monthly_player_rollups(db, player_id, year) if player_id else {}
+
+    def total(month: int, field: str) -> int:
+        row = meses.get(month)
+        return (getattr(row, field) or 0) if row else 0
+
     return UserStatsResponse(
-        evolution=[{"month": m, "points": 100 + m*10} for m in range(1, 13)],
-        assists=[{"month": m, "total": 5 + m} for m in range(1, 13)],
-        free_throws=[{"month": m, "total": 3 + m} for m in range(1, 13)],
-        rebounds=[{"month": m, "total": 7 + m} for m in range(1, 13)],
+        evolution=[{"month": m, "points": total(m, "points")} for m in range(1, 13)],
+        assists=[{"month": m, "total": total(m, "assists")} for m in range(1, 13)],
+        free_throws=[{"month": m, "total": total(m, "free_throw_made")} for m in range(1, 13)],
+        rebounds=[{"month": m, "total": total(m, "rebounds")} for m in range(1, 13)],
     )
 
 @router.get("/me/events", response_model=List[UserEventResponse])
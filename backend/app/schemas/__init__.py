@@ -7,6 +7,6 @@ from .user import *
 from .profile import *
 from .token import *
 from .game import GameOut, GameCreate, GameUpdate
-from .player import PlayerOut, PlayerCreate, PlayerUpdate
-from .estatistica import StatisticOut, StatisticCreate, StatisticUpdate, StatisticsSummary
+from .player import PlayerOut, PlayerCreate, PlayerUpdate, PlayerSuggestion
+from .estatistica import StatisticOut, StatisticCreate, StatisticUpdate, StatisticsSummary, StatisticBulkItem, StatisticBulkCreate
 from .lead import LeadCreate, Lead 
\ No newline at end of file
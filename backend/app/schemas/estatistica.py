@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 class StatisticBase(BaseModel):
@@ -21,6 +21,14 @@ class StatisticCreate(StatisticBase):
     game_id: int
     quarter: int
 
+class StatisticBulkItem(StatisticBase):
+    player_id: int
+    quarter: int
+
+class StatisticBulkCreate(BaseModel):
+    # Linhas de um mesmo jogo; repetições de (jogadora, quarto) valem pela última
+    items: List[StatisticBulkItem] = Field(..., min_length=1, max_length=2000)
+
 class StatisticUpdate(BaseModel):
     points: Optional[int] = None
     assists: Optional[int] = None
@@ -40,6 +48,8 @@ class StatisticOut(StatisticBase):
     player_id: int
     game_id: int
     created_at: datetime
+    # Versão da linha: o stream ao vivo descarta eventos já contidos no snapshot
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
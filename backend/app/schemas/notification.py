@@ -19,6 +19,21 @@ class NotificationResponse(NotificationBase):
     class Config:
         from_attributes = True
 
+class NotificationJobResponse(BaseModel):
+    job_id: str
+    notification: NotificationResponse
+    recipients: int
+
+class NotificationJobStatus(BaseModel):
+    job_id: str
+    notification_id: int
+    total: int
+    pending: int
+    sending: int
+    sent: int
+    failed: int
+    done: bool
+
 class UserNotificationResponse(BaseModel):
     id: int
     notification: NotificationResponse
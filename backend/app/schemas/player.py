@@ -10,7 +10,8 @@ class PlayerBase(BaseModel):
     categoria: Optional[str] = None
 
 class PlayerCreate(PlayerBase):
-    pass
+    # Vínculo com a conta da jogadora (/profile/me/stats); só administradores definem
+    user_id: Optional[int] = None
 
 class PlayerUpdate(BaseModel):
     name: Optional[str] = None
@@ -18,6 +19,17 @@ class PlayerUpdate(BaseModel):
     position: Optional[str] = None
     active: Optional[bool] = None
     categoria: Optional[str] = None
+    user_id: Optional[int] = None
+
+class PlayerSuggestion(BaseModel):
+    id: int
+    name: str
+    number: Optional[int] = None
+    position: Optional[str] = None
+    categoria: Optional[str] = None
+
+    class Config:
+        from_attributes = True
 
 class PlayerOut(PlayerBase):
     id: int
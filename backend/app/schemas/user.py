@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 from app.models import UserRole, UserPlan
+from app.core.pagination import TOTAL_NONE, TOTAL_PATTERN
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -88,6 +89,8 @@ class UserFilter(BaseModel):
 class UserPagination(BaseModel):
     skip: int = Field(default=0, ge=0)
     limit: int = Field(default=10, ge=1, le=100)
+    cursor: Optional[str] = None
+    total: str = Field(default=TOTAL_NONE, pattern=TOTAL_PATTERN)
 
 class Token(BaseModel):
     access_token: str
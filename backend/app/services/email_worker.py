@@ -0,0 +1,153 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.email import EmailService, SMTPSession, MESSAGE_ERRORS, email_service, outbox_signal
+from app.database import SessionLocal
+from app.models.email_outbox import (
+    EmailOutbox,
+    EMAIL_PENDING,
+    EMAIL_SENDING,
+    EMAIL_SENT,
+    EMAIL_FAILED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EmailWorker:
+    """Envia os emails da outbox em lotes, numa thread própria.
+
+    Cada lote é reservado (status "sending") e enviado pela mesma sessão
+    SMTP, que fica aberta entre lotes. Falhas voltam para a fila com
+    backoff exponencial até `max_attempts`; mensagens reservadas por um
+    processo que morreu voltam para a fila depois de `claim_timeout`.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        service: EmailService = email_service,
+        smtp_factory: Optional[Callable[[], SMTPSession]] = None,
+        batch_size: int = settings.EMAIL_BATCH_SIZE,
+        poll_interval: float = settings.EMAIL_POLL_INTERVAL,
+        max_attempts: int = settings.EMAIL_MAX_ATTEMPTS,
+        backoff_seconds: int = settings.EMAIL_RETRY_BACKOFF_SECONDS,
+        claim_timeout: int = settings.EMAIL_CLAIM_TIMEOUT_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.service = service
+        self.smtp_factory = smtp_factory or service.smtp_session
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.claim_timeout = claim_timeout
+        self._smtp: Optional[SMTPSession] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-worker", daemon=True)
+        self._thread.start()
+        logger.info("Worker de email iniciado")
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        outbox_signal.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.process_batch()
+            except Exception:
+                logger.exception("Erro no worker de email")
+                processed = 0
+            if processed < self.batch_size:
+                # Fila vazia (ou quase): espera uma nova mensagem ou o próximo ciclo
+                outbox_signal.wait(self.poll_interval)
+                outbox_signal.clear()
+
+    def _claim(self, db: Session) -> List[EmailOutbox]:
+        now = datetime.utcnow()
+        query = db.query(EmailOutbox).filter(or_(
+            and_(EmailOutbox.status == EMAIL_PENDING, EmailOutbox.next_attempt_at <= now),
+            and_(
+                EmailOutbox.status == EMAIL_SENDING,
+                EmailOutbox.claimed_at < now - timedelta(seconds=self.claim_timeout),
+            ),
+        )).order_by(EmailOutbox.id).limit(self.batch_size)
+        if db.get_bind().dialect.name == "postgresql":
+            # Vários workers (um por processo) não pegam as mesmas mensagens
+            query = query.with_for_update(skip_locked=True)
+        messages = query.all()
+        for message in messages:
+            message.status = EMAIL_SENDING
+            message.claimed_at = now
+        db.commit()
+        return messages
+
+    def _retry(self, message: EmailOutbox, error: Exception) -> None:
+        message.attempts += 1
+        message.last_error = str(error)[:1000]
+        message.claimed_at = None
+        if message.attempts >= self.max_attempts:
+            message.status = EMAIL_FAILED
+            logger.error(f"Email {message.id} para {message.to_email} descartado após {message.attempts} tentativas: {error}")
+            return
+        message.status = EMAIL_PENDING
+        message.next_attempt_at = datetime.utcnow() + timedelta(
+            seconds=self.backoff_seconds * 2 ** (message.attempts - 1)
+        )
+
+    def process_batch(self) -> int:
+        """Envia um lote da outbox; retorna quantas mensagens foram processadas."""
+        db = self.session_factory()
+        try:
+            messages = self._claim(db)
+            if not messages:
+                return 0
+            if self._smtp is None:
+                self._smtp = self.smtp_factory()
+
+            for index, message in enumerate(messages):
+                try:
+                    self._smtp.send(
+                        self.service.sender_email,
+                        message.to_email,
+                        self.service.build_message(message.to_email, message.subject, message.html_body),
+                    )
+                except MESSAGE_ERRORS as e:
+                    self._retry(message, e)
+                    continue
+                except Exception as e:
+                    # Servidor fora do ar ou sessão inválida: o resto do lote volta para a fila
+                    logger.warning(f"Falha na conexão SMTP, {len(messages) - index} emails reagendados: {e}")
+                    for pending in messages[index:]:
+                        self._retry(pending, e)
+                    break
+                message.status = EMAIL_SENT
+                message.sent_at = datetime.utcnow()
+                message.claimed_at = None
+                message.last_error = None
+            db.commit()
+            return len(messages)
+        finally:
+            db.close()
+
+
+email_worker = EmailWorker()
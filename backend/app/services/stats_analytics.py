@@ -0,0 +1,140 @@
+from itertools import chain
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+from app.models.statistic_rollup import ROLLUP_GAME_PLAYER, StatisticRollup
+
+# Colunas de arremesso e produção lidas para as métricas, na ordem das matrizes
+METRIC_COLUMNS = (
+    "points",
+    "rebounds",
+    "assists",
+    "steals",
+    "blocks",
+    "fouls",
+    "minutes_played",
+    "two_attempts",
+    "two_made",
+    "three_attempts",
+    "three_made",
+    "free_throw_attempts",
+    "free_throw_made",
+)
+GROUP_PLAYER = "player_id"
+GROUP_GAME = "game_id"
+# Aproveitamentos são frações (0-1); taxas são por minuto jogado
+DECIMALS = 3
+
+# Nome no retorno -> (numerador, denominador) sobre os totais do grupo
+RATIOS = {
+    "aproveitamento_quadra": ("fg_made", "fg_attempts"),
+    "aproveitamento_2_pontos": ("two_made", "two_attempts"),
+    "aproveitamento_3_pontos": ("three_made", "three_attempts"),
+    "aproveitamento_lance_livre": ("free_throw_made", "free_throw_attempts"),
+    "efg": ("efg_made", "fg_attempts"),
+    "true_shooting": ("points", "ts_attempts"),
+    "pontos_por_minuto": ("points", "minutes_played"),
+    "rebotes_por_minuto": ("rebounds", "minutes_played"),
+    "assistencias_por_minuto": ("assists", "minutes_played"),
+    "eficiencia_por_minuto": ("eficiencia", "minutes_played"),
+}
+INTEGER_METRICS = ("participacoes", "total_pontos", "arremessos_quadra", "acertos_quadra", "eficiencia")
+
+
+def metrics_query(jogos_ids) -> Select:
+    """Linhas (jogo, jogadora) já somadas nos rollups dos jogos de `jogos_ids`.
+
+    Os NULLs viram 0 no próprio banco, então as linhas vão direto para o NumPy.
+    """
+    Rollup = StatisticRollup
+    return select(
+        Rollup.game_id,
+        Rollup.player_id,
+        *[func.coalesce(getattr(Rollup, column), 0).label(column) for column in METRIC_COLUMNS],
+    ).where(
+        Rollup.level == ROLLUP_GAME_PLAYER,
+        Rollup.game_id.in_(jogos_ids),
+    )
+
+
+def load_columns(rows: Sequence) -> Dict[str, np.ndarray]:
+    """Converte as linhas de `metrics_query` em um array por coluna."""
+    width = 2 + len(METRIC_COLUMNS)
+    # Uma passada sobre os valores, sem lista intermediária por linha
+    matrix = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=len(rows) * width).reshape(-1, width)
+    columns = {GROUP_GAME: matrix[:, 0].astype(np.int64), GROUP_PLAYER: matrix[:, 1].astype(np.int64)}
+    columns.update({name: matrix[:, i + 2] for i, name in enumerate(METRIC_COLUMNS)})
+    return columns
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # Sem denominador (ex.: nenhum arremesso) a métrica fica NaN e sai como None
+    return np.divide(numerator, denominator, out=np.full_like(numerator, np.nan), where=denominator > 0)
+
+
+def derived_totals(totals: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Acrescenta aos totais as somas derivadas usadas nas métricas."""
+    fg_attempts = totals["two_attempts"] + totals["three_attempts"]
+    fg_made = totals["two_made"] + totals["three_made"]
+    return {
+        **totals,
+        "fg_attempts": fg_attempts,
+        "fg_made": fg_made,
+        # eFG: a bola de 3 vale 1,5 arremesso convertido
+        "efg_made": fg_made + 0.5 * totals["three_made"],
+        # True shooting: 2 * (FGA + 0,44 * FTA)
+        "ts_attempts": 2 * (fg_attempts + 0.44 * totals["free_throw_attempts"]),
+        # Eficiência (EFF) sem turnovers, que não são registrados
+        "eficiencia": (
+            totals["points"] + totals["rebounds"] + totals["assists"] + totals["steals"] + totals["blocks"]
+            - (fg_attempts - fg_made)
+            - (totals["free_throw_attempts"] - totals["free_throw_made"])
+        ),
+    }
+
+
+def compute_metrics(columns: Dict[str, np.ndarray], group_by: str = GROUP_PLAYER) -> List[Dict[str, Optional[float]]]:
+    """Métricas avançadas por jogadora ou por jogo, todas calculadas em lote.
+
+    Os totais de cada grupo saem de um `bincount` por coluna e as métricas
+    de operações entre os arrays de totais, sem laço por linha.
+    """
+    keys, inverse = np.unique(columns[group_by], return_inverse=True)
+    if not len(keys):
+        return []
+    totals = {
+        name: np.bincount(inverse, weights=columns[name], minlength=len(keys))
+        for name in METRIC_COLUMNS
+    }
+    totals = derived_totals(totals)
+    # Cada linha do rollup é uma participação de jogadora em um jogo
+    jogos = np.bincount(inverse, minlength=len(keys))
+
+    metrics = {
+        name: np.round(_ratio(totals[num], totals[den]), DECIMALS)
+        for name, (num, den) in RATIOS.items()
+    }
+    values = {
+        "participacoes": jogos,
+        "minutos": np.round(totals["minutes_played"], 1),
+        "total_pontos": totals["points"],
+        "arremessos_quadra": totals["fg_attempts"],
+        "acertos_quadra": totals["fg_made"],
+        "eficiencia": totals["eficiencia"],
+        "media_eficiencia": np.round(totals["eficiencia"] / jogos, 2),
+        **metrics,
+    }
+
+    # tolist() devolve tipos nativos do Python; NaN (métrica sem denominador) vira None
+    listas = []
+    for name, array in values.items():
+        if name in INTEGER_METRICS:
+            array = array.astype(np.int64)
+        elif np.isnan(array).any():
+            array = np.where(np.isnan(array), None, array)
+        listas.append(array.tolist())
+    names = [group_by, *values]
+    return [dict(zip(names, linha)) for linha in zip(keys.tolist(), *listas)]
@@ -0,0 +1,206 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.crud.rollup import ROLLUP_FIELDS
+from app.models.game import Game
+from app.models.player import Player
+from app.models.statistic import Statistic
+
+EXPORT_BATCH_SIZE = 5000
+COLUMNAR_FORMATS = ("parquet", "arrow")
+TEXT_FORMATS = ("csv", "ndjson")
+# Mesmo separador da planilha de scout; o BOM faz o Excel reconhecer o UTF-8
+CSV_DELIMITER = ";"
+
+# (nome da coluna exportada, coluna de origem, tipo no Arrow)
+EXPORT_COLUMNS = [
+    ("statistic_id", Statistic.id, "int64"),
+    ("game_id", Game.id, "int64"),
+    ("game_date", Game.date, "timestamp"),
+    ("opponent", Game.opponent, "string"),
+    ("categoria", Game.categoria, "string"),
+    ("location", Game.location, "string"),
+    ("player_id", Player.id, "int64"),
+    ("player_name", Player.name, "string"),
+    ("player_number", Player.number, "int64"),
+    ("player_position", Player.position, "string"),
+    ("quarter", Statistic.quarter, "int64"),
+    *[
+        (field, getattr(Statistic, field), "float64" if field == "minutes_played" else "int64")
+        for field in ROLLUP_FIELDS
+    ],
+]
+COLUMN_NAMES = [name for name, _, _ in EXPORT_COLUMNS]
+
+
+class ExportUnavailable(RuntimeError):
+    """O formato pedido depende de uma biblioteca opcional que não está instalada."""
+
+
+def export_query(
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    categoria: Optional[str] = None,
+    player_id: Optional[int] = None,
+    jogo_id: Optional[int] = None,
+    owner_id: Optional[int] = None,
+) -> Select:
+    """Estatísticas com os dados do jogo e da jogadora, em ordem estável.
+
+    `owner_id` restringe aos jogos de um usuário (a rota sempre passa o
+    usuário logado); sem ele, como no script de exportação, sai tudo.
+    """
+    query = select(*[column.label(name) for name, column, _ in EXPORT_COLUMNS]).select_from(Statistic).join(
+        Game, Game.id == Statistic.game_id
+    ).join(
+        Player, Player.id == Statistic.player_id
+    )
+    if data_inicio:
+        query = query.where(Game.date >= data_inicio)
+    if data_fim:
+        query = query.where(Game.date <= data_fim)
+    if categoria:
+        query = query.where(Game.categoria == categoria)
+    if player_id:
+        query = query.where(Statistic.player_id == player_id)
+    if jogo_id:
+        query = query.where(Statistic.game_id == jogo_id)
+    if owner_id is not None:
+        query = query.where(Game.owner_id == owner_id)
+    return query.order_by(Game.date, Game.id, Statistic.id)
+
+
+def iter_batches(db: Session, query: Select, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List]:
+    """Percorre o resultado em lotes com cursor no servidor (`yield_per`)."""
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    try:
+        for rows in result.partitions():
+            yield rows
+    finally:
+        result.close()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # dependência opcional
+    except ImportError:
+        raise ExportUnavailable("Exportação em Parquet/Arrow requer o pacote pyarrow")
+    return pyarrow
+
+
+def arrow_schema(pa):
+    types = {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types[kind]) for name, _, kind in EXPORT_COLUMNS])
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino de escrita que acumula bytes até serem repassados à resposta."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_columnar(
+    db: Session,
+    query: Select,
+    fmt: str = "parquet",
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Gera o arquivo Parquet (um row group por lote) ou Arrow IPC em pedaços.
+
+    A memória fica limitada a um lote de `batch_size` linhas. Sem pyarrow
+    levanta ExportUnavailable já na chamada, antes de qualquer byte.
+    """
+    pa = _require_pyarrow()
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Formato colunar desconhecido: {fmt}")
+    return _write_columnar(pa, db, query, fmt, batch_size)
+
+
+def _write_columnar(pa, db: Session, query: Select, fmt: str, batch_size: int) -> Iterator[bytes]:
+    schema = arrow_schema(pa)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    else:
+        writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+
+    try:
+        for rows in iter_batches(db, query, batch_size):
+            columns = list(zip(*rows))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_text(
+    db: Session,
+    query: Select,
+    fmt: str = "csv",
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Gera CSV ou NDJSON lote a lote.
+
+    O cabeçalho do CSV sai antes da consulta, então o cliente recebe os
+    primeiros bytes enquanto o banco ainda trabalha.
+    """
+    if fmt not in TEXT_FORMATS:
+        raise ValueError(f"Formato de texto desconhecido: {fmt}")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=CSV_DELIMITER, lineterminator="\r\n")
+    if fmt == "csv":
+        writer.writerow(COLUMN_NAMES)
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    for rows in iter_batches(db, query, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        if fmt == "csv":
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                buffer.write(json.dumps(
+                    {name: _json_value(value) for name, value in zip(COLUMN_NAMES, row)},
+                    ensure_ascii=False,
+                ))
+                buffer.write("\n")
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,339 @@
+import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.crud import rollup
+from app.models.game import Game
+from app.models.player import Player
+from app.models.statistic import Statistic
+
+# Colunas do CSV exportado da planilha de scout (separador ";")
+STAT_COLUMNS = {
+    "Pontos Totais": "points",
+    "Rebotes": "rebounds",
+    "Assistências": "assists",
+    "Roubadas": "steals",
+    "Tocos": "blocks",
+    "Faltas": "fouls",
+    "2 Pontos": "two_made",
+    "3 Pontos": "three_made",
+    "Lance Livre": "free_throw_made",
+}
+DATE_FORMAT = "%d/%m/%Y %H:%M"
+# A planilha não separa por quarto
+DEFAULT_QUARTER = 1
+
+# Chaves naturais usadas na deduplicação: jogadora pelo nome, jogo por
+# adversário + data/hora e estatística por (jogo, jogadora, quarto)
+GameKey = Tuple[str, datetime]
+
+
+@dataclass
+class ParsedRow:
+    player_name: str
+    game_key: GameKey
+    values: Dict[str, int]
+    game_details: Dict[str, Optional[str]] = field(default_factory=dict)
+    quarter: int = DEFAULT_QUARTER
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    players_created: int = 0
+    games_created: int = 0
+    elapsed: float = 0.0
+    dry_run: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        prefixo = "[dry-run] " if self.dry_run else ""
+        return (
+            f"{prefixo}{self.rows} linhas em {self.elapsed:.2f}s ({self.rows_per_second:.0f} linhas/s): "
+            f"{self.inserted} estatísticas novas, {self.skipped} já existentes, {self.invalid} inválidas; "
+            f"{self.players_created} jogadoras e {self.games_created} jogos criados"
+        )
+
+
+def _optional(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+def _int(value: Optional[str]) -> int:
+    value = (value or "").strip()
+    return int(float(value.replace(",", "."))) if value else 0
+
+
+def parse_row(row: Dict[str, str]) -> ParsedRow:
+    """Converte uma linha do CSV; levanta ValueError/KeyError se estiver malformada."""
+    player_name = (row["Nome Jogador"] or "").strip()
+    if not player_name:
+        raise ValueError("linha sem 'Nome Jogador'")
+    game_key = (
+        row["Adversário"].strip(),
+        datetime.strptime(f"{row['Data'].strip()} {row['Horário'].strip()}", DATE_FORMAT),
+    )
+    game_details = {
+        "location": _optional(row.get("Local")),
+        "categoria": _optional(row.get("Categoria")),
+        "time": _optional(row.get("Time")),
+    }
+    values = {column: _int(row.get(header)) for header, column in STAT_COLUMNS.items()}
+    return ParsedRow(player_name=player_name, game_key=game_key, values=values, game_details=game_details)
+
+
+def read_chunks(path: str, chunk_size: int = 1000) -> Iterator[List[Dict[str, str]]]:
+    """Lê o CSV em blocos de `chunk_size` linhas, sem carregar o arquivo inteiro."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        chunk = []
+        for row in csv.DictReader(f, delimiter=";"):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class StatsImporter:
+    """Importa estatísticas em lote.
+
+    Jogadoras e jogos são resolvidos por dicionários pré-carregados (uma
+    consulta cada); cada bloco vira um INSERT em lote de `statistics` e um
+    upsert incremental dos rollups, na mesma transação: se a importação
+    falhar no meio, o que já foi gravado está com os rollups em dia.
+    Estatísticas que já existem (jogo, jogadora, quarto) são ignoradas. Em
+    dry-run tudo roda na mesma transação, desfeita no final.
+    """
+
+    def __init__(self, db: Session, owner_id: int = 1, dry_run: bool = False):
+        self.db = db
+        self.owner_id = owner_id
+        self.dry_run = dry_run
+        self.players: Dict[str, int] = {}
+        self.games: Dict[GameKey, int] = {}
+        self.report = ImportReport(dry_run=dry_run)
+        self._preloaded = False
+
+    def preload(self) -> None:
+        # Em nomes/jogos repetidos no banco vale o de menor id
+        self.players = {
+            name: id for id, name in self.db.execute(select(Player.id, Player.name).order_by(Player.id.desc()))
+        }
+        self.games = {
+            (opponent, date): id
+            for id, opponent, date in self.db.execute(
+                select(Game.id, Game.opponent, Game.date).order_by(Game.id.desc())
+            )
+        }
+        self._preloaded = True
+
+    def _resolve_players(self, names: Iterable[str]) -> None:
+        now = datetime.now()
+        new = [{"name": name, "number": 0, "created_at": now} for name in names if name not in self.players]
+        if not new:
+            return
+        created = self.db.execute(insert(Player).returning(Player.id, Player.name), new)
+        self.players.update({name: id for id, name in created})
+        self.report.players_created += len(new)
+
+    def _resolve_games(self, rows: Iterable[ParsedRow]) -> None:
+        now = datetime.now()
+        new = {}
+        for row in rows:
+            if row.game_key not in self.games and row.game_key not in new:
+                opponent, date = row.game_key
+                new[row.game_key] = {
+                    "opponent": opponent,
+                    "date": date,
+                    **row.game_details,
+                    "status": "FINALIZADO",
+                    "owner_id": self.owner_id,
+                    "created_at": now,
+                }
+        if not new:
+            return
+        created = self.db.execute(insert(Game).returning(Game.id, Game.opponent, Game.date), list(new.values()))
+        self.games.update({(opponent, date): id for id, opponent, date in created})
+        self.report.games_created += len(new)
+
+    def import_rows(self, rows: List[ParsedRow]) -> None:
+        """Grava um bloco de linhas já convertidas (sem commit)."""
+        if not self._preloaded:
+            self.preload()
+        self._resolve_players(dict.fromkeys(row.player_name for row in rows))
+        self._resolve_games(rows)
+
+        game_ids = {self.games[row.game_key] for row in rows}
+        existing = set(self.db.execute(
+            select(Statistic.game_id, Statistic.player_id, Statistic.quarter)
+            .where(Statistic.game_id.in_(game_ids))
+        ).all())
+
+        now = datetime.utcnow()
+        new_rows = []
+        totals = {}
+        for row in rows:
+            key = (self.games[row.game_key], self.players[row.player_name], row.quarter)
+            if key in existing:
+                self.report.skipped += 1
+                continue
+            existing.add(key)
+            rollup.accumulate(totals, key[0], row.game_key[1], key[1], key[2], row.values, 1)
+            new_rows.append({
+                "game_id": key[0],
+                "player_id": key[1],
+                "quarter": key[2],
+                "created_at": now,
+                "updated_at": now,
+                **row.values,
+            })
+        if new_rows:
+            self.db.execute(insert(Statistic), new_rows)
+            rollup.apply_totals(self.db, totals)
+        self.report.inserted += len(new_rows)
+
+    def import_chunk(self, chunk: List[Dict[str, str]], first_line: int = 2) -> None:
+        parsed = []
+        for offset, raw in enumerate(chunk):
+            try:
+                parsed.append(parse_row(raw))
+            except (KeyError, ValueError, AttributeError) as e:
+                self.report.invalid += 1
+                self.report.errors.append(f"linha {first_line + offset}: {e}")
+        self.report.rows += len(chunk)
+        if parsed:
+            self.import_rows(parsed)
+        if not self.dry_run:
+            self.db.commit()
+
+    def finish(self) -> ImportReport:
+        """Encerra a transação; em dry-run desfaz tudo."""
+        if self.dry_run:
+            self.db.rollback()
+        else:
+            self.db.commit()
+        return self.report
+
+
+def import_csv(db: Session, path: str, chunk_size: int = 1000, dry_run: bool = False,
+               owner_id: int = 1) -> ImportReport:
+    """Importa um CSV de estatísticas em blocos de `chunk_size` linhas."""
+    start = time.perf_counter()
+    importer = StatsImporter(db, owner_id=owner_id, dry_run=dry_run)
+    line = 2  # linha 1 é o cabeçalho
+    try:
+        for chunk in read_chunks(path, chunk_size):
+            importer.import_chunk(chunk, first_line=line)
+            line += len(chunk)
+        report = importer.finish()
+    except Exception:
+        db.rollback()
+        raise
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+@dataclass
+class ParsedFile:
+    path: str
+    rows: List[ParsedRow]
+    total: int
+    errors: List[str]
+    elapsed: float
+
+
+def parse_file(path: str) -> ParsedFile:
+    """Lê e converte um CSV inteiro; roda nos processos do pool de `import_files`."""
+    start = time.perf_counter()
+    rows, errors, total = [], [], 0
+    line = 2  # linha 1 é o cabeçalho
+    for chunk in read_chunks(path):
+        for raw in chunk:
+            try:
+                rows.append(parse_row(raw))
+            except (KeyError, ValueError, AttributeError) as e:
+                errors.append(f"linha {line}: {e}")
+            line += 1
+        total += len(chunk)
+    return ParsedFile(path=path, rows=rows, total=total, errors=errors, elapsed=time.perf_counter() - start)
+
+
+def expand_paths(targets: Iterable[str]) -> List[str]:
+    """Resolve arquivos, diretórios (todos os *.csv) e globs, sem repetir arquivos."""
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(sorted(glob.glob(os.path.join(target, "*.csv"))))
+        elif os.path.isfile(target):
+            paths.append(target)
+        else:
+            paths.extend(sorted(glob.glob(target, recursive=True)))
+    return list(dict.fromkeys(os.path.abspath(path) for path in paths))
+
+
+def import_files(
+    db: Session,
+    paths: List[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    dry_run: bool = False,
+    owner_id: int = 1,
+) -> Tuple[ImportReport, List[Tuple[str, ImportReport]]]:
+    """Importa vários CSVs: a leitura roda num pool de processos e um único
+    escritor (esta sessão) grava os arquivos conforme ficam prontos.
+
+    A deduplicação pelas chaves naturais torna a reimportação idempotente,
+    inclusive com a mesma linha em arquivos diferentes. Retorna o total e o
+    relatório de cada arquivo, na ordem de `paths`.
+    """
+    start = time.perf_counter()
+    importer = StatsImporter(db, owner_id=owner_id, dry_run=dry_run)
+    reports: Dict[str, ImportReport] = {}
+
+    def write(parsed: ParsedFile) -> None:
+        report = ImportReport(rows=parsed.total, invalid=len(parsed.errors), errors=parsed.errors, dry_run=dry_run)
+        importer.report = report
+        write_start = time.perf_counter()
+        for offset in range(0, len(parsed.rows), chunk_size):
+            importer.import_rows(parsed.rows[offset:offset + chunk_size])
+            if not dry_run:
+                db.commit()
+        report.elapsed = parsed.elapsed + time.perf_counter() - write_start
+        reports[parsed.path] = report
+
+    try:
+        if workers == 1 or len(paths) <= 1:
+            for path in paths:
+                write(parse_file(path))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for future in as_completed([pool.submit(parse_file, path) for path in paths]):
+                    write(future.result())
+        importer.finish()
+    except Exception:
+        db.rollback()
+        raise
+
+    total = ImportReport(dry_run=dry_run, elapsed=time.perf_counter() - start)
+    for report in reports.values():
+        for name in ("rows", "inserted", "skipped", "invalid", "players_created", "games_created"):
+            setattr(total, name, getattr(total, name) + getattr(report, name))
+        total.errors.extend(report.errors)
+    return total, [(path, reports[path]) for path in paths]
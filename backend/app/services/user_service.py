@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.models.user import User, UserRole, UserPlan
 from app.schemas.user import UserCreate, UserUpdate, UserFilter, UserPagination
 from app.core.security import get_password_hash, verify_password
+from app.core.identity import invalidate_user_identity
 from app.repositories.user_repository import UserRepository
 
 class UserService:
@@ -34,14 +35,21 @@ class UserService:
         if not db_user:
             return None
 
+        email_anterior = db_user.email
         update_data = user_data.dict(exclude_unset=True)
         if "password" in update_data:
             update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
 
-        return self.repository.update(db_user, update_data)
+        updated = self.repository.update(db_user, update_data)
+        invalidate_user_identity(user_id, email_anterior, updated.email)
+        return updated
 
     def delete_user(self, user_id: int) -> bool:
-        return self.repository.delete(user_id)
+        db_user = self.get_user_by_id(user_id)
+        deleted = self.repository.delete(user_id)
+        if db_user is not None:
+            invalidate_user_identity(user_id, db_user.email)
+        return deleted
 
     def list_users(self, filters: UserFilter, pagination: UserPagination) -> List[User]:
         return self.repository.list(filters, pagination)
@@ -80,4 +88,6 @@ class UserService:
             "card_brand": stripe_data.get("card_brand")
         }
 
-        return self.repository.update(user, update_data) 
\ No newline at end of file
+        updated = self.repository.update(user, update_data)
+        invalidate_user_identity(user_id, updated.email)
+        return updated 
\ No newline at end of file
@@ -0,0 +1,28 @@
+import sys
+import os
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.crud.rollup import rebuild_rollups
+from app.models import StatisticRollup
+
+def backfill_rollups():
+    """Recalcula a tabela statistic_rollups a partir de todas as estatísticas"""
+    db = SessionLocal()
+    try:
+        print("Recalculando rollups de estatísticas...")
+        rebuild_rollups(db)
+        db.commit()
+        total = db.query(StatisticRollup).count()
+        print(f"Rollups recalculados com sucesso! Linhas geradas: {total}")
+    except Exception as e:
+        print(f"Erro ao recalcular rollups: {str(e)}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_rollups()
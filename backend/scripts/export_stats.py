@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Adiciona o diretório raiz ao PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.stats_export import (
+    ExportUnavailable,
+    export_query,
+    iter_columnar,
+    iter_text,
+    EXPORT_BATCH_SIZE,
+    TEXT_FORMATS,
+)
+
+FORMATOS = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".arrows": "arrow",
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+def export_stats(argv=None):
+    """Exporta estatísticas (com jogo e jogadora) para Parquet, Arrow IPC, CSV ou NDJSON"""
+    parser = argparse.ArgumentParser(description=export_stats.__doc__)
+    parser.add_argument("destino", help="arquivo de saída (.parquet, .arrow, .csv, .ndjson)")
+    parser.add_argument("--formato", choices=["parquet", "arrow", "csv", "ndjson"], help="padrão: pela extensão do destino")
+    parser.add_argument("--data-inicio", type=datetime.fromisoformat)
+    parser.add_argument("--data-fim", type=datetime.fromisoformat)
+    parser.add_argument("--categoria")
+    parser.add_argument("--jogo-id", type=int)
+    parser.add_argument("--player-id", type=int)
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="linhas por lote (row group no Parquet)")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or FORMATOS.get(os.path.splitext(args.destino)[1].lower(), "parquet")
+    db = SessionLocal()
+    try:
+        query = export_query(args.data_inicio, args.data_fim, args.categoria, args.player_id, args.jogo_id)
+        iterar = iter_text if formato in TEXT_FORMATS else iter_columnar
+        total = 0
+        with open(args.destino, "wb") as f:
+            for chunk in iterar(db, query, formato, args.batch_size):
+                total += f.write(chunk)
+        print(f"Exportação concluída: {args.destino} ({formato}, {total} bytes)")
+    except ExportUnavailable as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Erro ao exportar estatísticas: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    export_stats()
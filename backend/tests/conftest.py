@@ -1,23 +1,56 @@
+import os
+import tempfile
+
+# Nos testes o worker de email não sobe com a aplicação; os testes da
+# outbox o executam explicitamente contra o SMTP stub
+os.environ.setdefault("EMAIL_WORKER_ENABLED", "false")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
 from app.main import app
 from app.core.security import get_password_hash
+from app.core.cache import dashboard_cache
+from app.core.identity import identity_cache
+from app.crud.notification import unread_cache
 from app.models import User
 
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# Arquivo (e não ":memory:") para que o engine síncrono e o assíncrono
+# (aiosqlite) enxerguem o mesmo banco
+SQLALCHEMY_DATABASE_PATH = os.path.join(tempfile.mkdtemp(prefix="scoremvp-tests-"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{SQLALCHEMY_DATABASE_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: cada TestClient roda num event loop próprio, conexões não são reaproveitadas
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{SQLALCHEMY_DATABASE_PATH}",
+    poolclass=NullPool,
+)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    dashboard_cache.clear()
+    dashboard_cache.reset_stats()
+    # Ids e emails se repetem entre testes: identidades antigas não podem vazar
+    identity_cache.clear()
+    identity_cache.reset_stats()
+    unread_cache.clear()
+    yield
+    dashboard_cache.clear()
+    identity_cache.clear()
+    unread_cache.clear()
+
 @pytest.fixture(scope="function")
 def db():
     Base.metadata.create_all(bind=engine)
@@ -36,7 +69,12 @@ def client(db):
         finally:
             db.close()
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -51,4 +89,12 @@ def test_user(db):
     db.add(user)
     db.commit()
     db.refresh(user)
-    return user 
\ No newline at end of file
+    return user 
+
+@pytest.fixture
+def smtp_server():
+    from smtp_stub import SMTPStub
+
+    server = SMTPStub().start()
+    yield server
+    server.stop()
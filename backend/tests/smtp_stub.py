@@ -0,0 +1,103 @@
+"""Servidor SMTP mínimo para testes (e para rodar o backend localmente).
+
+Aceita EHLO/HELO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP e QUIT, sem
+TLS, e guarda as mensagens recebidas em memória. Destinatários em
+`reject` recebem 550.
+
+Uso local:
+    python tests/smtp_stub.py 1025
+    MAILERSEND_SMTP_SERVER=localhost MAILERSEND_SMTP_PORT=1025 EMAIL_SMTP_STARTTLS=false uvicorn app.main:app
+"""
+import socketserver
+import sys
+import threading
+from typing import List, Set
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), SMTPHandler)
+        self.messages: List[dict] = []
+        self.reject: Set[str] = set()
+        self.connections = 0
+        self.logins = 0
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "SMTPStub":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server: SMTPStub = self.server
+        with server._lock:
+            server.connections += 1
+        self.reply("220 smtp-stub ESMTP")
+        mail_from, recipients = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode().rstrip("\r\n")
+            command = line[:4].upper()
+            if command in ("EHLO", "HELO"):
+                self.reply("250-smtp-stub")
+                self.reply("250 AUTH PLAIN")
+            elif command == "AUTH":
+                with server._lock:
+                    server.logins += 1
+                self.reply("235 Authentication successful")
+            elif command == "MAIL":
+                mail_from, recipients = line.split(":", 1)[1].strip(" <>").split(">")[0], []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                recipient = line.split(":", 1)[1].strip(" <>").split(">")[0]
+                if recipient in server.reject:
+                    self.reply("550 Mailbox unavailable")
+                else:
+                    recipients.append(recipient)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline().decode()
+                    if chunk in (".\r\n", ".\n", ""):
+                        break
+                    data.append(chunk)
+                with server._lock:
+                    server.messages.append({"from": mail_from, "to": recipients, "data": "".join(data)})
+                self.reply("250 OK")
+            elif command in ("RSET", "NOOP"):
+                mail_from, recipients = None, []
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+if __name__ == "__main__":
+    stub = SMTPStub(port=int(sys.argv[1]) if len(sys.argv) > 1 else 1025)
+    print(f"SMTP stub em 127.0.0.1:{stub.port}")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        for message in stub.messages:
+            print(message["to"], message["data"][:200])
@@ -1 +1,60 @@
- 
\ No newline at end of file
+import asyncio
+import threading
+
+from app.core import security
+
+
+def test_login_returns_token(client, test_user):
+    response = client.post(
+        "/api/auth/login",
+        data={"username": test_user.email, "password": "testpass123"},
+    )
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+    response = client.post(
+        "/api/auth/login",
+        data={"username": "test@example.com", "password": "errada"},
+    )
+    assert response.status_code == 401
+
+
+def test_password_hashing_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    verify_password = security.verify_password
+
+    def recording_verify(plain, hashed):
+        threads.append(threading.current_thread().name)
+        return verify_password(plain, hashed)
+
+    monkeypatch.setattr(security, "verify_password", recording_verify)
+
+    async def main():
+        hashed = await security.get_password_hash_async("segredo")
+        return (
+            await security.verify_password_async("segredo", hashed),
+            await security.verify_password_async("outro", hashed),
+        )
+
+    assert asyncio.run(main()) == (True, False)
+    assert threads and all(name.startswith("password-hash") for name in threads)
+
+
+def test_register_hashes_on_password_pool(client, monkeypatch):
+    threads = []
+    get_password_hash = security.get_password_hash
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return get_password_hash(password)
+
+    monkeypatch.setattr(security, "get_password_hash", recording_hash)
+    payload = {"name": "Nova", "email": "nova@example.com", "password": "segredo123"}
+
+    response = client.post("/api/auth/register", json=payload)
+    assert response.status_code == 201, response.text
+    assert threads and all(name.startswith("password-hash") for name in threads)
+    assert client.post("/api/auth/login", data={"username": "nova@example.com", "password": "segredo123"}).status_code == 200
+
+    assert client.post("/api/auth/register", json=payload).status_code == 400
+
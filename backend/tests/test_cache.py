@@ -0,0 +1,83 @@
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import app.core.cache as cache_module
+import app.routes.dashboard as dashboard_routes
+from app.core.cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache
+
+
+class FakeRedis:
+    """Stand-in mínimo da API do redis-py usada pelo RedisCacheBackend."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [k.encode() for k in list(self.data) if k.startswith(prefix)]
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    assert backend.get("a") == 1
+    backend.set("c", 3, ttl=60)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryCacheBackend()
+    backend.set("a", 1, ttl=0)
+    time.sleep(0.01)
+    assert backend.get("a") is None
+    assert backend.keys() == []
+
+
+def test_response_cache_counts_and_invalidates_with_redis_backend():
+    cache = ResponseCache(RedisCacheBackend(FakeRedis()), ttl=60)
+    key = cache.make_key("jogos", None, None, 7)
+    other = cache.make_key("jogos", None, None, 8)
+
+    assert cache.get(key) is None
+    cache.set(key, [{"id": 7}])
+    cache.set(other, [{"id": 8}])
+    assert cache.get(key) == [{"id": 7}]
+
+    assert cache.invalidate(lambda parts: parts[3] == 7) == 1
+    assert cache.get(key) is None
+    assert cache.get(other) == [{"id": 8}]
+    assert cache.stats() == {"hits": 2, "misses": 2, "entries": 1}
+
+
+def test_caches_sharing_redis_use_separate_namespaces(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setitem(sys.modules, "fakeredis", SimpleNamespace(FakeRedis=lambda: redis))
+    dashboard = ResponseCache(cache_module.create_backend("dashboard", name="fakeredis"), ttl=60)
+    identity = ResponseCache(cache_module.create_backend("identity", name="fakeredis"), ttl=60)
+    monkeypatch.setattr(dashboard_routes, "dashboard_cache", dashboard)
+
+    dashboard.set(dashboard.make_key("jogos", None, None, 7), {"id": 7})
+    identity.set(identity.make_key("identity", "1"), {"id": 1})
+    # chave de outro formato no namespace do dashboard não derruba a invalidação
+    dashboard.set(dashboard.make_key("outro"), 1)
+
+    assert dashboard_routes.invalidate_dashboard_cache(7, datetime(2024, 1, 1)) == 1
+    assert dashboard.stats()["entries"] == 1
+    assert identity.stats()["entries"] == 1
+    dashboard.clear()
+    assert identity.get(identity.make_key("identity", "1")) == {"id": 1}
@@ -0,0 +1,345 @@
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.cache import dashboard_cache
+from app.core.identity import identity_cache
+from app.core.security import create_access_token
+from app.crud import rollup
+from app.crud.rollup import rebuild_rollups
+from app.models import Game, Player, Statistic, StatisticRollup
+
+
+@contextmanager
+def count_queries(engine=Engine):
+    # Por padrão escuta todos os engines, inclusive o síncrono por trás do assíncrono
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_season(db, owner_id, n_players, n_games=3):
+    year = datetime.now().year
+    games = [
+        Game(
+            opponent=f"Adversário {i}",
+            date=datetime(year, 1, 1, 19) + timedelta(days=i),
+            owner_id=owner_id,
+            created_at=datetime.now(),
+        )
+        for i in range(n_games)
+    ]
+    players = [
+        Player(name=f"Jogadora {i}", number=i, created_at=datetime.now())
+        for i in range(n_players)
+    ]
+    db.add_all(games + players)
+    db.flush()
+    for game in games:
+        for player in players:
+            for quarter in (1, 2):
+                db.add(Statistic(
+                    game_id=game.id,
+                    player_id=player.id,
+                    quarter=quarter,
+                    points=player.number + quarter,
+                    assists=1,
+                    rebounds=2,
+                    steals=0,
+                    fouls=1,
+                ))
+    rebuild_rollups(db)
+    db.commit()
+    # Escritas diretas no banco não passam pela invalidação das rotas
+    dashboard_cache.clear()
+    return games, players
+
+
+def rollup_snapshot(db):
+    return sorted(
+        (r.level, r.season, r.month or 0, r.game_id or 0, r.player_id or 0, r.quarter or 0, r.stat_count, r.points, r.rebounds)
+        for r in db.query(StatisticRollup).all()
+    )
+
+
+def test_public_jogadoras_stats_shape(client, db, test_user):
+    games, players = seed_season(db, test_user.id, n_players=2)
+
+    response = client.get("/api/dashboard/public/jogadoras")
+    assert response.status_code == 200
+    data = response.json()
+    assert [j["id"] for j in data] == [p.id for p in players]
+
+    jogadora = data[1]
+    assert jogadora["name"] == "Jogadora 1"
+    assert jogadora["total_jogos"] == len(games) * 2
+    assert jogadora["total_pontos"] == len(games) * (2 + 3)
+    assert jogadora["media_pontos"] == 2.5
+    assert jogadora["total_assistencias"] == len(games) * 2
+    assert jogadora["media_faltas"] == 1
+
+
+def test_public_jogadoras_stats_filters_by_game(client, db, test_user):
+    games, players = seed_season(db, test_user.id, n_players=3)
+
+    response = client.get("/api/dashboard/public/jogadoras", params={"jogo_id": games[0].id})
+    assert response.status_code == 200
+    assert all(j["total_jogos"] == 2 for j in response.json())
+
+    response = client.get("/api/dashboard/public/jogadoras", params={"jogo_id": 9999})
+    assert response.json() == []
+
+
+def test_public_jogos_stats_by_quarter(client, db, test_user):
+    games, players = seed_season(db, test_user.id, n_players=2)
+    year = datetime.now().year
+    sem_estatisticas = Game(
+        opponent="Sem estatísticas",
+        date=datetime(year, 1, 1, 10),
+        owner_id=test_user.id,
+        created_at=datetime.now(),
+    )
+    db.add(sem_estatisticas)
+    db.commit()
+
+    response = client.get("/api/dashboard/public/jogos")
+    assert response.status_code == 200
+    data = response.json()
+    assert [j["opponent"] for j in data] == [
+        "Adversário 2", "Adversário 1", "Adversário 0", "Sem estatísticas"
+    ]
+
+    jogo = data[0]
+    assert jogo["total_jogadoras"] == 4
+    assert jogo["total_pontos"] == (0 + 1) + (1 + 1) + (0 + 2) + (1 + 2)
+    assert [q["quarto"] for q in jogo["por_quarto"]] == [1, 2]
+    assert jogo["por_quarto"][0]["total_pontos"] == 3
+    assert jogo["por_quarto"][1]["total_rebotes"] == 4
+
+    assert data[-1]["total_pontos"] == 0
+    assert data[-1]["por_quarto"] == []
+
+
+@pytest.mark.parametrize("endpoint", [
+    "/api/dashboard/public/jogadoras",
+    "/api/dashboard/public/jogos",
+])
+def test_public_dashboard_query_count_is_constant(client, db, test_user, endpoint):
+    """Benchmark: o número de consultas não cresce com o elenco nem com os jogos."""
+    owner_id = test_user.id
+
+    seed_season(db, owner_id, n_players=5)
+    with count_queries() as small_roster:
+        assert client.get(endpoint).status_code == 200
+
+    seed_season(db, owner_id, n_players=50, n_games=40)
+    with count_queries() as large_roster:
+        response = client.get(endpoint)
+        assert response.status_code == 200
+
+    assert small_roster
+    assert len(large_roster) == len(small_roster)
+
+
+def test_public_dashboard_follows_statistic_writes(client, db, test_user):
+    games, players = seed_season(db, test_user.id, n_players=1, n_games=1)
+    game_id, player_id = games[0].id, players[0].id
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+    payload = {
+        "game_id": game_id,
+        "player_id": player_id,
+        "quarter": 3,
+        "points": 7,
+        "assists": 0,
+        "rebounds": 1,
+        "steals": 0,
+        "fouls": 0,
+        "two_attempts": 4,
+        "two_made": 2,
+        "three_attempts": 1,
+        "three_made": 1,
+        "free_throw_attempts": 0,
+        "free_throw_made": 0,
+        "interference": 0,
+    }
+
+    response = client.post("/api/estatisticas", json=payload, headers=headers)
+    assert response.status_code == 201
+    statistic_id = response.json()["id"]
+    jogo = client.get("/api/dashboard/public/jogos").json()[0]
+    assert jogo["total_pontos"] == 1 + 2 + 7
+    assert [q["quarto"] for q in jogo["por_quarto"]] == [1, 2, 3]
+
+    response = client.put(f"/api/estatisticas/{statistic_id}", json={"points": 10}, headers=headers)
+    assert response.status_code == 200
+    jogadora = client.get("/api/dashboard/public/jogadoras").json()[0]
+    assert jogadora["total_pontos"] == 1 + 2 + 10
+    assert jogadora["total_jogos"] == 3
+
+    incremental = rollup_snapshot(db)
+    rebuild_rollups(db)
+    assert rollup_snapshot(db) == incremental
+
+    response = client.delete(f"/api/estatisticas/{statistic_id}", headers=headers)
+    assert response.status_code == 204
+    jogo = client.get("/api/dashboard/public/jogos").json()[0]
+    assert jogo["total_pontos"] == 3
+    assert [q["quarto"] for q in jogo["por_quarto"]] == [1, 2]
+
+    overview = client.get("/api/dashboard/public/overview").json()
+    assert overview["estatisticas_gerais"]["total_pontos"] == 3
+    assert overview["estatisticas_gerais"]["media_pontos"] == 1.5
+    assert overview["jogadora_mais_pontos"]["id"] == player_id
+
+
+def test_rollup_deltas_are_summed_in_place(db, test_user):
+    games, players = seed_season(db, test_user.id, n_players=1, n_games=1)
+    game, player_id = games[0], players[0].id
+    before = rollup_snapshot(db)
+
+    # Dois escritores na mesma chave: a soma acontece no banco, sem linha nova
+    rollup.apply_delta(db, game, player_id, 1, {"points": 5}, 0)
+    rollup.apply_delta(db, game, player_id, 1, {"points": 2}, 0)
+    db.commit()
+    after = rollup_snapshot(db)
+    assert len(after) == len(before)
+    game_row = next(r for r in db.query(StatisticRollup).filter_by(level="game", game_id=game.id))
+    assert game_row.points == (0 + 1) + (0 + 2) + 5 + 2
+
+    # Recorte que fica sem estatísticas é apagado
+    rollup.apply_delta(db, game, player_id, 3, {"points": 4}, 1)
+    db.commit()
+    assert db.query(StatisticRollup).filter_by(level="game_quarter", quarter=3).count() == 1
+    rollup.apply_delta(db, game, player_id, 3, {"points": -4}, -1)
+    db.commit()
+    assert db.query(StatisticRollup).filter_by(level="game_quarter", quarter=3).count() == 0
+
+    # A chave é única mesmo com colunas nulas
+    db.add(StatisticRollup(level="game", season=game.date.year, game_id=game.id, stat_count=1))
+    with pytest.raises(IntegrityError):
+        db.flush()
+    db.rollback()
+
+
+def test_public_dashboard_cache_hits_and_invalidation(client, db, test_user):
+    games, players = seed_season(db, test_user.id, n_players=1, n_games=1)
+    game_id, player_id = games[0].id, players[0].id
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+
+    primeira = client.get("/api/dashboard/public/jogos").json()
+    with count_queries() as statements:
+        assert client.get("/api/dashboard/public/jogos").json() == primeira
+    assert statements == []
+
+    por_jogo = client.get("/api/dashboard/public/jogadoras", params={"jogo_id": game_id}).json()
+    assert por_jogo[0]["total_pontos"] == 3
+    outro_periodo = client.get("/api/dashboard/public/jogos", params={"data_fim": "2000-01-01T00:00:00"})
+    assert outro_periodo.json() == []
+    assert dashboard_cache.stats()["entries"] == 3
+
+    response = client.post("/api/estatisticas", headers=headers, json={
+        "game_id": game_id, "player_id": player_id, "quarter": 4, "points": 5,
+        "assists": 0, "rebounds": 0, "steals": 0, "fouls": 0,
+        "two_attempts": 0, "two_made": 0, "three_attempts": 0, "three_made": 0,
+        "free_throw_attempts": 0, "free_throw_made": 0, "interference": 0,
+    })
+    assert response.status_code == 201
+
+    # Só a resposta do período que não inclui o jogo continua no cache
+    assert dashboard_cache.stats()["entries"] == 1
+    assert client.get("/api/dashboard/public/jogos").json()[0]["total_pontos"] == 8
+    por_jogo = client.get("/api/dashboard/public/jogadoras", params={"jogo_id": game_id}).json()
+    assert por_jogo[0]["total_pontos"] == 8
+
+    stats = client.get("/api/dashboard/cache/stats", headers=headers).json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 5
+
+
+def test_public_dashboard_etag(client, db, test_user):
+    seed_season(db, test_user.id, n_players=2, n_games=1)
+
+    response = client.get("/api/dashboard/public/jogadoras")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get("/api/dashboard/public/jogadoras", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get("/api/dashboard/public/jogos", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def bulk_item(player_id, quarter, points):
+    return {
+        "player_id": player_id, "quarter": quarter, "points": points,
+        "assists": 1, "rebounds": 1, "steals": 0, "fouls": 0,
+        "two_attempts": 0, "two_made": 0, "three_attempts": 0, "three_made": 0,
+        "free_throw_attempts": 0, "free_throw_made": 0, "interference": 0,
+    }
+
+
+def test_bulk_statistics_upsert(client, db, test_user):
+    games, players = seed_season(db, test_user.id, n_players=3, n_games=1)
+    game_id, player_ids = games[0].id, [p.id for p in players]
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+    url = f"/api/estatisticas/game/{game_id}/bulk"
+
+    items = [bulk_item(player_id, 3, 4) for player_id in player_ids]
+    items.append(bulk_item(player_ids[0], 1, 10))
+    # Repetição dentro do lote: vale a última linha
+    items.append(bulk_item(player_ids[0], 1, 20))
+    response = client.post(url, json={"items": items}, headers=headers)
+    assert response.status_code == 201
+    data = response.json()
+    assert len(data) == 4
+    assert {(s["player_id"], s["points"]) for s in data} == {
+        (player_ids[0], 4), (player_ids[1], 4), (player_ids[2], 4), (player_ids[0], 20)
+    }
+    assert db.query(Statistic).filter(Statistic.game_id == game_id).count() == 3 * 2 + 3
+
+    jogo = client.get("/api/dashboard/public/jogos").json()[0]
+    assert [q["quarto"] for q in jogo["por_quarto"]] == [1, 2, 3]
+    # Quarto 1 da jogadora 0 sobrescrito (1 -> 20), quarto 3 novo para todas
+    assert jogo["total_pontos"] == (20 + 2 + 3) + (2 + 3 + 4) + 3 * 4
+
+    incremental = rollup_snapshot(db)
+    rebuild_rollups(db)
+    assert rollup_snapshot(db) == incremental
+
+    response = client.post(url, json={"items": [bulk_item(9999, 1, 1)]}, headers=headers)
+    assert response.status_code == 404
+    assert "9999" in response.json()["detail"]
+
+
+def test_bulk_statistics_query_count_is_constant(client, db, test_user):
+    """Benchmark: o lote custa o mesmo número de consultas com 2 ou 40 linhas."""
+    owner_id = test_user.id
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+
+    counts = []
+    for n_players in (2, 20):
+        games, players = seed_season(db, owner_id, n_players=n_players, n_games=1)
+        items = [bulk_item(p.id, q, 1) for p in players for q in (2, 3)]
+        url = f"/api/estatisticas/game/{games[0].id}/bulk"
+        # Mesma situação nas duas medições: identidade do usuário fora do cache
+        identity_cache.clear()
+        with count_queries() as statements:
+            assert client.post(url, json={"items": items}, headers=headers).status_code == 201
+        counts.append(len([s for s in statements if not s.lstrip().upper().startswith("INSERT")]))
+        # Rollups atualizados por variação, sem refazer a temporada
+        assert not [s for s in statements if s.lstrip().upper().startswith("DELETE")]
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.db_pool import engine_options, instrumented_pool_class, pool_status
+
+
+def test_pool_status_reports_checkouts_and_waits(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented_pool_class(QueuePool),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    conexao = engine.connect()
+    status = pool_status(engine)
+    assert status["checked_out"] == 1
+    assert status["idle"] == 0
+    assert status["checkouts"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    status = pool_status(engine)
+    assert status["timeouts"] == 1
+    assert status["wait_max_ms"] >= 50
+
+    conexao.close()
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["idle"] == 1
+    engine.dispose()
+
+
+def test_engine_options_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+    options = engine_options("postgresql://u:p@localhost/db")
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    options = engine_options("postgresql+asyncpg://u:p@localhost/db")
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    assert engine_options("sqlite:///teste.db") == {"pool_pre_ping": True}
+
+
+def test_health_db(client):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    assert set(response.json()) == {"sync", "async"}
+    assert response.json()["sync"]["size"] == settings.DB_POOL_SIZE
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.email import SMTPSession, email_service, enqueue_email
+from app.models.email_outbox import EmailOutbox, EMAIL_PENDING, EMAIL_SENT, EMAIL_FAILED, EMAIL_SENDING
+from app.services.email_worker import EmailWorker
+
+
+def make_worker(db, smtp_server, **kwargs):
+    return EmailWorker(
+        session_factory=sessionmaker(bind=db.get_bind()),
+        smtp_factory=lambda: SMTPSession(
+            "127.0.0.1", smtp_server.port, "usuario", "senha", starttls=False
+        ),
+        **kwargs,
+    )
+
+
+def enqueue(db, *destinatarios):
+    for to_email in destinatarios:
+        enqueue_email(db, to_email, "Assunto", "<p>Corpo</p>")
+    db.commit()
+
+
+def test_batch_is_sent_over_one_smtp_session(db, smtp_server):
+    enqueue(db, *[f"jogadora{i}@example.com" for i in range(5)])
+    worker = make_worker(db, smtp_server, batch_size=3)
+
+    assert worker.process_batch() == 3
+    assert worker.process_batch() == 2
+    assert worker.process_batch() == 0
+    worker.stop()
+
+    assert [m["to"] for m in smtp_server.messages] == [[f"jogadora{i}@example.com"] for i in range(5)]
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+    db.expire_all()
+    assert {m.status for m in db.query(EmailOutbox).all()} == {EMAIL_SENT}
+
+
+def test_rejected_recipient_is_retried_with_backoff(db, smtp_server):
+    smtp_server.reject.add("invalido@example.com")
+    enqueue(db, "invalido@example.com", "valido@example.com")
+    worker = make_worker(db, smtp_server, backoff_seconds=60, max_attempts=2)
+
+    assert worker.process_batch() == 2
+    db.expire_all()
+    invalido, valido = db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+    assert valido.status == EMAIL_SENT
+    assert invalido.status == EMAIL_PENDING
+    assert invalido.attempts == 1
+    assert invalido.next_attempt_at > datetime.utcnow() + timedelta(seconds=50)
+
+    # Ainda no backoff: nada a enviar
+    assert worker.process_batch() == 0
+
+    invalido.next_attempt_at = datetime.utcnow()
+    db.commit()
+    assert worker.process_batch() == 1
+    db.expire_all()
+    assert db.get(EmailOutbox, invalido.id).status == EMAIL_FAILED
+    worker.stop()
+
+
+def test_smtp_down_reschedules_and_pending_survive_restart(db, smtp_server):
+    enqueue(db, "a@example.com", "b@example.com")
+    porta = smtp_server.port
+    smtp_server.stop()
+
+    worker = make_worker(db, smtp_server)
+    assert worker.process_batch() == 2
+    db.expire_all()
+    mensagens = db.query(EmailOutbox).all()
+    assert all(m.status == EMAIL_PENDING and m.attempts == 1 for m in mensagens)
+
+    # Mensagem reservada por um processo que morreu no meio do envio
+    mensagens[0].status = EMAIL_SENDING
+    mensagens[0].claimed_at = datetime.utcnow() - timedelta(hours=1)
+    for m in mensagens:
+        m.next_attempt_at = datetime.utcnow()
+    db.commit()
+
+    from smtp_stub import SMTPStub
+    novo_servidor = SMTPStub(port=porta).start()
+    try:
+        novo_worker = make_worker(db, novo_servidor)
+        assert novo_worker.process_batch() == 2
+        novo_worker.stop()
+    finally:
+        novo_servidor.stop()
+    assert len(novo_servidor.messages) == 2
+
+
+def test_email_service_enqueues_in_callers_transaction(db):
+    email_service.send_notification_email("x@example.com", "Oi", "<p>Oi</p>", db=db)
+    db.commit()
+    mensagem = db.query(EmailOutbox).one()
+    assert mensagem.status == EMAIL_PENDING
+    assert mensagem.to_email == "x@example.com"
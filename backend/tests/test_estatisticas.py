@@ -2,6 +2,9 @@ import pytest
 from fastapi import status
 from datetime import datetime, timedelta
 
+from app.core.security import create_access_token
+from app.models import Game, Player, Statistic, StatisticRollup
+
 def test_create_estatistica(client, test_user):
     # Primeiro faz login
     login_response = client.post(
@@ -244,4 +247,60 @@ def test_delete_estatistica(client, test_user):
         headers={"Authorization": f"Bearer {token}"}
     )
     data = get_response.json()
-    assert len(data) == 0 
\ No newline at end of file
+    assert len(data) == 0 
+
+def test_public_game_statistics_etag(client, db, test_user):
+    game = Game(opponent="Time Adversário", date=datetime.now(), owner_id=test_user.id, created_at=datetime.now())
+    player = Player(name="Jogadora Teste", number=10, created_at=datetime.now())
+    db.add_all([game, player])
+    db.flush()
+    db.add(Statistic(game_id=game.id, player_id=player.id, quarter=1, points=2))
+    db.commit()
+    game_id, player_id = game.id, player.id
+
+    response = client.get(f"/api/estatisticas/public/game/{game_id}")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+
+    response = client.get(f"/api/estatisticas/public/game/{game_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Filtros diferentes têm representação (e ETag) própria
+    response = client.get(f"/api/estatisticas/public/game/{game_id}?quarter=1", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+    db.add(Statistic(game_id=game_id, player_id=player_id, quarter=2, points=3))
+    db.commit()
+    response = client.get(f"/api/estatisticas/public/game/{game_id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+    assert response.headers["ETag"] != etag
+
+
+def test_create_statistic_upserts_on_natural_key(client, db, test_user):
+    game = Game(opponent="Time Adversário", date=datetime.now(), owner_id=test_user.id, created_at=datetime.now())
+    player = Player(name="Jogadora Teste", number=10, created_at=datetime.now())
+    db.add_all([game, player])
+    db.commit()
+    game_id, player_id = game.id, player.id
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+    payload = {
+        "game_id": game_id, "player_id": player_id, "quarter": 1, "points": 2,
+        "assists": 0, "rebounds": 1, "steals": 0, "fouls": 0,
+        "two_attempts": 1, "two_made": 1, "three_attempts": 0, "three_made": 0,
+        "free_throw_attempts": 0, "free_throw_made": 0, "interference": 0,
+    }
+
+    primeira = client.post("/api/estatisticas", json=payload, headers=headers)
+    assert primeira.status_code == status.HTTP_201_CREATED
+    segunda = client.post("/api/estatisticas", json=dict(payload, points=5), headers=headers)
+    assert segunda.status_code == status.HTTP_201_CREATED
+
+    assert segunda.json()["id"] == primeira.json()["id"]
+    assert segunda.json()["points"] == 5
+    assert segunda.json()["created_at"] == primeira.json()["created_at"]
+    assert db.query(Statistic).filter(Statistic.game_id == game_id).count() == 1
+
+    # Rollups atualizados pela diferença (2 -> 5), sem contar a linha duas vezes
+    game_rollup = db.query(StatisticRollup).filter_by(level="game", game_id=game_id).one()
+    assert (game_rollup.stat_count, game_rollup.points) == (1, 5)
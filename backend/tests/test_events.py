@@ -0,0 +1,94 @@
+import asyncio
+
+from app.core.events import GameEventHub, format_sse, game_events
+from app.routes.estatisticas import _stream_game_statistics
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def test_hub_fans_out_to_every_subscriber():
+    hub = GameEventHub()
+
+    async def run():
+        first = hub.subscribe(1)
+        second = hub.subscribe(1)
+        other_game = hub.subscribe(2)
+
+        # Publicação vinda de outra thread, como nas rotas síncronas
+        delivered = await asyncio.to_thread(hub.publish, 1, "statistic.created", {"id": 10})
+        assert delivered == 2
+        assert await first.queue.get() == {"type": "statistic.created", "data": {"id": 10}}
+        assert await second.queue.get() == {"type": "statistic.created", "data": {"id": 10}}
+        assert other_game.queue.empty()
+
+        hub.unsubscribe(1, first)
+        hub.unsubscribe(1, second)
+        assert hub.subscriber_count(1) == 0
+
+    asyncio.run(run())
+
+
+def test_hub_drops_oldest_event_for_slow_subscriber():
+    hub = GameEventHub(max_queue=2)
+
+    async def run():
+        subscription = hub.subscribe(1)
+        for i in range(3):
+            hub.publish(1, "statistic.updated", {"id": i})
+        await asyncio.sleep(0)
+        assert [subscription.queue.get_nowait()["data"]["id"] for _ in range(2)] == [1, 2]
+
+    asyncio.run(run())
+
+
+def test_stream_sends_snapshot_then_published_deltas():
+    async def run():
+        request = FakeRequest()
+        stream = _stream_game_statistics(request, 42, [{"id": 1}], game_events.subscribe(42))
+        assert await stream.__anext__() == format_sse("snapshot", [{"id": 1}])
+        assert game_events.subscriber_count(42) == 1
+
+        next_event = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        await asyncio.to_thread(game_events.publish, 42, "statistic.deleted", {"id": 1})
+        assert await next_event == format_sse("statistic.deleted", {"id": 1})
+
+        request.disconnected = True
+        await stream.aclose()
+        assert game_events.subscriber_count(42) == 0
+
+    asyncio.run(run())
+
+
+def test_stream_keeps_events_published_before_snapshot():
+    async def run():
+        request = FakeRequest()
+        subscription = game_events.subscribe(7)
+        # Publicados entre a assinatura e a leitura do snapshot
+        game_events.publish(7, "statistic.updated", {"id": 1, "updated_at": "2025-03-01T20:00:00"})
+        game_events.publish(7, "statistic.created", {"id": 2, "updated_at": "2025-03-01T20:00:01"})
+        await asyncio.sleep(0)
+        # O snapshot já contém a atualização da linha 1, mas não a linha 2
+        snapshot = [{"id": 1, "updated_at": "2025-03-01T20:00:00"}]
+        stream = _stream_game_statistics(request, 7, snapshot, subscription)
+        assert await stream.__anext__() == format_sse("snapshot", snapshot)
+        assert await stream.__anext__() == format_sse(
+            "statistic.created", {"id": 2, "updated_at": "2025-03-01T20:00:01"}
+        )
+
+        game_events.publish(7, "statistic.updated", {"id": 1, "updated_at": "2025-03-01T20:00:05"})
+        assert await stream.__anext__() == format_sse(
+            "statistic.updated", {"id": 1, "updated_at": "2025-03-01T20:00:05"}
+        )
+
+        request.disconnected = True
+        await stream.aclose()
+        assert game_events.subscriber_count(7) == 0
+
+    asyncio.run(run())
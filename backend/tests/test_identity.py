@@ -0,0 +1,55 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.identity import identity_cache
+from app.core.security import create_access_token
+from app.crud import user as crud_user
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService
+
+
+def user_selects():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_identity_is_cached_between_requests(client, test_user):
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+    statements, stop = user_selects()
+    try:
+        for _ in range(3):
+            assert client.get("/api/games", headers=headers).status_code == 200
+    finally:
+        stop()
+
+    assert len(statements) == 1
+    assert identity_cache.stats()["hits"] == 2
+
+
+def test_identity_invalidated_on_crud_update(client, db, test_user):
+    user_id, email = test_user.id, test_user.email
+    headers = {"Authorization": f"Bearer {create_access_token(subject=email)}"}
+    assert client.get("/api/games", headers=headers).status_code == 200
+
+    crud_user.update_user(db, user_id, UserUpdate(email="novo@example.com"))
+
+    # O token antigo aponta para um email que não existe mais
+    assert client.get("/api/games", headers=headers).status_code == 401
+    headers = {"Authorization": f"Bearer {create_access_token(subject='novo@example.com')}"}
+    assert client.get("/api/games", headers=headers).status_code == 200
+
+
+def test_identity_invalidated_on_service_delete(client, db, test_user):
+    user_id, email = test_user.id, test_user.email
+    headers = {"Authorization": f"Bearer {create_access_token(subject=email)}"}
+    assert client.get("/api/games", headers=headers).status_code == 200
+
+    assert UserService(db).delete_user(user_id)
+
+    assert client.get("/api/games", headers=headers).status_code == 401
@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func
+
+from app.core.security import create_access_token, get_password_hash
+from app.core.config import settings
+from app.crud.notification import unread_cache
+from app.models import User, UserRole, UserPlan, Notification, NotificationTarget, UserNotification, NotificationRead
+from app.models.email_outbox import EmailOutbox, EMAIL_PENDING
+
+
+def make_users(db, count, **kwargs):
+    for i in range(count):
+        db.add(User(
+            name=f"Usuária {i}",
+            email=f"{kwargs.get('plan', UserPlan.FREE).value}{i}@example.com",
+            hashed_password="x",
+            **kwargs,
+        ))
+    db.commit()
+
+
+def admin_headers(db):
+    admin = User(
+        name="Admin",
+        email="admin@example.com",
+        hashed_password=get_password_hash("adminpass"),
+        role=UserRole.SUPERADMIN,
+    )
+    db.add(admin)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token(subject='admin@example.com')}"}
+
+
+def test_broadcast_fans_out_with_constant_queries(client, db):
+    headers = admin_headers(db)
+    make_users(db, 30)
+
+    statements = []
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        response = client.post("/api/notifications", json={"content": "Treino amanhã", "target": "all"}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["recipients"] == 31
+    assert data["job_id"]
+    # Um INSERT ... SELECT por tabela, qualquer que seja o número de destinatárias
+    assert sum("INSERT INTO user_notifications" in s for s in statements) == 1
+    assert sum("INSERT INTO email_outbox" in s for s in statements) == 1
+
+    assert db.query(UserNotification).count() == 31
+    outbox = db.query(EmailOutbox).filter(EmailOutbox.job_id == data["job_id"]).all()
+    assert len(outbox) == 31
+    assert {m.status for m in outbox} == {EMAIL_PENDING}
+    assert outbox[0].subject == "Treino amanhã"
+
+    status = client.get(f"/api/notifications/jobs/{data['job_id']}", headers=headers).json()
+    assert status["total"] == 31
+    assert status["pending"] == 31
+    assert status["done"] is False
+
+
+def test_notification_targets(client, db):
+    headers = admin_headers(db)
+    make_users(db, 2, plan=UserPlan.PRO)
+    make_users(db, 3, plan=UserPlan.TEAM)
+
+    expected = {"players": 5, "mvp": 2, "team": 3}
+    for target, recipients in expected.items():
+        response = client.post("/api/notifications", json={"content": "Aviso", "target": target}, headers=headers)
+        assert response.status_code == 202
+        assert response.json()["recipients"] == recipients
+
+
+def test_create_notification_requires_admin(client, db, test_user):
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+    response = client.post("/api/notifications", json={"content": "Aviso", "target": "all"}, headers=headers)
+    assert response.status_code == 403
+    assert client.get("/api/notifications/jobs/abc", headers=headers).status_code == 403
+
+
+def user_headers(email):
+    return {"Authorization": f"Bearer {create_access_token(subject=email)}"}
+
+
+def test_audience_broadcast_stores_one_row(client, db, monkeypatch):
+    headers = admin_headers(db)
+    make_users(db, 20)
+    monkeypatch.setattr(settings, "NOTIFICATION_DELIVERY_MODE", "audience")
+
+    response = client.post("/api/notifications", json={"content": "Jogo no sábado", "target": "all"}, headers=headers)
+    assert response.status_code == 202
+    notification_id = response.json()["notification"]["id"]
+    assert response.json()["recipients"] == 21
+    assert db.query(UserNotification).count() == 0
+
+    player = user_headers("free3@example.com")
+    inbox = client.get("/api/notifications/me", headers=player).json()
+    assert [(item["id"], item["is_read"]) for item in inbox] == [(notification_id, False)]
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 1}
+
+    assert client.post(f"/api/notifications/{notification_id}/read", headers=player).status_code == 200
+    assert client.post(f"/api/notifications/{notification_id}/read", headers=player).status_code == 200
+    assert db.query(NotificationRead).count() == 1
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 0}
+    assert client.get("/api/notifications/me", headers=player).json()[0]["is_read"] is True
+    # As demais continuam com a notificação não lida
+    assert client.get("/api/notifications/me/unread/count", headers=user_headers("free4@example.com")).json() == {"count": 1}
+
+    # Quem se cadastra depois não recebe notificações antigas
+    db.add(User(name="Nova", email="nova@example.com", hashed_password="x",
+                created_at=datetime.utcnow() + timedelta(seconds=1)))
+    db.commit()
+    assert client.get("/api/notifications/me", headers=user_headers("nova@example.com")).json() == []
+
+
+def test_inbox_merges_fanout_and_audience(client, db, monkeypatch):
+    headers = admin_headers(db)
+    make_users(db, 1, plan=UserPlan.PRO)
+    player = user_headers("pro0@example.com")
+
+    primeira = client.post("/api/notifications", json={"content": "Fan-out", "target": "mvp"}, headers=headers).json()
+    monkeypatch.setattr(settings, "NOTIFICATION_DELIVERY_MODE", "audience")
+    segunda = client.post("/api/notifications", json={"content": "Público", "target": "mvp"}, headers=headers).json()
+    client.post("/api/notifications", json={"content": "Só times", "target": "team"}, headers=headers)
+
+    inbox = client.get("/api/notifications/me", headers=player).json()
+    assert [item["notification"]["content"] for item in inbox] == ["Público", "Fan-out"]
+
+    assert client.post(f"/api/notifications/{primeira['notification']['id']}/read", headers=player).status_code == 200
+    unread = client.get("/api/notifications/me", params={"unread_only": True}, headers=player).json()
+    assert [item["id"] for item in unread] == [segunda["notification"]["id"]]
+
+    # Notificação de outro público não pode ser marcada
+    outra = db.query(Notification).filter(Notification.content == "Só times").one()
+    assert client.post(f"/api/notifications/{outra.id}/read", headers=player).status_code == 404
+
+
+def capture_statements(engine):
+    statements = []
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", before_execute)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", before_execute)
+
+
+def test_unread_count_is_cached_and_maintained(client, db):
+    headers = admin_headers(db)
+    make_users(db, 1)
+    player = user_headers("free0@example.com")
+
+    primeira = client.post("/api/notifications", json={"content": "Um", "target": "all"}, headers=headers).json()
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 1}
+
+    statements, stop = capture_statements(db.get_bind())
+    try:
+        assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 1}
+        assert not any("count(" in s.lower() for s in statements)
+
+        # Nova notificação: só o delta é contado no banco
+        client.post("/api/notifications", json={"content": "Dois", "target": "all"}, headers=headers)
+        statements.clear()
+        assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 2}
+        assert any("notification_id >" in s for s in statements)
+
+        client.post(f"/api/notifications/{primeira['notification']['id']}/read", headers=player)
+        statements.clear()
+        assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 1}
+        assert not any("count(" in s.lower() for s in statements)
+    finally:
+        stop()
+
+
+def test_unread_count_sees_notifications_from_other_workers(client, db):
+    headers = admin_headers(db)
+    make_users(db, 1)
+    player = user_headers("free0@example.com")
+    client.post("/api/notifications", json={"content": "Um", "target": "all"}, headers=headers)
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 1}
+
+    # Fan-out feito por outro processo: não passa pelo cache deste worker
+    admin_id = db.query(User.id).filter(User.email == "admin@example.com").scalar()
+    user_id = db.query(User.id).filter(User.email == "free0@example.com").scalar()
+    notification = Notification(content="Dois", target=NotificationTarget.ALL, created_by=admin_id)
+    db.add(notification)
+    db.flush()
+    db.add(UserNotification(user_id=user_id, notification_id=notification.id, is_read=False))
+    db.commit()
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 2}
+
+
+def test_unread_count_sees_notification_committed_after_a_higher_id(client, db):
+    headers = admin_headers(db)
+    make_users(db, 1)
+    player = user_headers("free0@example.com")
+    user_id = db.query(User.id).filter(User.email == "free0@example.com").scalar()
+    proximo_id = (db.query(func.max(Notification.id)).scalar() or 0) + 1
+
+    # Contador calculado quando uma notificação de id maior já tinha commitado
+    unread_cache.set(unread_cache.make_key("unread", user_id), {"count": 0, "through": proximo_id + 1})
+    client.post("/api/notifications", json={"content": "Atrasada", "target": "all"}, headers=headers)
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 1}
+
+
+def test_mark_all_as_read_is_one_update(client, db, monkeypatch):
+    headers = admin_headers(db)
+    make_users(db, 1)
+    player = user_headers("free0@example.com")
+    for i in range(3):
+        client.post("/api/notifications", json={"content": f"Fan-out {i}", "target": "all"}, headers=headers)
+    monkeypatch.setattr(settings, "NOTIFICATION_DELIVERY_MODE", "audience")
+    for i in range(2):
+        client.post("/api/notifications", json={"content": f"Público {i}", "target": "players"}, headers=headers)
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 5}
+
+    statements, stop = capture_statements(db.get_bind())
+    try:
+        response = client.post("/api/notifications/me/read-all", headers=player)
+    finally:
+        stop()
+    assert response.status_code == 200
+    assert response.json()["updated"] == 3
+    assert sum(s.startswith("UPDATE user_notifications") for s in statements) == 1
+
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 0}
+    assert all(item["is_read"] for item in client.get("/api/notifications/me", headers=player).json())
+
+    client.post("/api/notifications", json={"content": "Depois", "target": "all"}, headers=headers)
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 1}
+    # Sem cache, a contagem no banco chega ao mesmo valor
+    unread_cache.clear()
+    assert client.get("/api/notifications/me/unread/count", headers=player).json() == {"count": 1}
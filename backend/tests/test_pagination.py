@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core import pagination
+from app.core.security import create_access_token
+from app.crud.user import get_users
+from app.models import Game, Lead, Notification, NotificationTarget, Player, User, UserNotification, UserRole
+from app.models.notification import DELIVERY_AUDIENCE
+from app.schemas.user import UserFilter, UserPagination
+
+
+def auth(user):
+    return {"Authorization": f"Bearer {create_access_token(subject=user.email)}"}
+
+
+def walk(client, url, headers, **params):
+    """Percorre todas as páginas seguindo o X-Next-Cursor."""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get(pagination.CURSOR_HEADER)
+        if not cursor:
+            return pages
+
+
+def test_cursor_round_trip():
+    cursor = pagination.encode_cursor(datetime(2025, 3, 1, 20, 30), 42)
+    assert pagination.decode_cursor(cursor) == (datetime(2025, 3, 1, 20, 30), 42)
+    for invalido in ("abc", "!!!", pagination.encode_cursor(datetime(2025, 1, 1), 1)[:-3]):
+        with pytest.raises(pagination.InvalidCursor):
+            pagination.decode_cursor(invalido)
+
+
+@pytest.mark.parametrize("column", [
+    Game.date, User.created_at, Lead.created_at, Notification.created_at, UserNotification.created_at,
+    Player.search_name,
+])
+def test_keyset_sort_columns_are_not_nullable(column):
+    # Linha com chave nula some da comparação por tupla e gera cursor inválido
+    assert not column.nullable
+
+
+def test_games_keyset_pages_are_stable(client, db, test_user):
+    owner_id = test_user.id
+    # Datas repetidas: o id desempata
+    dias = [datetime(2025, 3, 1) + timedelta(days=i // 3) for i in range(11)]
+    db.add_all([
+        Game(opponent=f"Adversária {i}", date=dia, owner_id=owner_id, created_at=datetime.now())
+        for i, dia in enumerate(dias)
+    ])
+    db.commit()
+    esperado = [id for _, id in sorted(
+        ((jogo.date, jogo.id) for jogo in db.query(Game).filter(Game.owner_id == owner_id)), reverse=True
+    )]
+
+    pages = walk(client, "/api/games", auth(test_user), limit=4)
+    assert [len(page) for page in pages] == [4, 4, 3]
+    assert [id for page in pages for id in page] == esperado
+
+    # Um jogo novo no meio da navegação não desloca as páginas seguintes
+    primeira = client.get("/api/games", params={"limit": 4}, headers=auth(test_user))
+    db.add(Game(opponent="Nova", date=datetime(2025, 4, 1), owner_id=owner_id, created_at=datetime.now()))
+    db.commit()
+    segunda = client.get(
+        "/api/games",
+        params={"limit": 4, "cursor": primeira.headers[pagination.CURSOR_HEADER]},
+        headers=auth(test_user),
+    )
+    assert [jogo["id"] for jogo in segunda.json()] == esperado[4:8]
+
+
+def test_games_totals_and_invalid_cursor(client, db, test_user):
+    owner_id = test_user.id
+    db.add_all([
+        Game(opponent=f"Adversária {i}", date=datetime(2025, 3, 1 + i), owner_id=owner_id, created_at=datetime.now())
+        for i in range(5)
+    ])
+    db.commit()
+    headers = auth(test_user)
+
+    response = client.get("/api/games", params={"limit": 2}, headers=headers)
+    assert pagination.TOTAL_HEADER not in response.headers
+    response = client.get("/api/games", params={"limit": 2, "total": "exact"}, headers=headers)
+    assert response.headers[pagination.TOTAL_HEADER] == "5"
+    response = client.get("/api/games", params={"limit": 2, "total": "estimate"}, headers=headers)
+    assert response.headers[pagination.ESTIMATE_HEADER] == "5"
+
+    assert client.get("/api/games", params={"cursor": "abc"}, headers=headers).status_code == 400
+    assert client.get("/api/games", params={"total": "talvez"}, headers=headers).status_code == 422
+
+
+def test_get_users_keyset(db):
+    agora = datetime.utcnow()
+    db.add_all([
+        User(name=f"Usuária {i}", email=f"u{i}@example.com", hashed_password="x",
+             created_at=agora - timedelta(minutes=i // 2))
+        for i in range(7)
+    ])
+    db.commit()
+
+    vistos, cursor = [], None
+    while True:
+        page = get_users(db, UserFilter(), UserPagination(limit=3, cursor=cursor))
+        assert page.total is None
+        vistos.extend(user.email for user in page.items)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    assert sorted(vistos) == sorted(f"u{i}@example.com" for i in range(7))
+    assert len(vistos) == 7
+
+    page = get_users(db, UserFilter(email="u1"), UserPagination(total="exact"))
+    assert (page.total, page.total_estimated) == (1, False)
+
+
+def test_notification_inbox_and_log_keyset(client, db):
+    admin = User(name="Admin", email="admin@example.com", hashed_password="x", role=UserRole.SUPERADMIN,
+                 created_at=datetime.utcnow() - timedelta(days=1))
+    db.add(admin)
+    db.commit()
+    agora = datetime.utcnow()
+    db.add_all([
+        Notification(content=f"Aviso {i}", target=NotificationTarget.ALL, delivery_mode=DELIVERY_AUDIENCE,
+                     created_by=admin.id, created_at=agora - timedelta(minutes=i // 2))
+        for i in range(5)
+    ])
+    db.commit()
+    esperado = [n.id for n in db.query(Notification).order_by(Notification.created_at.desc(), Notification.id.desc())]
+
+    headers = auth(admin)
+    assert [id for page in walk(client, "/api/notifications/me", headers, limit=2) for id in page] == esperado
+    assert [id for page in walk(client, "/api/notifications/log", headers, limit=2) for id in page] == esperado
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from app.core import pagination
+from app.core.security import create_access_token
+from app.models import Player
+from app.models.player import search_key
+from app.services.stats_import import StatsImporter
+
+
+def auth(user):
+    return {"Authorization": f"Bearer {create_access_token(subject=user.email)}"}
+
+
+def make_players(db, *specs):
+    db.add_all([
+        Player(name=name, number=i, created_at=datetime.now(), **extra)
+        for i, (name, extra) in enumerate(specs)
+    ])
+    db.commit()
+
+
+def test_search_key_normalizes_accents_case_and_spaces():
+    assert search_key("  Júlia   DE Araújo ") == "julia de araujo"
+    assert search_key("Ângela") == "angela"
+    assert search_key(None) == ""
+
+
+def test_search_name_follows_name(db, test_user):
+    jogadora = Player(name="Bárbara", number=4, created_at=datetime.now())
+    db.add(jogadora)
+    db.commit()
+    assert jogadora.search_name == "barbara"
+    jogadora.name = "Bia"
+    db.commit()
+    assert db.get(Player, jogadora.id).search_name == "bia"
+
+    # INSERT em lote do Core, como na importação
+    importer = StatsImporter(db, owner_id=test_user.id)
+    importer.import_chunk([{
+        "Nome Jogador": "Érica", "Adversário": "Adversária", "Data": "10/05/2025", "Horário": "19:00",
+    }])
+    assert db.query(Player.search_name).filter(Player.name == "Érica").scalar() == "erica"
+
+
+def test_autocomplete_matches_prefix_without_accents(client, db, test_user):
+    make_players(
+        db,
+        ("Júlia Souza", {}),
+        ("Juliana Lima", {"active": False}),
+        ("Julieta", {}),
+        ("Ana Júlia", {}),
+        ("Karina", {}),
+    )
+    headers = auth(test_user)
+
+    response = client.get("/api/players/autocomplete", params={"q": "JUL"}, headers=headers)
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()] == ["Júlia Souza", "Juliana Lima", "Julieta"]
+    assert set(response.json()[0]) == {"id", "name", "number", "position", "categoria"}
+
+    response = client.get("/api/players/autocomplete", params={"q": "juli", "active": True, "limit": 1},
+                          headers=headers)
+    assert [p["name"] for p in response.json()] == ["Júlia Souza"]
+    assert client.get("/api/players/autocomplete", params={"q": "z"}, headers=headers).json() == []
+    assert client.get("/api/players/autocomplete", params={"q": ""}, headers=headers).status_code == 422
+
+
+def test_directory_is_paginated_and_filtered(client, db, test_user):
+    make_players(db, *[
+        (f"Jogadora {i:02d}", {"categoria": "Sub-17" if i % 2 else "Adulto", "position": "Ala" if i % 3 else "Pivô"})
+        for i in range(9)
+    ])
+    headers = auth(test_user)
+
+    nomes, cursor = [], None
+    while True:
+        response = client.get("/api/players", params={"limit": 4, **({"cursor": cursor} if cursor else {})},
+                              headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) <= 4
+        nomes += [p["name"] for p in response.json()]
+        cursor = response.headers.get(pagination.CURSOR_HEADER)
+        if not cursor:
+            break
+    assert nomes == [f"Jogadora {i:02d}" for i in range(9)]
+
+    response = client.get("/api/players", params={"categoria": "Sub-17", "position": "Ala"}, headers=headers)
+    assert [p["name"] for p in response.json()] == ["Jogadora 01", "Jogadora 05", "Jogadora 07"]
+    response = client.get("/api/players", params={"busca": "jogadora 0"}, headers=headers)
+    assert len(response.json()) == 9
+    assert client.get("/api/players", params={"cursor": "abc"}, headers=headers).status_code == 400
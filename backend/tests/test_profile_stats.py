@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.security import create_access_token
+from app.models import Game, Player, Statistic, StatisticRollup, User, UserRole
+from app.crud.rollup import rebuild_rollups
+
+ANO = 2025
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def rollup_snapshot(db):
+    return sorted(
+        (r.level, r.season, r.month or 0, r.game_id or 0, r.player_id or 0, r.quarter or 0, r.stat_count, r.points)
+        for r in db.query(StatisticRollup).all()
+    )
+
+
+def seed(db, user):
+    jogadora = Player(name="Jogadora", number=7, user_id=user.id, created_at=datetime.now())
+    outra = Player(name="Outra", number=8, created_at=datetime.now())
+    jogos = [
+        Game(opponent=f"Adversário {i}", date=date, owner_id=user.id, created_at=datetime.now())
+        for i, date in enumerate([datetime(ANO, 3, 2, 19), datetime(ANO, 3, 20, 19), datetime(ANO, 5, 4, 19)])
+    ]
+    db.add_all([jogadora, outra, *jogos])
+    db.flush()
+    for jogo in jogos:
+        for player, pontos in ((jogadora, 10), (outra, 99)):
+            db.add(Statistic(game_id=jogo.id, player_id=player.id, quarter=1, points=pontos,
+                             assists=2, rebounds=3, free_throw_made=1))
+    rebuild_rollups(db)
+    db.commit()
+    return jogadora.id, [jogo.id for jogo in jogos]
+
+
+def serie(data, key, field="total"):
+    return {item["month"]: item[field] for item in data[key] if item[field]}
+
+
+def test_my_stats_come_from_monthly_rollup(client, db, test_user):
+    player_id, game_ids = seed(db, test_user)
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+
+    with count_queries() as statements:
+        response = client.get("/api/profile/me/stats", params={"year": ANO}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["month"] for item in data["evolution"]] == list(range(1, 13))
+    assert serie(data, "evolution", "points") == {3: 20, 5: 10}
+    assert serie(data, "assists") == {3: 4, 5: 2}
+    assert serie(data, "free_throws") == {3: 2, 5: 1}
+    assert serie(data, "rebounds") == {3: 6, 5: 3}
+    assert not [s for s in statements if "FROM statistics" in s]
+    assert len([s for s in statements if "FROM statistic_rollups" in s]) == 1
+
+    assert all(item["points"] == 0 for item in client.get(
+        "/api/profile/me/stats", params={"year": ANO - 1}, headers=headers
+    ).json()["evolution"])
+
+    # Escrita de estatística atualiza o mês
+    response = client.post("/api/estatisticas", json={
+        "game_id": game_ids[2], "player_id": player_id, "quarter": 2, "points": 5,
+        "assists": 0, "rebounds": 0, "steals": 0, "fouls": 0, "two_attempts": 0, "two_made": 0,
+        "three_attempts": 0, "three_made": 0, "free_throw_attempts": 0, "free_throw_made": 0,
+        "interference": 0,
+    }, headers=headers)
+    assert response.status_code == 201
+    data = client.get("/api/profile/me/stats", params={"year": ANO}, headers=headers).json()
+    assert serie(data, "evolution", "points") == {3: 20, 5: 15}
+
+    # Jogo remarcado para outro mês leva as estatísticas junto
+    response = client.put(f"/api/games/{game_ids[1]}", json={"date": datetime(ANO, 4, 10, 19).isoformat()},
+                          headers=headers)
+    assert response.status_code == 200
+    data = client.get("/api/profile/me/stats", params={"year": ANO}, headers=headers).json()
+    assert serie(data, "evolution", "points") == {3: 10, 4: 10, 5: 15}
+
+    incremental = rollup_snapshot(db)
+    rebuild_rollups(db)
+    assert rollup_snapshot(db) == incremental
+
+
+def test_my_stats_without_linked_player(client, db, test_user):
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+    data = client.get("/api/profile/me/stats", params={"year": ANO}, headers=headers).json()
+    assert all(item["total"] == 0 for item in data["rebounds"])
+    assert len(data["rebounds"]) == 12
+
+
+def test_only_admins_link_players_to_users(client, db, test_user):
+    admin = User(name="Admin", email="admin@example.com", hashed_password="x", role=UserRole.SUPERADMIN)
+    outra = User(name="Outra", email="outra@example.com", hashed_password="x")
+    jogadoras = [Player(name=f"Jogadora {i}", number=i, created_at=datetime.now()) for i in range(2)]
+    db.add_all([admin, outra, *jogadoras])
+    db.commit()
+    user_id, outra_id = test_user.id, outra.id
+    primeira, segunda = (jogadora.id for jogadora in jogadoras)
+    headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.email)}"}
+    admin_headers = {"Authorization": f"Bearer {create_access_token(subject='admin@example.com')}"}
+
+    # Usuária comum não se vincula a uma jogadora qualquer
+    response = client.put(f"/api/players/{primeira}", json={"user_id": user_id}, headers=headers)
+    assert response.status_code == 403
+    response = client.post("/api/players/", json={"name": "Nova", "number": 9, "user_id": user_id}, headers=headers)
+    assert response.status_code == 403
+    # Outros campos continuam editáveis
+    assert client.put(f"/api/players/{primeira}", json={"number": 11}, headers=headers).status_code == 200
+
+    response = client.put(f"/api/players/{primeira}", json={"user_id": user_id}, headers=admin_headers)
+    assert response.status_code == 200
+    assert "user_id" not in response.json()
+    assert "user_id" not in client.get(f"/api/players/{primeira}").json()
+    assert db.query(Player.user_id).filter(Player.id == primeira).scalar() == user_id
+
+    # Conta já vinculada: 409; conta inexistente: 400
+    response = client.put(f"/api/players/{segunda}", json={"user_id": user_id}, headers=admin_headers)
+    assert response.status_code == 409
+    response = client.put(f"/api/players/{segunda}", json={"user_id": 9999}, headers=admin_headers)
+    assert response.status_code == 400
+    response = client.put(f"/api/players/{segunda}", json={"user_id": outra_id}, headers=admin_headers)
+    assert response.status_code == 200
+
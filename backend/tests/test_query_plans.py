@@ -0,0 +1,140 @@
+"""Regressão de planos: as consultas quentes não podem cair em varredura sequencial.
+
+Por padrão roda contra um SQLite em memória (EXPLAIN QUERY PLAN). Com
+TEST_POSTGRES_URL apontando para um banco descartável, roda o EXPLAIN do
+Postgres com `enable_seqscan = off`: se ainda assim aparecer um Seq Scan,
+nenhum índice atende a consulta.
+"""
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, select, text
+
+from app.crud import rollup
+from app.database import Base
+from app.models import Game, Player, Statistic, StatisticRollup, User
+from app.models.statistic_rollup import ROLLUP_GAME_QUARTER
+from app.routes.dashboard import get_stats_query
+from app.routes.estatisticas import get_statistics_query
+from app.routes.players import filtro_prefixo
+from app.services.stats_export import export_query
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+INICIO = datetime(2025, 3, 1)
+FIM = datetime(2025, 3, 31, 23, 59, 59)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(POSTGRES_URL or "sqlite://")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed(engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": i, "name": f"Usuária {i}", "email": f"u{i}@example.com", "hashed_password": "x",
+             "role": "PLAYER", "plan": "FREE"}
+            for i in range(1, 11)
+        ])
+        conn.execute(Player.__table__.insert(), [
+            {"id": i, "name": f"Jogadora {i}", "created_at": datetime(2024, 1, 1)} for i in range(1, 41)
+        ])
+        conn.execute(Game.__table__.insert(), [
+            {"id": i, "opponent": f"Adversária {i}", "date": datetime(2024, 1, 1) + timedelta(days=i),
+             "owner_id": i % 10 + 1, "created_at": datetime(2024, 1, 1)}
+            for i in range(1, 601)
+        ])
+        conn.execute(Statistic.__table__.insert(), [
+            {"game_id": g, "player_id": p, "quarter": q, "points": q}
+            for g in range(1, 601) for p in range(1, 11) for q in range(1, 5)
+        ])
+    from sqlalchemy.orm import Session
+    with Session(engine) as db:
+        rollup.rebuild_rollups(db)
+        db.commit()
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+@contextmanager
+def explaining(engine):
+    """Reescreve as consultas executadas dentro do bloco como EXPLAIN."""
+    prefix = "EXPLAIN " if engine.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        return prefix + statement, parameters
+
+    event.listen(engine, "before_cursor_execute", before_execute, retval=True)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+
+def plan(engine, statement):
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("SET enable_seqscan = off"))
+        with explaining(engine):
+            rows = conn.execute(statement).all()
+    return [row[-1] for row in rows]
+
+
+def sequential_scans(engine, lines):
+    if engine.dialect.name == "postgresql":
+        pattern = re.compile(r"Seq Scan on (\w+)")
+    else:
+        # "SCAN tabela" sem índice percorre a tabela inteira, e um SEARCH com
+        # ANY(coluna) pula a primeira coluna do índice (skip-scan), o que também
+        # lê o índice todo. "SCAN ... USING INDEX" é o percurso ordenado pelo
+        # índice do ORDER BY, equivalente ao Index Scan do Postgres.
+        pattern = re.compile(r"^SCAN (\w+)$|^SEARCH (\w+) USING .*\(ANY\(")
+    return {match.group(1) or match.group(2) for line in lines for match in [pattern.search(line)] if match}
+
+
+HOT_QUERIES = {
+    # estatisticas.py
+    "estatisticas do jogo": lambda: get_statistics_query(42),
+    "estatisticas do jogo por quarto e jogadora": lambda: get_statistics_query(42, quarter=2, player_id=3),
+    "estatistica do dono": lambda: select(Statistic).join(Game).where(Statistic.id == 10, Game.owner_id == 3),
+    # games.py
+    "jogos do usuario no periodo": lambda: select(Game).where(
+        Game.owner_id == 3, Game.date >= INICIO, Game.date <= FIM
+    ).limit(10),
+    "jogos do usuario": lambda: select(Game).where(Game.owner_id == 3).limit(10),
+    # dashboard.py
+    "jogos do periodo": lambda: get_stats_query(INICIO, FIM).order_by(Game.date.desc()),
+    "rollups por quarto dos jogos do periodo": lambda: select(StatisticRollup).where(
+        StatisticRollup.level == ROLLUP_GAME_QUARTER,
+        StatisticRollup.game_id.in_(get_stats_query(INICIO, FIM).with_only_columns(Game.id).scalar_subquery()),
+    ),
+    # exportação e estatísticas por jogadora
+    "estatisticas da jogadora": lambda: select(Statistic).where(Statistic.player_id == 7),
+    "exportacao da jogadora": lambda: export_query(player_id=7),
+    "exportacao do periodo": lambda: export_query(INICIO, FIM),
+    "exportacao do dono no periodo": lambda: export_query(INICIO, FIM, owner_id=3),
+    # players.py
+    "autocomplete de jogadoras": lambda: select(Player.id, Player.name).where(filtro_prefixo("jog")).order_by(
+        Player.search_name, Player.id
+    ).limit(10),
+}
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_indexes(engine, name):
+    lines = plan(engine, HOT_QUERIES[name]())
+    assert not sequential_scans(engine, lines), "\n".join(lines)
+
+
+def test_harness_detects_sequential_scan(engine):
+    lines = plan(engine, select(Statistic).where(Statistic.points == 3))
+    assert "statistics" in sequential_scans(engine, lines)
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+from app.core.cache import dashboard_cache
+from app.crud.rollup import rebuild_rollups
+from app.models import Game, Player, Statistic
+from app.services import stats_analytics
+from app.services.stats_analytics import GROUP_GAME, GROUP_PLAYER, METRIC_COLUMNS
+
+
+def row(game_id, player_id, **values):
+    return (game_id, player_id, *[values.get(column, 0) for column in METRIC_COLUMNS])
+
+
+def test_compute_metrics_by_player():
+    columns = stats_analytics.load_columns([
+        row(1, 7, points=18, rebounds=5, assists=3, steals=1, blocks=1, minutes_played=20.0,
+            two_attempts=10, two_made=5, three_attempts=4, three_made=2, free_throw_attempts=4, free_throw_made=2),
+        row(2, 7, points=2, rebounds=1, minutes_played=10.0, two_attempts=2, two_made=1),
+        row(1, 8, rebounds=2, minutes_played=0.0),
+    ])
+    por_jogadora = {m["player_id"]: m for m in stats_analytics.compute_metrics(columns, GROUP_PLAYER)}
+
+    sete = por_jogadora[7]
+    assert sete["participacoes"] == 2
+    assert (sete["arremessos_quadra"], sete["acertos_quadra"]) == (16, 8)
+    assert sete["aproveitamento_quadra"] == 0.5
+    assert sete["aproveitamento_2_pontos"] == 0.5
+    assert sete["aproveitamento_3_pontos"] == 0.5
+    assert sete["aproveitamento_lance_livre"] == 0.5
+    assert sete["efg"] == round((8 + 0.5 * 2) / 16, 3)
+    assert sete["true_shooting"] == round(20 / (2 * (16 + 0.44 * 4)), 3)
+    # 20 + 6 + 3 + 1 + 1 - 8 arremessos errados - 2 lances livres errados
+    assert sete["eficiencia"] == 21
+    assert sete["media_eficiencia"] == 10.5
+    assert sete["pontos_por_minuto"] == round(20 / 30, 3)
+    assert isinstance(sete["total_pontos"], int)
+
+    # Sem arremessos nem minutos as métricas ficam nulas, não zero
+    oito = por_jogadora[8]
+    assert oito["aproveitamento_quadra"] is None
+    assert oito["true_shooting"] is None
+    assert oito["rebotes_por_minuto"] is None
+    assert oito["eficiencia"] == 2
+
+
+def test_compute_metrics_by_game_and_empty():
+    columns = stats_analytics.load_columns([
+        row(1, 7, points=3, three_attempts=1, three_made=1),
+        row(1, 8, points=2, two_attempts=2, two_made=1),
+        row(2, 7, points=0, two_attempts=1),
+    ])
+    por_jogo = {m["game_id"]: m for m in stats_analytics.compute_metrics(columns, GROUP_GAME)}
+    assert por_jogo[1]["participacoes"] == 2
+    assert por_jogo[1]["aproveitamento_quadra"] == round(2 / 3, 3)
+    assert por_jogo[1]["efg"] == round(2.5 / 3, 3)
+    assert por_jogo[2]["aproveitamento_quadra"] == 0.0
+    assert stats_analytics.compute_metrics(stats_analytics.load_columns([]), GROUP_PLAYER) == []
+
+
+def test_dashboard_advanced_endpoints(client, db, test_user):
+    year = datetime.now().year
+    jogos = [
+        Game(opponent=f"Adversário {i}", date=datetime(year, 1, 2 + i, 19), owner_id=test_user.id,
+             created_at=datetime.now())
+        for i in range(2)
+    ]
+    jogadoras = [Player(name=f"Jogadora {i}", number=i, created_at=datetime.now()) for i in range(2)]
+    db.add_all(jogos + jogadoras)
+    db.flush()
+    for jogo in jogos:
+        for jogadora in jogadoras:
+            for quarter in (1, 2):
+                db.add(Statistic(game_id=jogo.id, player_id=jogadora.id, quarter=quarter, points=2 + jogadora.number,
+                                 two_attempts=2, two_made=1, three_attempts=jogadora.number,
+                                 three_made=jogadora.number, minutes_played=5.0, rebounds=1))
+    rebuild_rollups(db)
+    db.commit()
+    dashboard_cache.clear()
+    jogo_ids = [jogo.id for jogo in jogos]
+    jogadora_ids = [jogadora.id for jogadora in jogadoras]
+
+    response = client.get("/api/dashboard/public/jogadoras/avancadas")
+    assert response.status_code == 200
+    data = response.json()
+    assert [j["player_id"] for j in data] == jogadora_ids
+    assert data[1]["name"] == "Jogadora 1"
+    assert data[1]["participacoes"] == 2
+    assert data[1]["aproveitamento_quadra"] == round(8 / 12, 3)
+    assert data[1]["pontos_por_minuto"] == round(12 / 20, 3)
+    assert data[0]["aproveitamento_3_pontos"] is None
+    assert "ETag" in response.headers
+
+    response = client.get("/api/dashboard/public/jogos/avancadas", params={"jogo_id": jogo_ids[0]})
+    assert [j["game_id"] for j in response.json()] == [jogo_ids[0]]
+    assert response.json()[0]["opponent"] == "Adversário 0"
+    assert response.json()[0]["total_pontos"] == 2 * (2 + 3)
+
+    assert client.get("/api/dashboard/public/jogos/avancadas", params={"jogo_id": 9999}).json() == []
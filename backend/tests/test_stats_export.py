@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.core.security import create_access_token
+from app.models import Game, Player, Statistic, User
+from app.services import stats_export
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+requires_pyarrow = pytest.mark.skipif(pa is None, reason="pyarrow não instalado")
+
+
+def seed(db, owner_id):
+    jogadoras = [Player(name=f"Jogadora {i}", number=i, created_at=datetime.now()) for i in range(3)]
+    jogos = [
+        Game(opponent="Adversária A", date=datetime(2024, 11, 5, 19), categoria="Sub 13", owner_id=owner_id, created_at=datetime.now()),
+        Game(opponent="Adversária B", date=datetime(2025, 3, 8, 19), categoria="Sub 13", owner_id=owner_id, created_at=datetime.now()),
+        Game(opponent="Adversária C", date=datetime(2025, 4, 12, 19), categoria="Sub 15", owner_id=owner_id, created_at=datetime.now()),
+    ]
+    db.add_all(jogadoras + jogos)
+    db.flush()
+    for jogo in jogos:
+        for jogadora in jogadoras:
+            for quarter in (1, 2):
+                db.add(Statistic(game_id=jogo.id, player_id=jogadora.id, quarter=quarter, points=jogadora.number + quarter))
+    db.commit()
+    return jogadoras, jogos
+
+
+def auth(user_email):
+    return {"Authorization": f"Bearer {create_access_token(subject=user_email)}"}
+
+
+def other_owner(db):
+    user = User(name="Outra", email="outra@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@requires_pyarrow
+def test_parquet_export_with_filters(client, db, test_user):
+    headers = auth(test_user.email)
+    jogadoras, _ = seed(db, test_user.id)
+    player_id = jogadoras[1].id
+
+    response = client.get("/api/estatisticas/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 18
+    assert table.column_names == stats_export.COLUMN_NAMES
+    assert table.schema.field("game_date").type == pa.timestamp("us")
+
+    response = client.get(
+        "/api/estatisticas/export",
+        params={"data_inicio": "2025-01-01T00:00:00", "categoria": "Sub 13", "player_id": player_id},
+        headers=headers,
+    )
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("opponent").to_pylist() == ["Adversária B", "Adversária B"]
+    assert table.column("points").to_pylist() == [2, 3]
+    assert set(table.column("player_name").to_pylist()) == {"Jogadora 1"}
+
+
+@requires_pyarrow
+def test_arrow_stream_export(client, db, test_user):
+    headers = auth(test_user.email)
+    seed(db, test_user.id)
+
+    response = client.get("/api/estatisticas/export", params={"formato": "arrow"}, headers=headers)
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 18
+
+
+@requires_pyarrow
+def test_export_writes_one_row_group_per_batch(db, test_user):
+    seed(db, test_user.id)
+
+    chunks = list(stats_export.iter_columnar(db, stats_export.export_query(), "parquet", batch_size=5))
+    # Cada lote já sai como bytes, sem esperar o arquivo inteiro
+    assert len([chunk for chunk in chunks if chunk]) >= 4
+    metadata = pq.read_metadata(io.BytesIO(b"".join(chunks)))
+    assert metadata.num_rows == 18
+    assert metadata.num_row_groups == 4
+
+
+def test_export_without_pyarrow_returns_501(client, db, test_user, monkeypatch):
+    def sem_pyarrow():
+        raise stats_export.ExportUnavailable("Exportação em Parquet/Arrow requer o pacote pyarrow")
+    monkeypatch.setattr(stats_export, "_require_pyarrow", sem_pyarrow)
+
+    response = client.get("/api/estatisticas/export", headers=auth(test_user.email))
+    assert response.status_code == 501
+
+
+@requires_pyarrow
+def test_export_only_includes_callers_games(client, db, test_user):
+    headers = auth(test_user.email)
+    seed(db, test_user.id)
+    outra = auth(other_owner(db).email)
+
+    table = pq.read_table(io.BytesIO(client.get("/api/estatisticas/export", headers=outra).content))
+    assert table.num_rows == 0
+    table = pq.read_table(io.BytesIO(client.get("/api/estatisticas/export", headers=headers).content))
+    assert table.num_rows == 18
+
+
+def test_csv_export(client, db, test_user):
+    headers = auth(test_user.email)
+    _, jogos = seed(db, test_user.id)
+    jogo_id = jogos[1].id
+
+    response = client.get("/api/estatisticas/export", params={"formato": "csv"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    linhas = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig")), delimiter=";"))
+    assert linhas[0] == stats_export.COLUMN_NAMES
+    assert len(linhas) == 19
+
+    response = client.get(
+        "/api/estatisticas/export",
+        params={"formato": "csv", "jogo_id": jogo_id, "data_inicio": "2025-01-01T00:00:00", "data_fim": "2025-12-31T23:59:59"},
+        headers=headers,
+    )
+    linhas = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig")), delimiter=";"))
+    assert len(linhas) == 6
+    assert {linha["opponent"] for linha in linhas} == {"Adversária B"}
+
+
+def test_ndjson_export(client, db, test_user):
+    headers = auth(test_user.email)
+    seed(db, test_user.id)
+
+    response = client.get("/api/estatisticas/export", params={"formato": "ndjson", "data_fim": "2024-12-31T23:59:59"}, headers=headers)
+    assert response.status_code == 200
+    registros = [json.loads(linha) for linha in response.text.splitlines()]
+    assert len(registros) == 6
+    assert registros[0]["game_date"] == "2024-11-05T19:00:00"
+    assert registros[0]["opponent"] == "Adversária A"
+    assert list(registros[0]) == stats_export.COLUMN_NAMES
+
+
+def test_text_exports_only_include_callers_games(client, db, test_user):
+    headers = auth(test_user.email)
+    seed(db, test_user.id)
+    outra = auth(other_owner(db).email)
+
+    response = client.get("/api/estatisticas/export", params={"formato": "csv"}, headers=outra)
+    linhas = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig")), delimiter=";"))
+    assert linhas == [stats_export.COLUMN_NAMES]
+    response = client.get("/api/estatisticas/export", params={"formato": "ndjson"}, headers=outra)
+    assert response.text == ""
+
+    response = client.get("/api/estatisticas/export", params={"formato": "ndjson"}, headers=headers)
+    assert len(response.text.splitlines()) == 18
+
+
+def test_csv_header_is_sent_before_the_query(db, test_user):
+    seed(db, test_user.id)
+    statements = []
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        chunks = stats_export.iter_text(db, stats_export.export_query(), "csv", batch_size=4)
+        assert next(chunks).startswith("\ufeffstatistic_id;".encode("utf-8"))
+        assert statements == []
+        restantes = list(chunks)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    # 18 linhas em lotes de 4
+    assert len(restantes) == 5
+    assert len(statements) == 1
@@ -0,0 +1,175 @@
+import os
+
+import pytest
+from sqlalchemy import event
+
+from app.crud.rollup import rebuild_rollups
+from app.models import Game, Player, Statistic, StatisticRollup
+from app.services import stats_import
+from app.services.stats_import import expand_paths, import_csv, import_files
+
+HEADER = "Data;Time;Adversário;Categoria;Local;Horário;Nome Jogador;2 Pontos;3 Pontos;Lance Livre;Rebotes;Assistências;Roubadas;Tocos;Turnovers;Faltas;Pontos Totais"
+
+
+def write_csv(tmp_path, rows, name="estatisticas.csv"):
+    path = os.path.join(tmp_path, name)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("\r\n".join([HEADER, *rows]) + "\r\n")
+    return path
+
+
+def season_rows(games=4, players=10):
+    rows = []
+    for g in range(games):
+        for p in range(players):
+            rows.append(f"{10 + g:02d}/05/2025;EK9/Brasília;Adversária {g};Sub 13;Ginásio;19:00;Jogadora {p};{p};1;2;3;4;5;0;1;2;{2 * p + 5}")
+    return rows
+
+
+def test_import_creates_players_games_and_statistics(db, test_user, tmp_path):
+    path = write_csv(str(tmp_path), season_rows() + ["32/05/2025;X;Y;Sub 13;Z;19:00;Jogadora 1;0;0;0;0;0;0;0;0;0;0"])
+
+    report = import_csv(db, path, chunk_size=7, owner_id=test_user.id)
+
+    assert report.rows == 41
+    assert report.inserted == 40
+    assert report.invalid == 1
+    assert "linha 42" in report.errors[0]
+    assert report.players_created == 10
+    assert report.games_created == 4
+    assert report.rows_per_second > 0
+    assert db.query(Statistic).count() == 40
+    assert db.query(Game).filter(Game.status == "FINALIZADO").count() == 4
+
+    stat = db.query(Statistic).join(Player).join(Game).filter(
+        Player.name == "Jogadora 3", Game.opponent == "Adversária 1"
+    ).one()
+    assert (stat.points, stat.two_made, stat.three_made, stat.free_throw_made, stat.quarter) == (11, 3, 1, 2, 1)
+    # Rollups acompanham a importação
+    assert db.query(StatisticRollup).count() > 0
+
+
+def test_reimport_skips_existing_rows(db, test_user, tmp_path):
+    path = write_csv(str(tmp_path), season_rows())
+    import_csv(db, path, owner_id=test_user.id)
+
+    report = import_csv(db, path, owner_id=test_user.id)
+    assert report.inserted == 0
+    assert report.skipped == 40
+    assert report.players_created == report.games_created == 0
+    assert db.query(Statistic).count() == 40
+
+
+def test_dry_run_writes_nothing(db, test_user, tmp_path):
+    path = write_csv(str(tmp_path), season_rows())
+
+    report = import_csv(db, path, dry_run=True, owner_id=test_user.id)
+
+    assert report.dry_run
+    assert report.inserted == 40
+    assert report.summary().startswith("[dry-run]")
+    assert db.query(Statistic).count() == 0
+    assert db.query(Player).count() == 0
+
+
+def test_import_query_count_does_not_grow_with_rows(db, test_user, tmp_path):
+    owner_id = test_user.id
+
+    def count_statements(rows):
+        statements = []
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", before_execute)
+        try:
+            import_csv(db, write_csv(str(tmp_path), rows, name=f"{len(rows)}.csv"), chunk_size=1000, owner_id=owner_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_execute)
+        return len(statements)
+
+    pequeno = count_statements(season_rows(games=1, players=5))
+    db.query(Statistic).delete()
+    db.query(Player).delete()
+    db.commit()
+    grande = count_statements(season_rows(games=1, players=200))
+    # Sem consultas por linha: o jogo já existe na segunda rodada, daí o -1
+    assert grande == pequeno - 1
+
+
+def test_import_files_in_parallel_is_idempotent(db, test_user, tmp_path):
+    owner_id = test_user.id
+    rows = season_rows(games=4, players=10)
+    pasta = tmp_path / "temporada"
+    pasta.mkdir()
+    write_csv(str(pasta), rows[:20], name="maio-1.csv")
+    write_csv(str(pasta), rows[20:], name="maio-2.csv")
+    # Mesmas linhas em outro arquivo (reexportação da planilha)
+    write_csv(str(pasta), rows[15:25] + ["xx/05/2025;X;Y;Sub 13;Z;19:00;Jogadora 1;0;0;0;0;0;0;0;0;0;0"], name="maio-3.csv")
+
+    paths = expand_paths([str(pasta)])
+    assert [os.path.basename(p) for p in paths] == ["maio-1.csv", "maio-2.csv", "maio-3.csv"]
+
+    total, per_file = import_files(db, paths, workers=2, owner_id=owner_id)
+    assert total.rows == 51
+    assert total.inserted == 40
+    assert total.skipped == 10
+    assert total.invalid == 1
+    assert total.players_created == 10
+    assert total.games_created == 4
+    assert [report.rows for _, report in per_file] == [20, 20, 11]
+    assert db.query(Statistic).count() == 40
+
+    again, _ = import_files(db, expand_paths([str(pasta / "*.csv")]), workers=2, owner_id=owner_id)
+    assert again.inserted == 0
+    assert again.skipped == 50
+    assert again.players_created == again.games_created == 0
+    assert db.query(Statistic).count() == 40
+    assert db.query(Game).count() == 4
+
+
+def rollup_rows(db):
+    return sorted(
+        (r.level, r.season, r.month or 0, r.game_id or 0, r.player_id or 0, r.quarter or 0, r.stat_count, r.points)
+        for r in db.query(StatisticRollup).all()
+    )
+
+
+def test_failed_import_keeps_rollups_of_committed_chunks(db, test_user, tmp_path, monkeypatch):
+    owner_id = test_user.id
+    read_chunks = stats_import.read_chunks
+
+    def failing_chunks(path, chunk_size=1000):
+        for number, chunk in enumerate(read_chunks(path, chunk_size)):
+            if number == 2:
+                raise OSError("arquivo truncado")
+            yield chunk
+
+    monkeypatch.setattr(stats_import, "read_chunks", failing_chunks)
+    with pytest.raises(OSError):
+        import_csv(db, write_csv(str(tmp_path), season_rows()), chunk_size=7, owner_id=owner_id)
+    assert db.query(Statistic).count() == 14
+    incremental = rollup_rows(db)
+    rebuild_rollups(db)
+    assert rollup_rows(db) == incremental
+
+    # Falha num arquivo de import_files: os arquivos já gravados mantêm os rollups
+    monkeypatch.setattr(stats_import, "read_chunks", read_chunks)
+    parse_file = stats_import.parse_file
+
+    def failing_parse(path):
+        if path.endswith("quebrado.csv"):
+            raise ValueError("arquivo ilegível")
+        return parse_file(path)
+
+    monkeypatch.setattr(stats_import, "parse_file", failing_parse)
+    paths = [
+        write_csv(str(tmp_path), season_rows(games=6), name="completo.csv"),
+        write_csv(str(tmp_path), season_rows(), name="quebrado.csv"),
+    ]
+    with pytest.raises(ValueError):
+        import_files(db, paths, workers=1, owner_id=owner_id)
+    assert db.query(Statistic).count() == 60
+    incremental = rollup_rows(db)
+    rebuild_rollups(db)
+    assert rollup_rows(db) == incremental
+